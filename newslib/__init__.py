@@ -1,7 +1,5 @@
 from logging import getLogger
 
-import requests
-
 logger = getLogger(__name__)
 
-requests.urllib3.disable_warnings()
+from newslib.registry import all_sources, get_source, register_source  # noqa: E402
@@ -0,0 +1,75 @@
+from datetime import datetime
+from functools import cached_property
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from newslib.source import Source
+
+
+class Article:
+    """
+    Fetch-once handle on a single article page.
+
+    The page is fetched and parsed at most once; every field is computed lazily from that document and memoized.
+    """
+
+    def __init__(self, source: "Source", url: str, document: Any = None):
+        self.source = source
+        self.url = url
+        self._document = document
+        self._lock = Lock()
+
+    @property
+    def fetched(self) -> bool:
+        return self._document is not None
+
+    @property
+    def document(self) -> Any:
+        if self._document is None:
+            with self._lock:
+                if self._document is None:
+                    self._document, self.url = self.source.fetch_document(self.url)
+
+        return self._document
+
+    async def fetch_async(self) -> "Article":
+        if self._document is None:
+            document, url = await self.source.fetch_document_async(self.url)
+
+            with self._lock:
+                if self._document is None:
+                    self._document, self.url = document, url
+
+        return self
+
+    @cached_property
+    def headline(self) -> Optional[str]:
+        return self.source.get_article_headline(self.url, self.document)
+
+    @cached_property
+    def category(self) -> str:
+        return self.source.get_category(self.url, self.document)
+
+    @cached_property
+    def times(self) -> tuple[Optional[datetime], Optional[datetime]]:
+        return self.source.get_times(self.url, self.document)
+
+    @property
+    def published(self) -> Optional[datetime]:
+        return self.times[0]
+
+    @property
+    def updated(self) -> Optional[datetime]:
+        return self.times[1]
+
+    @cached_property
+    def tags(self) -> Optional[list[str]]:
+        return self.source.get_tags(self.url, self.document)
+
+    @cached_property
+    def premium(self) -> bool:
+        return self.source.is_premium(self.url, self.document)
+
+    def __repr__(self):
+        return f"<Article {self.source.name} {self.url}>"
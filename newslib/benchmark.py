@@ -0,0 +1,338 @@
+"""
+Per-source parsing benchmarks over a recorded page corpus (see newslib.corpus).
+
+    python -m newslib.benchmark <corpus dir> [--output results.json] [--baseline baseline.json] [--threshold 0.2]
+
+Exits with status 1 if any metric regressed past the threshold compared to the baseline.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Iterable, Optional
+from urllib.parse import urljoin
+
+from newslib import all_sources, get_source, logger
+from newslib.coalesce import Coalescer
+from newslib.corpus import replaying
+from newslib.source import Source
+
+RESULTS_FORMAT = 1
+
+ROOT_OPERATIONS = ("get_top_article_a", "get_substories_a")
+ARTICLE_OPERATIONS = ("get_category", "get_times", "get_tags")
+
+# Metrics where a higher value is a regression; the rest (throughput) regress when they drop
+LOWER_IS_BETTER = {"latency_ms", "allocated_kb", "peak_memory_kb"}
+
+# Results measuring third party code (the reference lzstring) rather than newslib, reported but never compared
+UNCOMPARED = {("payload", "reference"), ("payload", "speedup")}
+
+
+def reset_caches(source: Source):
+    """
+    Forget everything memoized from previous runs, so each run parses its page from scratch
+    """
+    source.document_cache.clear()
+    source._articles.clear()
+
+    # Class-level memos, like Arutz7's item data and Walla's decompressed states
+    for value in vars(type(source)).values():
+        if isinstance(value, Coalescer):
+            value.invalidate()
+
+
+def measure(run: Callable[[], Any], repeat: int) -> dict[str, float]:
+    """
+    :return: Median and fastest latency of run, and the memory it allocated at its peak
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "latency_ms": statistics.median(timings) * 1000,
+        "min_ms": min(timings) * 1000,
+        "allocated_kb": peak / 1024,
+    }
+
+
+def article_urls(source: Source, content: bytes) -> list[str]:
+    root_content = source.load_root_content(content)
+    a_list = [source.get_top_article_a(root_content), *source.get_substories_a(root_content)]
+
+    return list(dict.fromkeys(urljoin(source.root, a.attrs["href"]) for a in a_list))
+
+
+def fetch_article(source: Source, url: str) -> tuple[bytes, str]:
+    """
+    :return: The content of an article's document, and the URL it's extracted against
+    """
+    document_url = source.get_document_url(url)
+    content, final_url = source.fetch_content(document_url)
+
+    # Documents fetched from elsewhere (Arutz7's item API) are still extracted against the article's URL
+    return content, final_url if document_url == url else url
+
+
+def benchmark_source(source: Source, repeat: int = 5, duration: float = 1.0) -> dict[str, Any]:
+    """
+    :param repeat: Timed runs per operation and page
+    :param duration: Seconds to measure throughput for
+    """
+    content, _ = source.get_content(source.root)
+    urls = article_urls(source, content)
+
+    results = {"pages": 1 + len(urls)}
+
+    for operation in ROOT_OPERATIONS:
+        def run():
+            reset_caches(source)
+            getattr(source, operation)(source.load_root_content(content))
+
+        results[operation] = measure(run, repeat)
+
+    # Fetched once up front, so article operations time loading and extracting the document but not replaying it
+    articles = {}
+    for url in urls:
+        try:
+            articles[url] = fetch_article(source, url)
+        except Exception as e:
+            logger.warning(f"Skipping {url} ({source.name}): {e!r}")
+
+    for operation in ARTICLE_OPERATIONS:
+        samples = []
+
+        for url, (page_content, final_url) in articles.items():
+            def run():
+                reset_caches(source)
+                getattr(source, operation)(final_url, source.load_document(page_content, final_url))
+
+            try:
+                run()
+            except Exception as e:
+                logger.warning(f"Skipping {url} ({source.name}.{operation}): {e!r}")
+                continue
+
+            samples.append(measure(run, repeat))
+
+        if samples:
+            results[operation] = {
+                metric: statistics.median(sample[metric] for sample in samples) for metric in samples[0]
+            }
+
+    payload_benchmark = PAYLOAD_BENCHMARKS.get(source.name)
+    if payload_benchmark is not None:
+        results["payload"] = payload_benchmark(content, repeat)
+
+    results["throughput"] = throughput(source, content, urls, duration)
+    results["peak_memory_kb"] = peak_memory(source, urls)
+
+    return results
+
+
+def benchmark_walla_state(content: bytes, repeat: int) -> dict[str, Any]:
+    """
+    Compare the reference lzstring decompression of Walla's loadDataState with newslib.lz
+    """
+    from lzstring import LZString
+
+    from newslib.israel.walla import WallaSource
+    from newslib.lz import decompress_from_base64
+    from newslib.payload import find_between
+
+    compressed = find_between(content, b'window.loadDataState = "', b'"')
+    if not compressed:
+        return {}
+
+    compressed = compressed.decode()
+    reference = measure(lambda: LZString.decompressFromBase64(compressed), repeat)
+    fast = measure(lambda: decompress_from_base64(compressed), repeat)
+
+    WallaSource.decompressed_states.invalidate()
+    WallaSource.decompress_state(compressed.encode())
+    memoized = measure(lambda: WallaSource.decompress_state(compressed.encode()), repeat)
+
+    return {
+        "reference": reference,
+        "fast": fast,
+        "memoized": memoized,
+        "speedup": reference["latency_ms"] / fast["latency_ms"],
+    }
+
+
+# Extra decoding benchmarks run on a source's front page, by source name
+PAYLOAD_BENCHMARKS: dict[str, Callable[[bytes, int], dict[str, Any]]] = {
+    "walla": benchmark_walla_state,
+}
+
+
+def extract_records(source: Source, content: bytes, urls: list[str]) -> int:
+    """
+    Go from raw front page to complete records: headline, category, times and tags of every article
+
+    :return: How many records were extracted
+    """
+    root_content = source.load_root_content(content)
+
+    source.get_headline(source.get_top_article_a(root_content), top_article=True)
+    for a in source.get_substories_a(root_content):
+        source.get_headline(a)
+
+    records = 0
+    for url in urls:
+        try:
+            source.get_article_details(url)
+            source.get_tags(url)
+        except Exception:
+            continue
+
+        records += 1
+
+    return records
+
+
+def throughput(source: Source, content: bytes, urls: list[str], duration: float = 1.0) -> dict[str, float]:
+    pages = records = 0
+    started = time.perf_counter()
+
+    while time.perf_counter() - started < duration or pages == 0:
+        reset_caches(source)
+        records += extract_records(source, content, urls)
+        pages += 1 + len(urls)
+
+    elapsed = time.perf_counter() - started
+
+    return {"pages_per_s": pages / elapsed, "records_per_s": records / elapsed}
+
+
+def peak_memory(source: Source, urls: list[str]) -> Optional[float]:
+    """
+    :return: Largest peak of memory allocated while fetching and fully extracting a single article page, in KiB
+    """
+    peaks = []
+
+    for url in urls:
+        reset_caches(source)
+
+        tracemalloc.start()
+        try:
+            source.get_article_details(url)
+            source.get_tags(url)
+            _, peak = tracemalloc.get_traced_memory()
+        except Exception:
+            continue
+        finally:
+            tracemalloc.stop()
+
+        peaks.append(peak / 1024)
+
+    return max(peaks, default=None)
+
+
+def run_benchmarks(sources: Iterable[Source] = None, repeat: int = 5, duration: float = 1.0) -> dict[str, Any]:
+    """
+    Benchmark sources against whatever transport is installed, normally a replaying one
+    """
+    results = {}
+
+    for source in all_sources() if sources is None else sources:
+        try:
+            results[source.name] = benchmark_source(source, repeat, duration)
+        except Exception as e:
+            logger.error(f"Couldn't benchmark {source.name}: {e!r}")
+
+    return {
+        "format": RESULTS_FORMAT,
+        "created": time.time(),
+        "python": platform.python_version(),
+        "results": results,
+    }
+
+
+def _metrics(results: dict[str, Any], prefix=()) -> Iterable[tuple[tuple[str, ...], float]]:
+    for key, value in results.items():
+        # prefix starts with the source's name
+        if (*prefix[1:], key) in UNCOMPARED:
+            continue
+
+        if isinstance(value, dict):
+            yield from _metrics(value, (*prefix, key))
+        elif isinstance(value, float) and key != "min_ms":
+            yield (*prefix, key), value
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], threshold: float = 0.2) -> list[str]:
+    """
+    :param threshold: Allowed relative change before a metric counts as regressed
+    :return: Descriptions of every regressed metric
+    """
+    baseline_metrics = dict(_metrics(baseline["results"]))
+    regressions = []
+
+    for path, value in _metrics(results["results"]):
+        before = baseline_metrics.get(path)
+        if not before:
+            continue
+
+        change = (value - before) / before
+        if path[-1] not in LOWER_IS_BETTER:
+            change = -change
+
+        if change > threshold:
+            regressions.append(f"{'.'.join(path)}: {before:.3f} -> {value:.3f} ({change:+.0%})")
+
+    return regressions
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m newslib.benchmark", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("corpus", help="Corpus directory, as recorded by newslib.corpus")
+    parser.add_argument("--version", help="Corpus version to replay (latest by default)")
+    parser.add_argument("--source", action="append", help="Only benchmark this source (repeatable)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--duration", type=float, default=1.0, help="Seconds to measure throughput for per source")
+    parser.add_argument("--output", help="Write results as JSON to this file (stdout by default)")
+    parser.add_argument("--baseline", help="Results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    sources = None if args.source is None else [get_source(name) for name in args.source]
+
+    with replaying(args.corpus, args.version) as corpus:
+        results = run_benchmarks(sources, args.repeat, args.duration)
+        results["corpus"] = corpus.version
+
+    output = json.dumps(results, indent=1)
+    if args.output is None:
+        print(output)
+    else:
+        with open(args.output, "w") as f:
+            f.write(output)
+
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from hashlib import sha256
+from pathlib import Path
+from threading import RLock
+from typing import Optional, Union
+
+from requests import Response
+
+from newslib import logger
+from newslib.instrumentation import count
+
+MAX_AGE_RE = re.compile(r"max-age\s*=\s*(?P<seconds>\d+)")
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    # Bodies downloaded; revalidations (304s) are counted apart from them
+    misses: int = 0
+    revalidations: int = 0
+    evictions: int = 0
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    final_url: str
+    digest: str
+    size: int
+    expires: float
+    accessed: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers = {}
+
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+
+        return headers
+
+
+class ResponseCache:
+    """
+    On-disk, content-addressed HTTP response cache.
+
+    Bodies are stored once per content hash under ``objects/`` and shared by every URL that served them. Entries are
+    revalidated with If-None-Match / If-Modified-Since once they expire, and the least recently used entries are
+    evicted once the stored bodies exceed ``max_bytes``.
+    """
+
+    def __init__(self, directory: Union[str, os.PathLike], max_bytes: int = 256 * 1024 * 1024, min_ttl: float = 0):
+        """
+        :param max_bytes: Size cap for stored bodies
+        :param min_ttl: Seconds a response is served without revalidation, even if its max-age is shorter
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.min_ttl = min_ttl
+        self.stats = CacheStats()
+
+        self._objects = self.directory / "objects"
+        self._entries = self.directory / "entries"
+        self._objects.mkdir(parents=True, exist_ok=True)
+        self._entries.mkdir(parents=True, exist_ok=True)
+
+        self._lock = RLock()
+        # Least recently used first
+        self._index: OrderedDict[str, CacheEntry] = OrderedDict()
+        # Entries per stored body, and the bodies' total size
+        self._references: dict[str, int] = {}
+        self._size = 0
+        self._load()
+
+    def _load(self):
+        entries = []
+        for path in self._entries.glob("*.json"):
+            try:
+                entries.append(CacheEntry(**json.loads(path.read_text())))
+            except Exception:
+                logger.warning(f"Dropping unreadable cache entry {path}")
+                path.unlink(missing_ok=True)
+
+        for entry in sorted(entries, key=lambda e: e.accessed):
+            if (self._objects / entry.digest).exists():
+                self._add(entry)
+            else:
+                self._entry_path(entry.url).unlink(missing_ok=True)
+
+    @property
+    def size(self) -> int:
+        with self._lock:
+            return self._size
+
+    def _add(self, entry: CacheEntry):
+        self._index[entry.url] = entry
+
+        references = self._references.get(entry.digest, 0)
+        if references == 0:
+            self._size += entry.size
+        self._references[entry.digest] = references + 1
+
+    def _remove(self, url: str) -> Optional[CacheEntry]:
+        """
+        Drop url's entry, and its body if no other entry shares it
+        """
+        entry = self._index.pop(url, None)
+        if entry is not None:
+            self._entry_path(url).unlink(missing_ok=True)
+            self._release(entry)
+
+        return entry
+
+    def _release(self, entry: CacheEntry):
+        references = self._references[entry.digest] - 1
+        if references == 0:
+            del self._references[entry.digest]
+            self._size -= entry.size
+            (self._objects / entry.digest).unlink(missing_ok=True)
+        else:
+            self._references[entry.digest] = references
+
+    def _entry_path(self, url: str) -> Path:
+        return self._entries / f"{sha256(url.encode()).hexdigest()}.json"
+
+    def _write_entry(self, entry: CacheEntry):
+        path = self._entry_path(entry.url)
+        temp_path = path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(asdict(entry)))
+        os.replace(temp_path, path)
+
+    def _ttl(self, response: Response) -> float:
+        max_age = 0
+        match = MAX_AGE_RE.search(response.headers.get("Cache-Control", ""))
+        if match:
+            max_age = int(match["seconds"])
+
+        return max(max_age, self.min_ttl)
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._index.get(url)
+
+            if entry is not None:
+                self._index.move_to_end(url)
+                entry.accessed = time.time()
+
+            return entry
+
+    def read(self, entry: CacheEntry) -> Optional[bytes]:
+        """
+        :return: entry's body, or None (dropping entry) if it was evicted since it was looked up
+        """
+        with self._lock:
+            try:
+                return (self._objects / entry.digest).read_bytes()
+            except FileNotFoundError:
+                if self._index.get(entry.url) is entry:
+                    self._remove(entry.url)
+
+                return None
+
+    def hit(self, entry: CacheEntry) -> Optional[tuple[bytes, str]]:
+        """
+        :return: The fresh entry's body and final URL, or None if it's gone and the URL has to be fetched
+        """
+        with self._lock:
+            content = self.read(entry)
+            if content is None:
+                return None
+
+            self.stats.hits += 1
+
+        count(None, "response_cache_hits")
+
+        return content, entry.final_url
+
+    def revalidated(self, entry: CacheEntry, response: Response) -> Optional[tuple[bytes, str]]:
+        """
+        :return: The revalidated entry's body and final URL, or None if it's gone and the URL has to be fetched again
+        """
+        with self._lock:
+            content = self.read(entry)
+            if content is None:
+                return None
+
+            self.stats.revalidations += 1
+
+            entry.expires = time.time() + self._ttl(response)
+            entry.etag = response.headers.get("ETag", entry.etag)
+            entry.last_modified = response.headers.get("Last-Modified", entry.last_modified)
+            if self._index.get(entry.url) is entry:
+                self._write_entry(entry)
+
+        count(None, "response_cache_revalidations")
+
+        return content, entry.final_url
+
+    def store(self, url: str, response: Response):
+        count(None, "response_cache_misses")
+
+        with self._lock:
+            self.stats.misses += 1
+
+            if "no-store" in response.headers.get("Cache-Control", ""):
+                # A stale copy mustn't outlive the response that replaced it
+                self._remove(url)
+                return
+
+            content = response.content
+            digest = sha256(content).hexdigest()
+
+            object_path = self._objects / digest
+            if not object_path.exists():
+                temp_path = object_path.with_suffix(".tmp")
+                temp_path.write_bytes(content)
+                os.replace(temp_path, object_path)
+
+            now = time.time()
+            entry = CacheEntry(
+                url=url,
+                final_url=response.url,
+                digest=digest,
+                size=len(content),
+                expires=now + self._ttl(response),
+                accessed=now,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+
+            # Count the new body in before releasing the old one, which may be the same
+            previous = self._index.pop(url, None)
+            self._add(entry)
+            self._write_entry(entry)
+
+            if previous is not None:
+                self._release(previous)
+
+            self._evict()
+
+    def _evict(self):
+        while self._size > self.max_bytes and len(self._index) > 1:
+            self._remove(next(iter(self._index)))
+            self.stats.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            for url in list(self._index):
+                self._entry_path(url).unlink(missing_ok=True)
+
+            for path in self._objects.iterdir():
+                path.unlink(missing_ok=True)
+
+            self._index.clear()
+            self._references.clear()
+            self._size = 0
+
+    def __repr__(self):
+        return f"<ResponseCache {self.directory} {self.stats}>"
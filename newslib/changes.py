@@ -0,0 +1,93 @@
+from dataclasses import dataclass, field
+from hashlib import blake2b
+from typing import Optional
+from urllib.parse import urljoin
+
+from newslib.source import Source
+
+
+@dataclass(frozen=True, slots=True)
+class FrontPageEntry:
+    url: str
+    headline: str
+
+
+@dataclass
+class FrontPageDiff:
+    source: str
+    new_top_story: Optional[FrontPageEntry] = None
+    added: list[FrontPageEntry] = field(default_factory=list)
+    removed: list[FrontPageEntry] = field(default_factory=list)
+    # (before, after) pairs of entries whose URL stayed the same
+    edited: list[tuple[FrontPageEntry, FrontPageEntry]] = field(default_factory=list)
+
+    def __bool__(self):
+        return bool(self.new_top_story or self.added or self.removed or self.edited)
+
+
+class FrontPageWatcher:
+    """
+    Tracks a source's front page, running full extraction only when its fingerprint changes.
+
+    The fingerprint is a hash of the source's get_front_page_region, computed on the raw bytes.
+    """
+
+    def __init__(self, source: Source):
+        self.source = source
+        self.fingerprint: Optional[str] = None
+        self.top_story: Optional[FrontPageEntry] = None
+        self.substories: list[FrontPageEntry] = []
+        self.extractions = 0
+
+    def _fingerprint(self, content: bytes) -> str:
+        return blake2b(self.source.get_front_page_region(content), digest_size=16).hexdigest()
+
+    def _entry(self, a, top_article=False) -> FrontPageEntry:
+        return FrontPageEntry(
+            url=urljoin(self.source.root, a.attrs["href"]),
+            headline=self.source.get_headline(a, top_article=top_article),
+        )
+
+    def check(self, content: bytes = None) -> Optional[FrontPageDiff]:
+        """
+        :param content: Raw front page bytes, fetched from source.root if not given
+        :return: What changed since the previous check, or None if the fingerprint is unchanged
+        """
+        if content is None:
+            content, _ = self.source.fetch_content(self.source.root)
+
+        fingerprint = self._fingerprint(content)
+        if fingerprint == self.fingerprint:
+            return None
+
+        root_content = self.source.load_root_content(content)
+        top_story = self._entry(self.source.get_top_article_a(root_content), top_article=True)
+        substories = [self._entry(a) for a in self.source.get_substories_a(root_content)]
+        self.extractions += 1
+
+        diff = self.diff(top_story, substories)
+
+        self.fingerprint = fingerprint
+        self.top_story = top_story
+        self.substories = substories
+
+        return diff
+
+    def diff(self, top_story: FrontPageEntry, substories: list[FrontPageEntry]) -> FrontPageDiff:
+        diff = FrontPageDiff(source=self.source.name)
+
+        if self.top_story is None or top_story.url != self.top_story.url:
+            diff.new_top_story = top_story
+
+        before = {entry.url: entry for entry in ([self.top_story] if self.top_story else []) + self.substories}
+        after = {entry.url: entry for entry in [top_story] + substories}
+
+        diff.added = [entry for url, entry in after.items() if url not in before and entry is not top_story]
+        diff.removed = [entry for url, entry in before.items() if url not in after]
+        diff.edited = [
+            (before[url], entry)
+            for url, entry in after.items()
+            if url in before and before[url].headline != entry.headline
+        ]
+
+        return diff
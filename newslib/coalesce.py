@@ -0,0 +1,119 @@
+import asyncio
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from threading import Lock
+from typing import Any, Awaitable, Callable, Hashable
+
+from newslib.instrumentation import count
+
+
+class Coalescer:
+    """
+    Short-lived result cache that also shares in-flight lookups.
+
+    Concurrent or repeated lookups of the same key within ``ttl`` seconds share a single call to the fetch function,
+    whether they come from threads or from coroutines. Failures are shared by the callers waiting on them but are not
+    cached.
+    """
+
+    def __init__(self, ttl: float = 60, max_entries: int = 256, source: str = None):
+        """
+        :param source: Name of the source the lookups belong to, reported with coalesced_hits/coalesced_misses
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.source = source
+
+        self._results: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._in_flight: dict[Hashable, Future] = {}
+        self._lock = Lock()
+        # Lookups running as their own tasks, referenced so they aren't garbage collected midway
+        self._tasks: set[asyncio.Task] = set()
+
+        self.calls = 0
+
+    def _claim(self, key: Hashable) -> tuple[bool, Future]:
+        """
+        :return: Whether the caller owns the lookup and must fetch, and the future every caller waits on
+        """
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None and cached[0] > time.monotonic():
+                future = Future()
+                future.set_result(cached[1])
+                count(self.source, "coalesced_hits")
+                return False, future
+
+            future = self._in_flight.get(key)
+            if future is not None:
+                count(self.source, "coalesced_hits")
+                return False, future
+
+            future = self._in_flight[key] = Future()
+            self.calls += 1
+            count(self.source, "coalesced_misses")
+
+            return True, future
+
+    def _settle(self, key: Hashable, future: Future, result: Any = None, error: BaseException = None):
+        with self._lock:
+            del self._in_flight[key]
+
+            if error is None:
+                self._results[key] = (time.monotonic() + self.ttl, result)
+                self._results.move_to_end(key)
+
+                while len(self._results) > self.max_entries:
+                    self._results.popitem(last=False)
+
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(error)
+
+    def get(self, key: Hashable, fetch: Callable[[], Any]) -> Any:
+        owner, future = self._claim(key)
+
+        if owner:
+            try:
+                result = fetch()
+            except BaseException as e:
+                self._settle(key, future, error=e)
+                raise
+
+            self._settle(key, future, result)
+
+        return future.result()
+
+    async def _fetch_async(self, key: Hashable, future: Future, fetch: Callable[[], Awaitable[Any]]):
+        try:
+            result = await fetch()
+        except BaseException as e:
+            # Handed to the callers through the future
+            self._settle(key, future, error=e)
+            return
+
+        self._settle(key, future, result)
+
+    async def get_async(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        owner, future = self._claim(key)
+
+        if owner:
+            # Run as a task of its own, so cancelling the caller that started the lookup doesn't cancel it for the rest
+            task = asyncio.ensure_future(self._fetch_async(key, future, fetch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        # Shielded so a cancelled waiter doesn't cancel the lookup the other callers share
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def invalidate(self, key: Hashable = None):
+        with self._lock:
+            if key is None:
+                self._results.clear()
+            else:
+                self._results.pop(key, None)
+
+    def __len__(self):
+        return len(self._results)
@@ -0,0 +1,319 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from hashlib import sha256
+from inspect import getattr_static
+from pathlib import Path
+from threading import Lock
+from typing import Iterable, Iterator, Optional, Union
+from urllib.parse import urljoin
+
+from requests import ConnectionError, PreparedRequest, Response
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from newslib import all_sources, logger
+from newslib.ratelimit import RateLimiter
+from newslib.source import Source
+from newslib.transport import Transport, get_transport, set_transport
+
+CORPUS_FORMAT = 1
+
+# Headers describing the body as it was on the wire, which no longer apply once it has been decoded
+WIRE_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie"}
+
+
+@dataclass
+class CorpusEntry:
+    url: str
+    status_code: int
+    digest: str
+    headers: dict[str, str] = field(default_factory=dict)
+    recorded: float = 0
+
+
+class Corpus:
+    """
+    A versioned, on-disk set of recorded HTTP responses.
+
+    Each version lives in its own directory under the corpus root, with a ``manifest.json`` mapping request URLs to
+    their recorded status and headers, and bodies stored once per content hash under ``bodies/``.
+    """
+
+    def __init__(self, directory: Union[str, os.PathLike]):
+        """
+        :param directory: The directory of a single corpus version
+        """
+        self.directory = Path(directory)
+        self._bodies = self.directory / "bodies"
+        self._manifest = self.directory / "manifest.json"
+        self._lock = Lock()
+        self.entries: dict[str, CorpusEntry] = {}
+
+        if self._manifest.exists():
+            manifest = json.loads(self._manifest.read_text())
+            if manifest.get("format") != CORPUS_FORMAT:
+                raise Exception(f"Unsupported corpus format {manifest.get('format')} in {self.directory}")
+
+            self.entries = {url: CorpusEntry(**entry) for url, entry in manifest["entries"].items()}
+
+    @staticmethod
+    def versions(root: Union[str, os.PathLike]) -> list[str]:
+        root = Path(root)
+        if not root.is_dir():
+            return []
+
+        return sorted(path.name for path in root.iterdir() if (path / "manifest.json").exists())
+
+    @classmethod
+    def open(cls, root: Union[str, os.PathLike], version: str = None) -> "Corpus":
+        """
+        :return: The given version of the corpus under root, or its latest version
+        """
+        if version is None:
+            versions = cls.versions(root)
+            if not versions:
+                raise Exception(f"No corpus recorded under {root}")
+
+            version = versions[-1]
+
+        return cls(Path(root) / version)
+
+    @classmethod
+    def create(cls, root: Union[str, os.PathLike], version: str = None) -> "Corpus":
+        """
+        :param version: Name of the new version, a timestamp by default
+        """
+        if version is None:
+            version = time.strftime("%Y%m%d-%H%M%S")
+
+        return cls(Path(root) / version)
+
+    @property
+    def version(self) -> str:
+        return self.directory.name
+
+    def get(self, url: str) -> Optional[tuple[CorpusEntry, bytes]]:
+        entry = self.entries.get(url)
+        if entry is None:
+            return None
+
+        return entry, (self._bodies / entry.digest).read_bytes()
+
+    def add(self, url: str, status_code: int, headers: dict[str, str], content: bytes) -> CorpusEntry:
+        digest = sha256(content).hexdigest()
+        entry = CorpusEntry(
+            url=url,
+            status_code=status_code,
+            digest=digest,
+            headers={name: value for name, value in headers.items() if name.lower() not in WIRE_HEADERS},
+            recorded=time.time(),
+        )
+
+        with self._lock:
+            self._bodies.mkdir(parents=True, exist_ok=True)
+
+            body = self._bodies / digest
+            if not body.exists():
+                temporary = body.with_suffix(".tmp")
+                temporary.write_bytes(content)
+                os.replace(temporary, body)
+
+            self.entries[url] = entry
+
+        return entry
+
+    def save(self):
+        """
+        Write the manifest, making every response added so far part of this version
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        with self._lock:
+            entries = {url: asdict(entry) for url, entry in sorted(self.entries.items())}
+
+        temporary = self._manifest.with_suffix(".tmp")
+        temporary.write_text(json.dumps({
+            "format": CORPUS_FORMAT,
+            "entries": entries,
+        }, indent=1))
+        os.replace(temporary, self._manifest)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __repr__(self):
+        return f"<Corpus {self.directory} ({len(self)} responses)>"
+
+
+def _response(request: PreparedRequest, status_code: int, headers: dict[str, str], content: bytes) -> Response:
+    response = Response()
+    response.status_code = status_code
+    response.headers = CaseInsensitiveDict(headers)
+    response._content = content
+    response._content_consumed = True
+    response.url = request.url
+    response.request = request
+
+    return response
+
+
+class RecordingAdapter(BaseAdapter):
+    """
+    Sends requests through another adapter, recording every response into a corpus.
+    """
+
+    def __init__(self, corpus: Corpus, adapter: BaseAdapter = None):
+        super().__init__()
+        self.corpus = corpus
+        self.adapter = HTTPAdapter() if adapter is None else adapter
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:
+        response = self.adapter.send(request, **kwargs)
+
+        # Reading the body decodes it, so the recording replays the same bytes requests would have returned
+        content = response.content
+        self.corpus.add(request.url, response.status_code, dict(response.headers), content)
+
+        return _response(request, response.status_code, dict(response.headers), content)
+
+    def close(self):
+        self.adapter.close()
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    Serves responses from a corpus without touching the network. Unrecorded URLs raise ConnectionError.
+    """
+
+    def __init__(self, corpus: Corpus):
+        super().__init__()
+        self.corpus = corpus
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:
+        recorded = self.corpus.get(request.url)
+        if recorded is None:
+            raise ConnectionError(f"{request.url} isn't in corpus {self.corpus.version}", request=request)
+
+        entry, content = recorded
+
+        return _response(request, entry.status_code, entry.headers, content)
+
+    def close(self):
+        pass
+
+
+@contextmanager
+def without_persisted_roots() -> Iterator[None]:
+    """
+    Resolve News13's root from (recorded) entry pages only, never from the root persisted on this machine
+    """
+    # Imported here so importing the corpus doesn't import every source module it might never use
+    from newslib.israel.news13 import News13Source
+
+    # The attribute itself, so a lazily resolved default is put back as is
+    previous = getattr_static(News13Source, "root_cache_path")
+    News13Source.root_cache_path = None
+
+    try:
+        yield
+    finally:
+        News13Source.root_cache_path = previous
+
+
+@contextmanager
+def recording(
+        root: Union[str, os.PathLike],
+        version: str = None,
+        adapter: BaseAdapter = None,
+        **transport_options,
+) -> Iterator[Corpus]:
+    """
+    Record every request made through the shared transport into a new corpus version. The manifest is written once
+    recording ends, even if it ends with an error.
+
+    :param adapter: The adapter actually sending the requests, a plain HTTPAdapter by default
+    :param transport_options: Passed on to the Transport, which is rate limited like the default one unless a
+                              rate_limiter is given
+    """
+    corpus = Corpus.create(root, version)
+    transport_options.setdefault("rate_limiter", RateLimiter.for_sources())
+    previous = set_transport(Transport(adapter=RecordingAdapter(corpus, adapter), **transport_options))
+
+    try:
+        with without_persisted_roots():
+            yield corpus
+    finally:
+        set_transport(previous)
+        corpus.save()
+
+
+@contextmanager
+def replaying(root: Union[str, os.PathLike], version: str = None, **transport_options) -> Iterator[Corpus]:
+    """
+    Serve every request made through the shared transport from a recorded corpus version (the latest by default).
+    """
+    corpus = Corpus.open(root, version)
+    previous = set_transport(Transport(adapter=ReplayAdapter(corpus), **transport_options))
+
+    try:
+        with without_persisted_roots():
+            yield corpus
+    finally:
+        set_transport(previous)
+
+
+def record_source(source: Source, articles=True, feeds=True):
+    """
+    Fetch everything the source's tests and benchmarks read: its front page, the pages (or Arutz7 API items) of its
+    top article and substories, and its RSS feeds.
+    """
+    from newslib.israel.news13 import News13Source
+
+    if isinstance(source, News13Source):
+        # Its front page URL comes from the entry page, which replay has to resolve it from as well
+        source.refresh_root()
+
+    root_content = source.get_root_content()
+
+    if articles:
+        a_list = [source.get_top_article_a(root_content), *source.get_substories_a(root_content)]
+
+        for a in a_list:
+            url = urljoin(source.root, a.attrs["href"])
+            try:
+                source.fetch_document(url)
+            except Exception as e:
+                logger.warning(f"Couldn't record {url} ({source.name}): {e!r}")
+
+    if feeds:
+        for url in (source.rss_news_link, source.rss_news_flashes):
+            if url is None:
+                continue
+
+            try:
+                get_transport().fetch(url)
+            except Exception as e:
+                logger.warning(f"Couldn't record {url} ({source.name}): {e!r}")
+
+
+def record_corpus(
+        root: Union[str, os.PathLike],
+        sources: Iterable[Source] = None,
+        version: str = None,
+        articles=True,
+        feeds=True,
+) -> Corpus:
+    with recording(root, version) as corpus:
+        for source in all_sources() if sources is None else sources:
+            try:
+                record_source(source, articles, feeds)
+            except Exception as e:
+                logger.error(f"Couldn't record {source.name}: {e!r}")
+
+    return corpus
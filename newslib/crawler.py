@@ -0,0 +1,45 @@
+import asyncio
+from typing import Iterable, Union
+
+from bs4.element import Tag
+
+from newslib import all_sources, logger
+from newslib.source import Source
+
+FrontPage = tuple[Tag, list[Tag]]
+
+
+async def crawl_source_async(source: Source) -> FrontPage:
+    root_content = await source.get_root_content_async()
+
+    top_article_a, substories_a = await asyncio.gather(
+        source.get_top_article_a_async(root_content),
+        source.get_substories_a_async(root_content),
+    )
+
+    return top_article_a, substories_a
+
+
+async def crawl_async(sources: Iterable[Source] = None) -> dict[str, Union[FrontPage, Exception]]:
+    """
+    Fetch the front page of every source concurrently.
+
+    In-flight requests are bounded by the transport's ``max_in_flight`` and ``max_per_host``.
+
+    :return: Mapping of source name to its top article and substories, or the exception that source raised
+    """
+    if sources is None:
+        sources = all_sources()
+
+    sources = list(sources)
+    results = await asyncio.gather(*[crawl_source_async(source) for source in sources], return_exceptions=True)
+
+    for source, result in zip(sources, results):
+        if isinstance(result, Exception):
+            logger.error(f"Couldn't crawl {source.name}: {result!r}")
+
+    return {source.name: result for source, result in zip(sources, results)}
+
+
+def crawl(sources: Iterable[Source] = None) -> dict[str, Union[FrontPage, Exception]]:
+    return asyncio.run(crawl_async(sources))
@@ -0,0 +1,182 @@
+from collections import OrderedDict
+from functools import cached_property, wraps
+from hashlib import blake2b
+from threading import Lock
+from typing import Any, Callable, Hashable, Optional, Union
+
+from bs4 import BeautifulSoup, SoupStrainer, UnicodeDammit
+from bs4.element import Tag
+from lxml.html import HTMLParser, HtmlElement, document_fromstring
+
+from newslib.instrumentation import PARSE, count, timed
+
+DocumentKey = tuple[Optional[str], str]
+
+
+class Document:
+    """
+    Raw fetched content, identified by its URL and a content hash computed once.
+    """
+
+    def __init__(
+            self,
+            content: Union[str, bytes],
+            url: str = None,
+            source: str = None,
+            parse_only: SoupStrainer = None,
+    ):
+        """
+        :param source: Name of the source the content was fetched for, reported with its parse timings
+        :param parse_only: Restricts the bs4 tree to the matching elements, for partially fetched pages
+        """
+        if isinstance(content, str):
+            content = content.encode()
+
+        self.url = url
+        self.source = source
+        self.content = content
+        self.parse_only = parse_only
+        self.digest = blake2b(content, digest_size=16).hexdigest()
+
+    @property
+    def key(self) -> DocumentKey:
+        return self.url, self.digest
+
+    @cached_property
+    def encoding(self) -> str:
+        """
+        The content's declared encoding, or the one it decodes cleanly as, the same way bs4 picks it
+        """
+        return UnicodeDammit(self.content, is_html=True).original_encoding or "utf-8"
+
+    @cached_property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+    @cached_property
+    def html(self) -> Tag:
+        """
+        The parsed tree, built on first access only
+        """
+        with timed(self.source, PARSE):
+            return attach(parse_html(self.content, self.parse_only), self)
+
+    @cached_property
+    def lxml(self) -> HtmlElement:
+        with timed(self.source, PARSE):
+            # lxml assumes Latin-1 for pages without a <meta charset>
+            return document_fromstring(self.content, parser=HTMLParser(encoding=self.encoding))
+
+    def __len__(self):
+        return len(self.content)
+
+    def __repr__(self):
+        return f"<Document {self.url or ''} {self.digest}>"
+
+
+def parse_html(content: Union[str, bytes], parse_only: SoupStrainer = None) -> Tag:
+    html = BeautifulSoup(content, "lxml", parse_only=parse_only)
+
+    # A restricted tree has no body to check
+    if parse_only is None and len(html.body) == 0:
+        raise Exception("Empty body received")
+
+    return html
+
+
+def attach(html: Tag, document: Document) -> Tag:
+    """
+    Remember which Document a parsed tree was built from.
+    """
+    # Stored in __dict__ directly, since Tag.__getattr__ treats unknown attributes as child lookups
+    html.__dict__["_newslib_document"] = document
+
+    return html
+
+
+def get_document(html: Union[Document, Tag, str, bytes], url: str = None) -> Document:
+    if isinstance(html, Document):
+        return html
+
+    if isinstance(html, Tag):
+        document = html.__dict__.get("_newslib_document")
+        if document is not None:
+            return document
+
+        # Not built by the fetch layer, so serialize it once and remember the result
+        document = Document(str(html), url)
+        attach(html, document)
+        return document
+
+    return Document(html, url)
+
+
+class DocumentCache:
+    """
+    Per-document memo of values derived from a page, bounded to the most recently used documents.
+
+    Only the derived values are kept, never the page content or its tree.
+    """
+
+    def __init__(self, max_documents=16, source: str = None):
+        self.max_documents = max_documents
+        self.source = source
+        self._memos: OrderedDict[DocumentKey, dict[Hashable, Any]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, document: Document, name: Hashable, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            memo = self._memos.get(document.key)
+            if memo is not None:
+                self._memos.move_to_end(document.key)
+
+                if name in memo:
+                    count(self.source, "document_cache_hits")
+                    return memo[name]
+
+        count(self.source, "document_cache_misses")
+        value = compute()
+
+        with self._lock:
+            memo = self._memos.get(document.key)
+            if memo is None:
+                memo = self._memos[document.key] = {}
+
+                while len(self._memos) > self.max_documents:
+                    self._memos.popitem(last=False)
+
+            memo[name] = value
+
+        return value
+
+    def invalidate(self, url: str = None, document: Document = None):
+        with self._lock:
+            if document is not None:
+                self._memos.pop(document.key, None)
+
+            if url is not None:
+                for key in [key for key in self._memos if key[0] == url]:
+                    del self._memos[key]
+
+    def clear(self):
+        with self._lock:
+            self._memos.clear()
+
+    def __len__(self):
+        return len(self._memos)
+
+
+def document_cached(method):
+    """
+    Memoize a Source method of a page on the page's Document in ``self.document_cache``.
+
+    The wrapped method accepts a Document, a parsed tree, or raw str/bytes, and is always called with a Document.
+    """
+
+    @wraps(method)
+    def wrapper(self, html, *args):
+        document = get_document(html)
+
+        return self.document_cache.get(document, (method.__name__, *args), lambda: method(self, document, *args))
+
+    return wrapper
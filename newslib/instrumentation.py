@@ -0,0 +1,203 @@
+"""
+Stage-level timings and counters.
+
+Every fetch, parse, decode and extract stage reports to the installed Listener, which does nothing by default:
+
+    set_listener(PrometheusListener())
+
+Stages nest: an extract stage includes any fetch, parse or decode it triggers lazily, which are also reported on their
+own. Counters are ``bytes_fetched``, ``<cache>_hits`` / ``<cache>_misses`` and ``<stage>_errors``.
+"""
+import logging
+import socket
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from threading import Lock
+from typing import Iterator, Optional
+
+from newslib import logger
+
+FETCH = "fetch"
+PARSE = "parse"
+DECODE = "decode"
+EXTRACT = "extract"
+
+# Stages currently being timed in this context, so nested calls of the same stage are only timed once
+_active_stages: ContextVar[frozenset] = ContextVar("newslib_active_stages", default=frozenset())
+# Source of the enclosing stage, reported for nested events that don't know their source (like parsing root bytes)
+_current_source: ContextVar[Optional[str]] = ContextVar("newslib_current_source", default=None)
+
+
+class Listener:
+    """
+    Receives instrumentation events. The base class ignores them.
+
+    ``source`` is the name of the source the event belongs to. Events that don't know their source are attributed to
+    the enclosing stage's source, or None outside of any stage (like the transport's response cache).
+    """
+
+    def timing(self, source: Optional[str], stage: str, seconds: float):
+        pass
+
+    def count(self, source: Optional[str], name: str, value: int = 1):
+        pass
+
+
+class LoggingListener(Listener):
+    def __init__(self, level=logging.DEBUG):
+        self.level = level
+
+    def timing(self, source, stage, seconds):
+        logger.log(self.level, f"{source}.{stage} took {seconds * 1000:.1f}ms")
+
+    def count(self, source, name, value=1):
+        logger.log(self.level, f"{source}.{name} += {value}")
+
+
+class StatsDListener(Listener):
+    """
+    Sends events as StatsD timers and counters over UDP, e.g. ``newslib.ynet.fetch:12.5|ms``.
+    """
+
+    def __init__(self, host="localhost", port=8125, prefix="newslib"):
+        self.address = (host, port)
+        self.prefix = prefix
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def _send(self, line: str):
+        try:
+            self._socket.sendto(line.encode(), self.address)
+        except OSError as e:
+            logger.debug(f"Couldn't send metric to {self.address}: {e!r}")
+
+    def _name(self, source: Optional[str], name: str) -> str:
+        return ".".join(part for part in (self.prefix, source, name) if part)
+
+    def timing(self, source, stage, seconds):
+        self._send(f"{self._name(source, stage)}:{seconds * 1000:.3f}|ms")
+
+    def count(self, source, name, value=1):
+        self._send(f"{self._name(source, name)}:{value}|c")
+
+    def close(self):
+        self._socket.close()
+
+
+class PrometheusListener(Listener):
+    """
+    Aggregates events in memory and renders them in the Prometheus text exposition format.
+    """
+
+    def __init__(self, prefix="newslib"):
+        self.prefix = prefix
+        self._lock = Lock()
+        self.seconds: dict[tuple[str, str], float] = defaultdict(float)
+        self.calls: dict[tuple[str, str], int] = defaultdict(int)
+        self.counters: dict[tuple[str, str], int] = defaultdict(int)
+
+    def timing(self, source, stage, seconds):
+        with self._lock:
+            self.seconds[source or "", stage] += seconds
+            self.calls[source or "", stage] += 1
+
+    def count(self, source, name, value=1):
+        with self._lock:
+            self.counters[source or "", name] += value
+
+    def render(self) -> str:
+        lines = []
+
+        with self._lock:
+            for metric, values, help_text in (
+                    ("stage_seconds_total", self.seconds, "Seconds spent per source and stage"),
+                    ("stage_calls_total", self.calls, "Timed calls per source and stage"),
+            ):
+                lines.append(f"# HELP {self.prefix}_{metric} {help_text}")
+                lines.append(f"# TYPE {self.prefix}_{metric} counter")
+                for (source, stage), value in sorted(values.items()):
+                    lines.append(f'{self.prefix}_{metric}{{source="{source}",stage="{stage}"}} {value}')
+
+            for name in sorted({name for _, name in self.counters}):
+                lines.append(f"# TYPE {self.prefix}_{name}_total counter")
+                for (source, counter), value in sorted(self.counters.items()):
+                    if counter == name:
+                        lines.append(f'{self.prefix}_{name}_total{{source="{source}"}} {value}')
+
+        return "\n".join(lines) + "\n"
+
+
+_NO_OP = Listener()
+_listener: Listener = _NO_OP
+
+
+def get_listener() -> Listener:
+    return _listener
+
+
+def set_listener(listener: Optional[Listener]) -> Listener:
+    """
+    Install the listener every instrumentation event goes to, None to restore the no-op default.
+
+    :return: The previously installed listener
+    """
+    global _listener
+
+    previous, _listener = _listener, _NO_OP if listener is None else listener
+    return previous
+
+
+def count(source: Optional[str], name: str, value: int = 1):
+    if _listener is not _NO_OP:
+        _listener.count(source or _current_source.get(), name, value)
+
+
+@contextmanager
+def timed(source: Optional[str], stage: str) -> Iterator[None]:
+    """
+    Time the block as a stage of source, counting ``<stage>_errors`` if it raises
+    """
+    active = _active_stages.get()
+    if _listener is _NO_OP or stage in active:
+        yield
+        return
+
+    source = source or _current_source.get()
+    stages_token = _active_stages.set(active | {stage})
+    source_token = _current_source.set(source)
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        _listener.count(source, f"{stage}_errors")
+        raise
+    finally:
+        _current_source.reset(source_token)
+        _active_stages.reset(stages_token)
+        _listener.timing(source, stage, time.perf_counter() - started)
+
+
+def instrumented(stage: str):
+    """
+    Time a Source method as a stage of its source
+    """
+
+    def decorator(method):
+        if getattr(method, "__newslib_stage__", None) == stage:
+            return method
+
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if _listener is _NO_OP:
+                return method(self, *args, **kwargs)
+
+            with timed(self.name, stage):
+                return method(self, *args, **kwargs)
+
+        wrapper.__newslib_stage__ = stage
+
+        return wrapper
+
+    return decorator
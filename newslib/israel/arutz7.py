@@ -1,13 +1,21 @@
+import asyncio
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Union
+from typing import Iterable, Union
 
 from bs4 import Tag
 
+from newslib.coalesce import Coalescer
+from newslib.instrumentation import DECODE, FETCH, timed
+from newslib.payload import json_value
 from newslib.source import Source
 
 
 class Arutz7Source(Source):
+    # Item API lookups shared by every caller: category, times and headline of an article all read the same item
+    item_data = Coalescer(ttl=60, source="arutz7")
+
     def __init__(self):
         super().__init__(
             name="arutz7",
@@ -16,59 +24,171 @@ class Arutz7Source(Source):
             rss_news_flashes="https://www.inn.co.il/Rss.aspx",
         )
 
+    @staticmethod
+    def get_article_id(url):
+        return url.split("/")[-1]
+
+    @staticmethod
+    def get_article_data_url(url):
+        article_id = Arutz7Source.get_article_id(url)
+        return f"https://www.inn.co.il/api/NewAPI/Item?type=0&Item={article_id}&preview=0"
+
     @staticmethod
     def get_article_data(url):
-        article_id = url.split("/")[-1]
-        article_data_url = f"https://www.inn.co.il/api/NewAPI/Item?type=0&Item={article_id}&preview=0"
+        def fetch():
+            with timed("arutz7", FETCH):
+                data, _ = Source.get_content(Arutz7Source.get_article_data_url(url))
 
-        data, _ = Source.get_content(article_data_url)
-        data = json.loads(data)
+            with timed("arutz7", DECODE):
+                return json.loads(data)
 
-        return data
+        return Arutz7Source.item_data.get(Arutz7Source.get_article_id(url), fetch)
 
-    def get_root_content(self):
-        root_content = super().get_root_content()
-        return json.loads(root_content)
+    @staticmethod
+    async def get_article_data_async(url):
+        async def fetch():
+            with timed("arutz7", FETCH):
+                data, _ = await Source.get_content_async(Arutz7Source.get_article_data_url(url))
 
-    def get_top_article_a(self, root_content: Union[str, bytes, Tag] = None) -> Tag:
-        article_obj = root_content["data"]["Page"][0]["Items"][0]
+            with timed("arutz7", DECODE):
+                return json.loads(data)
+
+        return await Arutz7Source.item_data.get_async(Arutz7Source.get_article_id(url), fetch)
+
+    @staticmethod
+    def get_articles_data(urls: Iterable[str], max_workers=4) -> dict[str, Union[dict, Exception]]:
+        """
+        Fetch the item data of many articles concurrently
+
+        :return: url -> item data, or the Exception that fetching it raised
+        """
+        def fetch(url):
+            try:
+                return Arutz7Source.get_article_data(url)
+            except Exception as e:
+                return e
+
+        urls = list(dict.fromkeys(urls))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(zip(urls, executor.map(fetch, urls)))
+
+    @staticmethod
+    async def get_articles_data_async(urls: Iterable[str]) -> dict[str, Union[dict, Exception]]:
+        urls = list(dict.fromkeys(urls))
+        results = await asyncio.gather(
+            *(Arutz7Source.get_article_data_async(url) for url in urls),
+            return_exceptions=True,
+        )
+
+        return dict(zip(urls, results))
+
+    def fetch_document(self, url):
+        """
+        Arutz7 articles are read from the item API, so an article's document is its item data rather than its HTML
+        """
+        return self.get_article_data(url), url
+
+    async def fetch_document_async(self, url):
+        return await self.get_article_data_async(url), url
+
+    def get_document_url(self, url):
+        return self.get_article_data_url(url)
+
+    def load_document(self, content, url=None, parse_only=None):
+        with timed(self.name, DECODE):
+            return json.loads(content)
+
+    def get_page(self, url, html=None):
+        if not isinstance(html, dict):
+            html = None
+
+        return super().get_page(url, html)
+
+    async def get_page_async(self, url, html=None):
+        if not isinstance(html, dict):
+            html = None
+
+        return await super().get_page_async(url, html)
+
+    def get_html(self, url, html=None):
+        """
+        The article's HTML page, as before the item API became Arutz7's document
+        """
+        if html is None or isinstance(html, dict):
+            content, url = self.fetch_content(url)
+            html = self.parse_html(content)
+
+        return html, url
+
+    def load_root_content(self, content):
+        with timed(self.name, DECODE):
+            return json.loads(content)
+
+    def get_front_page_region(self, content):
+        # Sliced out of the payload rather than decoding all of it, like News13's PageGrid
+        items = json_value(content, "Items", max(content.find(b'"Page":'), 0))
+
+        return content if items is None else items[1]
+
+    @staticmethod
+    def get_items(root_content) -> list[dict]:
+        """
+        :return: The top article's item followed by the substories' items
+        """
+        return root_content["data"]["Page"][0]["Items"][:5]
+
+    @staticmethod
+    def get_item_title(item: dict) -> str:
+        return f"{item['title2']} {item['short']}"
+
+    @staticmethod
+    def create_a(item: dict) -> Tag:
         a = Tag(
             name="a",
             attrs={
-                "href": article_obj["shotedLink"]
+                "href": item["shotedLink"]
             }
         )
-        a.string = f"{article_obj['title2']} {article_obj['short']}"
+        a.string = Arutz7Source.get_item_title(item)
 
         return a
 
-    def get_substories_a(self, root_content: Union[str, bytes, Tag] = None) -> list[Tag]:
-        substories = root_content["data"]["Page"][0]["Items"][1:5]
-        a_list = []
-        for substory in substories:
-            a = Tag(
-                name="a",
-                attrs={
-                    "href": substory["shotedLink"]
-                }
-            )
-            a.string = f"{substory['title2']} {substory['short']}"
-            a_list.append(a)
+    def get_headlines(self, root_content=None, fetch_articles=True):
+        if root_content is None:
+            root_content = self.get_root_content()
+
+        return [
+            self.create_headline(item["shotedLink"], self.get_item_title(item).strip(), position)
+            for position, item in enumerate(self.get_items(root_content))
+        ]
 
-        return a_list
+    def get_top_article_a(self, root_content: Union[str, bytes, Tag] = None) -> Tag:
+        if root_content is None:
+            root_content = self.get_root_content()
+
+        return self.create_a(self.get_items(root_content)[0])
 
+    def get_substories_a(self, root_content: Union[str, bytes, Tag] = None) -> list[Tag]:
+        if root_content is None:
+            root_content = self.get_root_content()
+
+        return [self.create_a(item) for item in self.get_items(root_content)[1:]]
 
     def valid_substory(self, a):
         return a.attrs["href"].lower().startswith("/news/")
 
     def get_category(self, url, html=None):
-        data = self.get_article_data(url)
+        data, url = self.get_page(url, html)
         return data["catname"]
 
     def get_times(self, url, html=None):
-        data = self.get_article_data(url)
+        data, url = self.get_page(url, html)
         return datetime.fromisoformat(data["itemDate"]), datetime.fromisoformat(data["firstUpdate"])
 
+    def get_article_headline(self, url, html=None):
+        data, url = self.get_page(url, html)
+        return data.get("title")
+
     @property
     def top_article_selector(self) -> str:
         return ""
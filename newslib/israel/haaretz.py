@@ -1,6 +1,7 @@
 from datetime import datetime
 from urllib.parse import urlparse
 
+from newslib.rss import children
 from newslib.source import Source
 
 
@@ -34,33 +35,33 @@ class HaaretzSource(Source):
         return ".premium" in url
 
     def get_rss_item_tags(self, item):
-        return [tag.text.strip() for tag in item.select(self.rss_tags_name)]
+        return [tag.text.strip() for tag in children(item, self.rss_tags_name) if tag.text]
 
-    def get_headline(self, a, top_article=False):
+    def get_headline(self, a, top_article=False, html=None):
         if top_article:
             return a.select_one("h1").text
 
         return (a.select_one("h2 > span") or a.select_one("h2")).text
 
     def get_times(self, url, html=None):
-        html, url = self.get_html(url, html)
+        page, url = self.get_page(url, html)
 
-        published = html.select_one(self.published_selector)
-        if published.has_attr("datetime"):
-            published = datetime.strptime(published.attrs["datetime"], "%Y-%m-%dT%H:%M:%S%z")
+        published = self.parser.select_one(page, self.published_selector)
+        if (published_text := self.parser.attr(published, "datetime")) is not None:
+            published = datetime.strptime(published_text, "%Y-%m-%dT%H:%M:%S%z")
 
         return published, None
 
     def get_category(self, url, html=None):
-        html, url = self.get_html(url, html)
+        page, url = self.get_page(url, html)
 
-        nav = html.select_one(self.category_selector)
+        nav = self.parser.select_one(page, self.category_selector)
         if nav is None:
             return None
 
-        breadcrumbs = nav.select("a")
+        breadcrumbs = self.parser.select(nav, "a")
 
         if urlparse(url).path.startswith("/news/"):
-            return breadcrumbs[1].text
+            return self.parser.text(breadcrumbs[1])
 
-        return breadcrumbs[0].text
+        return self.parser.text(breadcrumbs[0])
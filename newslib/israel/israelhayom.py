@@ -1,9 +1,9 @@
 import json
 from datetime import datetime
 
-from bs4 import BeautifulSoup
 from bs4.element import Tag
 
+from newslib.document import get_document
 from newslib.source import Source
 
 
@@ -49,17 +49,20 @@ class IsraelHayomSource(Source):
             root_content = self.get_root_content()
 
         if not isinstance(root_content, Tag):
-            root_content = BeautifulSoup(root_content, "lxml")
+            root_content = get_document(root_content)
 
-        if len(root_content.body) == 0:
-            raise Exception("Empty body received")
+            if not root_content.content.strip():
+                raise Exception("Empty body received")
 
-        return root_content.select(".posts-main-gallery .row article")
+        return self.parser.select(root_content, ".posts-main-gallery .row article")
+
+    def get_post_a(self, post) -> Tag:
+        return self.parser.to_tag(self.parser.select_one(post, "a:has(> span.titleText)"))
 
     def get_top_article_a(self, root_content=None) -> Tag:
         posts = self.get_posts(root_content)
 
-        return posts[0].select_one("a:has(> span.titleText)")
+        return self.get_post_a(posts[0])
 
     def get_substories_a(self, root_content=None) -> list[Tag]:
         posts = self.get_posts(root_content)
@@ -68,15 +71,18 @@ class IsraelHayomSource(Source):
 
         substories = []
         for article in posts:
-            substories.append(article.select_one("a:has(> span.titleText)"))
+            substories.append(self.get_post_a(article))
 
         return substories
 
     def get_times(self, url, html=None):
-        html, url = self.get_html(url, html)
+        page, url = self.get_page(url, html)
+
+        published = self.parser.select_one(page, self.published_selector)
+        last_updated = self.parser.select_one(page, ".single-post-meta-dates time:last-child")
 
-        published_timestamp: str = html.select_one(self.published_selector).attrs["datetime"]
-        last_updated = html.select_one(".single-post-meta-dates time:last-child").attrs["datetime"]
+        published_timestamp: str = self.parser.attr(published, "datetime")
+        last_updated = self.parser.attr(last_updated, "datetime")
         last_updated = datetime.strptime(last_updated.strip(), "%Y-%m-%dT%H:%M:%S.000Z")
         published = datetime.strptime(published_timestamp.strip(), "%Y-%m-%dT%H:%M:%S.000Z")
 
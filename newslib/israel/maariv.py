@@ -1,11 +1,15 @@
 from datetime import datetime
 from json import loads
-from urllib.parse import urlparse
+from urllib.parse import urljoin, urlparse
 
-from newslib.source import Source
+from bs4 import SoupStrainer
+
+from newslib.source import Region, Source
 
 
 class MaarivSource(Source):
+    top_headline_from_article = True
+
     def __init__(self):
         super().__init__(
             name="maariv",
@@ -22,6 +26,11 @@ class MaarivSource(Source):
         self.json_metadata_selector = "head > script[type='application/ld+json']"
         self.article_metadata_index = 1
 
+        # The times are read from the ld+json metadata, all of which is in the head
+        self.regions = {
+            "times": Region((b"</head>",), SoupStrainer("head")),
+        }
+
     @property
     def top_article_selector(self) -> str:
         return ".top-story-img-big > a"
@@ -38,21 +47,30 @@ class MaarivSource(Source):
     def published_selector(self) -> str:
         return ".article-publish-date"
 
-    def get_headline(self, a, top_article=False):
+    def get_headline(self, a, top_article=False, html=None):
         if top_article:
-            html, _ = self.get_html(self.root + a.attrs["href"])
-            title = html.select_one("section.article-title").text.strip()
-            return title
+            # The top story's link has no title, so it's read from the article (html, when it was already fetched)
+            return self.get_article_headline(urljoin(self.root, a.attrs["href"]), html)
 
         return a.select_one(".three-articles-in-row-title").text.strip()
 
+    def get_article_headline(self, url, html=None):
+        page, url = self.get_page(url, html)
+
+        title = self.parser.select_one(page, "section.article-title")
+        if title is not None:
+            return self.parser.text(title).strip()
+
+        return super().get_article_headline(url, page)
+
     def get_times(self, url, html=None):
-        html, url = self.get_html(url, html)
+        page, url = self.get_page(url, html)
 
-        article_metadatas = html.select(self.json_metadata_selector)
+        article_metadatas = self.parser.select(page, self.json_metadata_selector)
 
         for metadata_tag in article_metadatas:
-            metadata = loads(metadata_tag.string.strip().replace("\r\n", "").replace("&quot;", "\\\""))
+            metadata_text = self.parser.text(metadata_tag)
+            metadata = loads(metadata_text.strip().replace("\r\n", "").replace("&quot;", "\\\""))
 
             if "@type" in metadata and metadata["@type"] == "NewsArticle":
                 published = datetime.fromisoformat(metadata["datePublished"])
@@ -63,7 +81,7 @@ class MaarivSource(Source):
         raise Exception(f"Couldn't get times for {url}")
 
     def get_category(self, url, html=None):
-        html, url = self.get_html(url, html)
+        html, url = self.get_page(url, html)
 
         if urlparse(url).netloc.startswith("sport1."):
             return "ספורט"
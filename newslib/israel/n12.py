@@ -27,11 +27,11 @@ class N12Source(Source):
         return ".writer-data > span.display-date"
 
     def get_times(self, url, html=None):
-        html, url = self.get_html(url, html)
+        page, url = self.get_page(url, html)
 
-        published = html.select_one(self.published_selector)
+        published = self.parser.select_one(page, self.published_selector)
 
-        spans = [span.text for span in published.find_all("span")]
+        spans = [self.parser.text(span) for span in self.parser.select(published, "span")]
 
         published = " ".join([spans[0], spans[1]]).replace("|", "").replace("פורסם", "").strip()
         published = datetime.strptime(published, "%d/%m/%y %H:%M")
@@ -36,9 +36,9 @@ class News0404Source(Source):
                "div.article_section > div.post_meta.cf > div.post_date"
 
     def get_times(self, url, html=None):
-        html, url = self.get_html(url, html)
-        
-        published_text: str = normalize("NFKD", html.select_one(self.published_selector).text)
+        page, url = self.get_page(url, html)
+
+        published_text: str = normalize("NFKD", self.parser.text(self.parser.select_one(page, self.published_selector)))
         last_updated = None
         published = datetime.strptime(published_text.strip(), "%d/%m/%Y %H:%M")
 
@@ -1,22 +1,82 @@
+import asyncio
 import json
+import os
 import re
+import time
 from datetime import datetime
-from functools import lru_cache
+from pathlib import Path
+from threading import Lock, Thread
+from typing import Optional
 
-from bs4 import BeautifulSoup
 from bs4.element import Tag
 
-from newslib.source import Source
+from newslib import logger
+from newslib.document import Document, document_cached
+from newslib.instrumentation import DECODE, timed
+from newslib.payload import json_value, script_by_id
+from newslib.source import Region, Source
+
+
+def _default_root_cache_path() -> Path:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "newslib" / "news13_root.json"
+
+
+class _DefaultRootCachePath:
+    """
+    Resolves the default root_cache_path when it's read, rather than looking up the home directory at import
+    """
+
+    def __get__(self, instance, owner) -> Path:
+        return _default_root_cache_path()
 
 
 class News13Source(Source):
+    raw_documents = True
+    # Seconds a resolved root is used before it's refreshed in the background
+    root_ttl = 6 * 60 * 60
+    # Seconds before resolution is retried after it failed
+    root_retry = 60
+    # Where the resolved root is persisted between restarts (under XDG_CACHE_HOME or ~/.cache unless set), None to keep
+    # it in memory only
+    root_cache_path: Optional[Path] = _DefaultRootCachePath()
+
     def __init__(self):
+        self._root_lock = Lock()
+        self._resolved_root: Optional[str] = None
+        self._root_expires = 0.0
+        self._root_refresh: Optional[Thread] = None
+
         super().__init__(
             name="news13",
             root="https://13news.co.il/",
         )
 
-        self.root = self._update_root()
+        post_data = Region((b'id="__NEXT_DATA__"', b"</script>"))
+        self.regions = {"times": post_data, "category": post_data}
+
+    @property
+    def root(self) -> str:
+        """
+        The site's baseUrl, resolved from the entry page on first use rather than on construction
+        """
+        return self.resolve_root()
+
+    @root.setter
+    def root(self, entry_url: str):
+        self.entry_url = entry_url
+
+        with self._root_lock:
+            self._resolved_root = None
+            self._root_expires = 0.0
+
+    def use_root(self, root: str):
+        """
+        Take a root resolved elsewhere as fresh, without fetching the entry page or persisting it
+        """
+        with self._root_lock:
+            self._resolved_root = root
+            self._root_expires = time.time() + self.root_ttl
 
     @property
     def top_article_selector(self) -> str:
@@ -35,11 +95,106 @@ class News13Source(Source):
         raise NotImplementedError
 
     def _update_root(self):
-        html = self.get_root_content()
-        data = self.get_data(html)
+        content, url = self.fetch_content(self.entry_url)
+        data = self.get_data(Document(content, url, source=self.name))
 
         return data.get("props").get("pageProps").get("baseUrl")
 
+    def _load_root(self) -> Optional[tuple[str, float]]:
+        if self.root_cache_path is None:
+            return None
+
+        try:
+            with open(self.root_cache_path) as f:
+                cached = json.load(f)
+
+            if cached.get("entry_url") != self.entry_url:
+                return None
+
+            return cached["root"], cached["resolved"] + self.root_ttl
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            # Unreadable or malformed, so resolve the root again (which rewrites it)
+            logger.debug(f"Ignoring persisted {self.name} root: {e!r}")
+            return None
+
+    def _store_root(self, root: str, resolved: float):
+        if self.root_cache_path is None:
+            return
+
+        path = Path(self.root_cache_path)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = path.with_suffix(".tmp")
+            temporary.write_text(json.dumps({"entry_url": self.entry_url, "root": root, "resolved": resolved}))
+            os.replace(temporary, path)
+        except OSError as e:
+            logger.warning(f"Couldn't persist {self.name} root: {e!r}")
+
+    def refresh_root(self) -> str:
+        """
+        Resolve the root from the entry page now, falling back to the previous root (or the entry URL) on failure
+        """
+        try:
+            root = self._update_root()
+            if not root:
+                raise Exception("Malformed JSON (missing baseUrl)")
+        except Exception as e:
+            logger.error(f"Couldn't resolve {self.name} root: {e!r}")
+
+            with self._root_lock:
+                if self._resolved_root is None:
+                    self._resolved_root = self.entry_url
+                self._root_expires = time.time() + self.root_retry
+
+                return self._resolved_root
+
+        resolved = time.time()
+        self._store_root(root, resolved)
+
+        with self._root_lock:
+            self._resolved_root = root
+            self._root_expires = resolved + self.root_ttl
+
+        return root
+
+    def _refresh_root_in_background(self):
+        with self._root_lock:
+            if self._root_refresh is not None and self._root_refresh.is_alive():
+                return
+
+            self._root_refresh = Thread(target=self.refresh_root, name=f"{self.name}-root", daemon=True)
+            self._root_refresh.start()
+
+    def resolve_root(self) -> str:
+        """
+        :return: The cached root, refreshing it in the background once stale. Only the first resolution (with nothing
+                 persisted) blocks on the network
+        """
+        with self._root_lock:
+            if self._resolved_root is None and (persisted := self._load_root()) is not None:
+                self._resolved_root, self._root_expires = persisted
+
+            root, expires = self._resolved_root, self._root_expires
+
+        if root is None:
+            return self.refresh_root()
+
+        if time.time() >= expires:
+            self._refresh_root_in_background()
+
+        return root
+
+    async def resolve_root_async(self) -> str:
+        if self._resolved_root is not None:
+            return self.resolve_root()
+
+        return await asyncio.to_thread(self.resolve_root)
+
+    async def get_root_content_async(self):
+        await self.resolve_root_async()
+
+        return await super().get_root_content_async()
+
     def get_times(self, url, html=None):
         post_data = self.get_post_data(url, html)
 
@@ -53,23 +208,30 @@ class News13Source(Source):
 
         return published, updated
 
-    @lru_cache(maxsize=10)
-    def get_data(self, html: str):
-        html = BeautifulSoup(html, "lxml")
-        script = html.find("script", attrs={"id": "__NEXT_DATA__"})
-        script = script.contents[0]
+    @document_cached
+    def get_data(self, document: Document):
+        script = script_by_id(document.content, "__NEXT_DATA__")
+        if script is None:
+            raise Exception("Couldn't find __NEXT_DATA__")
+
+        with timed(self.name, DECODE):
+            return json.loads(script)
+
+    def get_front_page_region(self, content):
+        script = script_by_id(content, "__NEXT_DATA__")
+        page_grid = None if script is None else json_value(script, "PageGrid")
 
-        return json.loads(str(script))
+        return content if page_grid is None else page_grid[1]
 
     def get_post_data(self, url, html=None):
-        html, url = self.get_html(url, html)
-        data = self.get_data(str(html))
+        document, url = self.get_raw(url, html)
+        data = self.get_data(document)
 
         return data.get("props").get("pageProps").get("page").get("Content").get("Item")
 
-    @lru_cache(maxsize=10)
-    def get_substories(self, html: str):
-        data = self.get_data(html).get("props").get("pageProps").get("page").get("Content").get("PageGrid")
+    @document_cached
+    def get_substories(self, document: Document):
+        data = self.get_data(document).get("props").get("pageProps").get("page").get("Content").get("PageGrid")
 
         standard_four = next(filter(lambda grid_item: grid_item["grid_type"] == "standard_four", data))
 
@@ -82,9 +244,9 @@ class News13Source(Source):
 
         return posts
 
-    @lru_cache(maxsize=10)
-    def get_top_article(self, html: str):
-        data = self.get_data(html).get("props").get("pageProps").get("page").get("Content").get("PageGrid")
+    @document_cached
+    def get_top_article(self, document: Document):
+        data = self.get_data(document).get("props").get("pageProps").get("page").get("Content").get("PageGrid")
 
         main_standard = next(filter(lambda grid_item: grid_item["grid_type"] == "MainStandard", data))
 
@@ -109,15 +271,20 @@ class News13Source(Source):
 
         return a
 
-    def get_top_article_a(self, root_content=None) -> Tag:
+    def get_headlines(self, root_content=None, fetch_articles=True):
         if root_content is None:
             root_content = self.get_root_content()
 
-        elif isinstance(root_content, Tag):
-            root_content = str(root_content)
+        articles = [self.get_top_article(root_content), *self.get_substories(root_content)]
+
+        return [
+            self.create_headline(article["link"], article["title"].strip(), position)
+            for position, article in enumerate(articles)
+        ]
 
-        elif isinstance(root_content, bytes):
-            root_content = root_content.decode()
+    def get_top_article_a(self, root_content=None) -> Tag:
+        if root_content is None:
+            root_content = self.get_root_content()
 
         top_article = self.get_top_article(root_content)
 
@@ -127,12 +294,6 @@ class News13Source(Source):
         if root_content is None:
             root_content = self.get_root_content()
 
-        elif isinstance(root_content, Tag):
-            root_content = str(root_content)
-
-        elif isinstance(root_content, bytes):
-            root_content = root_content.decode()
-
         articles = self.get_substories(root_content)
         if len(articles) < 4:
             raise Exception("Articles list too short")
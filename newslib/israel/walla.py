@@ -1,16 +1,24 @@
 import json
 import re
 from datetime import datetime
-from functools import lru_cache
+from hashlib import blake2b
 from urllib.parse import unquote
 
 from bs4.element import Tag
-from lzstring import LZString
 
-from newslib.source import Source
+from newslib.coalesce import Coalescer
+from newslib.document import Document, document_cached
+from newslib.instrumentation import DECODE, timed
+from newslib.lz import decompress_from_base64
+from newslib.payload import find_between
+from newslib.source import Region, Source
 
 
 class WallaSource(Source):
+    raw_documents = True
+    # Decompressed loadDataState payloads by hash of the compressed blob, shared by every WallaSource
+    decompressed_states = Coalescer(ttl=60 * 60, max_entries=64, source="walla")
+
     def __init__(self):
         super().__init__(
             name="walla",
@@ -23,7 +31,10 @@ class WallaSource(Source):
                           "section > article > section.tags.target-editorial > ul > li > a",
         )
 
-        self.data_query_re = re.compile(r"window\.loadDataState = \"(?P<data>.+?)\"")
+        self.data_marker = b'window.loadDataState = "'
+
+        post_data = Region((self.data_marker, b'"'))
+        self.regions = {"times": post_data, "category": post_data}
 
     @property
     def top_article_selector(self) -> str:
@@ -41,27 +52,40 @@ class WallaSource(Source):
     def published_selector(self) -> str:
         raise NotImplementedError
 
-    @lru_cache(maxsize=10)
-    def get_data(self, html: str):
-        match = re.search(self.data_query_re, html)
-        if not match:
+    @document_cached
+    def get_data(self, document: Document):
+        compressed = find_between(document.content, self.data_marker, b'"')
+        if not compressed:
             raise Exception("Couldn't extract article data")
 
-        data = LZString().decompressFromBase64(match["data"])
-        data = unquote(data)
-        return json.loads(data)
+        with timed(self.name, DECODE):
+            return json.loads(self.decompress_state(compressed))
+
+    @staticmethod
+    def decompress_state(compressed: bytes) -> str:
+        """
+        :return: The decompressed, unquoted loadDataState, computed once per distinct compressed blob
+        """
+        return WallaSource.decompressed_states.get(
+            blake2b(compressed, digest_size=16).digest(),
+            lambda: unquote(decompress_from_base64(compressed.decode())),
+        )
+
+    def get_front_page_region(self, content):
+        # The editor events are only reachable by decompressing the state, so fingerprint the compressed blob
+        return find_between(content, self.data_marker, b'"') or content
 
     def get_post_data(self, url: str, html=None):
-        html, url = self.get_html(url, html)
-        data = self.get_data(str(html))
+        document, url = self.get_raw(url, html)
+        data = self.get_data(document)
 
         article_id = re.match(r"https://news\.walla\.co\.il/item/(?P<id>\d+)", url)["id"]
 
         return data.get(f"Item_{article_id}").get("data").get("item").get("data")
 
-    @lru_cache(maxsize=10)
-    def get_articles(self, html: str):
-        data = self.get_data(html)
+    @document_cached
+    def get_articles(self, document: Document):
+        data = self.get_data(document)
 
         articles = data.get("***Editor_3").get("data").get("editor").get("data").get("events")
         if not articles:
@@ -81,15 +105,18 @@ class WallaSource(Source):
 
         return a
 
-    def get_top_article_a(self, root_content=None):
+    def get_headlines(self, root_content=None, fetch_articles=True):
         if root_content is None:
             root_content = self.get_root_content()
 
-        elif isinstance(root_content, Tag):
-            root_content = str(root_content)
+        return [
+            self.create_headline(article["canonical"]["url"], article["title"].strip(), position)
+            for position, article in enumerate(self.get_articles(root_content))
+        ]
 
-        elif isinstance(root_content, bytes):
-            root_content = root_content.decode()
+    def get_top_article_a(self, root_content=None):
+        if root_content is None:
+            root_content = self.get_root_content()
 
         articles = self.get_articles(root_content)
         if len(articles) < 1:
@@ -101,20 +128,12 @@ class WallaSource(Source):
         if root_content is None:
             root_content = self.get_root_content()
 
-        elif isinstance(root_content, Tag):
-            root_content = str(root_content)
-
-        elif isinstance(root_content, bytes):
-            root_content = root_content.decode()
-
         articles = self.get_articles(root_content)
         if len(articles) < 1:
             raise Exception("Articles list too short")
 
-        articles.pop(0)
-
         substories = []
-        for article in articles:
+        for article in articles[1:]:
             substories.append(self.create_a(article))
 
         return substories
@@ -2,15 +2,19 @@ import ast
 import json
 import re
 from datetime import datetime
-from functools import lru_cache
 from unicodedata import normalize
 
 from bs4 import BeautifulSoup, Tag
 
-from newslib.source import Source
+from newslib.document import Document, document_cached, get_document
+from newslib.instrumentation import DECODE, timed
+from newslib.payload import component_regions, find_between, meta_content
+from newslib.source import Region, Source
 
 
 class YnetSource(Source):
+    raw_documents = True
+
     def __init__(self):
         super().__init__(
             name="ynet",
@@ -30,14 +34,30 @@ class YnetSource(Source):
             ".TopStory1280Componenta"
         ]
 
-        self.data_query_re = re.compile(r"dataLayer = \[(?P<data>.+?)\];", flags=re.DOTALL)
+        self.data_start_marker = b"dataLayer = ["
+        self.data_end_marker = b"];"
+
+        self.regions = {
+            "category": Region((b"</head>",)),
+            "times": Region((self.data_start_marker, self.data_end_marker)),
+        }
 
     def get_top_article_a(self, root_content=None):
         if root_content is None:
             root_content = self.get_root_content()
 
         if not isinstance(root_content, Tag):
-            root_content = BeautifulSoup(root_content, "lxml")
+            content = get_document(root_content).content
+
+            # Fast path: only parse the top story component rather than the whole front page
+            for top_article_selector in self.top_article_selectors:
+                for region in component_regions(content, top_article_selector.lstrip(".")):
+                    top_article_a = BeautifulSoup(region, "lxml").select_one(f"{top_article_selector} a")
+
+                    if top_article_a is not None:
+                        return top_article_a
+
+            root_content = BeautifulSoup(content, "lxml")
 
         for top_article_selector in self.top_article_selectors:
             if (top_article_div := root_content.select_one(top_article_selector)) is not None:
@@ -48,17 +68,46 @@ class YnetSource(Source):
 
         raise Exception("Could not find top article")
 
+    def get_front_page_region(self, content):
+        class_names = [selector.lstrip(".") for selector in self.top_article_selectors]
+        class_names.append("YnetMultiStripRowsComponenta")
+
+        region = b"".join(region for class_name in class_names for region in component_regions(content, class_name))
+        return region or content
+
     @property
     def substories_selector(self) -> str:
         return ".YnetMultiStripRowsComponenta .textDiv a"
 
+    def get_substories_a(self, root_content=None):
+        if root_content is None:
+            root_content = self.get_root_content()
+
+        if not isinstance(root_content, Tag):
+            content = get_document(root_content).content
+
+            # Fast path: only parse the substories components rather than the whole front page
+            regions = b"".join(component_regions(content, "YnetMultiStripRowsComponenta"))
+            if regions:
+                substories = BeautifulSoup(regions, "lxml").select(self.substories_selector)
+
+                if substories:
+                    return substories
+
+            root_content = content
+
+        return super().get_substories_a(root_content)
+
+    def is_block_page(self, content: bytes) -> bool:
+        return b'id="lblCase"' in content
+
     def check_rss_error(self, feed: BeautifulSoup):
         error = feed.find(id="lblCase")
 
         if error:
             raise Exception(f"Blocked. Case number {error.text}")
 
-    def get_headline(self, a, top_article=False):
+    def get_headline(self, a, top_article=False, html=None):
         title_div = a.select_one(".title")
         if title_div:
             headline_text = title_div.text.strip()
@@ -72,24 +121,24 @@ class YnetSource(Source):
         return "/fashion/" not in href and "/parents/" not in href and "/blogs/" not in href
 
     def is_premium(self, url, html=None):
-        html, url = self.get_html(url, html)
+        page, url = self.get_page(url, html)
 
-        return html.select_one(self.premium_selector) is not None
+        return self.parser.select_one(page, self.premium_selector) is not None
 
     def get_category(self, url, html=None):
-        html, url = self.get_html(url, html)
+        document, url = self.get_raw(url, html)
 
-        category_meta = html.find("meta", attrs={"property": "sub-channel-name"})
+        category = meta_content(document.content, "property", "sub-channel-name")
 
-        if category_meta is None:
+        if category is None:
             raise Exception("Could not find category meta tag")
 
-        return category_meta.attrs["content"].split("/")[-1]
+        return category.split("/")[-1]
 
     def get_times(self, url, html=None):
-        html, url = self.get_html(url, html)
+        document, url = self.get_raw(url, html)
 
-        data = self.get_data(str(html))
+        data = self.get_data(document)
         published_text: str = data["datePublished"]
         updated_text: str = data["dateModified"]
 
@@ -101,16 +150,16 @@ class YnetSource(Source):
 
         return published, last_updated
 
-    @lru_cache(maxsize=10)
-    def get_data(self, html: str):
-        match = re.search(self.data_query_re, html)
-        if not match:
+    @document_cached
+    def get_data(self, document: Document):
+        data = find_between(document.content, self.data_start_marker, self.data_end_marker)
+        if data is None:
             raise Exception("Couldn't extract article data")
 
         data_text = re.sub(
             r"'userId': window\.YitPaywall && YitPaywall\.user && YitPaywall\.user\.props \? YitPaywall\.user\.props\.userId : \'\'.+?,",
             "",
-            match["data"],
+            data.decode(),
             flags=re.DOTALL,
         )
 
@@ -128,4 +177,5 @@ class YnetSource(Source):
             flags=re.DOTALL,
         )
 
-        return ast.literal_eval(data_text)
+        with timed(self.name, DECODE):
+            return ast.literal_eval(data_text)
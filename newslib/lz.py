@@ -0,0 +1,94 @@
+from typing import Optional
+
+BASE64_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+
+# Each base64 character as the 6 bits LZString reads from it, most significant first. "=" padding reads as zeros
+_BASE64_BITS = str.maketrans({**{c: format(i, "06b") for i, c in enumerate(BASE64_ALPHABET)}, "=": "000000"})
+
+# Zero bits appended to the stream, so reads near its end never need bounds checks
+_PADDING = 64
+
+
+def decompress_from_base64(compressed: Optional[str]) -> Optional[str]:
+    """
+    Drop-in equivalent of ``lzstring.LZString.decompressFromBase64``.
+
+    The whole input is expanded into one string of bits up front (a single str.translate), reversed so that every
+    little-endian read of n bits is a single slice parsed with int(..., 2), and the dictionary is a list. This replaces
+    the reference implementation's per-bit loop, which also rebuilds its base64 lookup table for every character.
+    """
+    if compressed is None:
+        return ""
+
+    if compressed == "":
+        return None
+
+    forward = compressed.translate(_BASE64_BITS)
+    length = len(forward)
+    if length != 6 * len(compressed):
+        raise Exception("Invalid base64 character in compressed data")
+
+    stream = "0" * _PADDING + forward[::-1]
+    end = len(stream)
+
+    # Bits of the original stream consumed so far; reading n bits at position p is stream[end - p - n:end - p]
+    position = 2
+    kind = int(stream[end - 2:end], 2)
+
+    if kind == 2:
+        return ""
+
+    if kind > 2:
+        return None
+
+    width = 8 if kind == 0 else 16
+    start = end - position
+    c = chr(int(stream[start - width:start], 2))
+    position += width
+
+    dictionary = [0, 1, 2, c]
+    w = c
+    result = [c]
+    enlarge_in = 4
+    num_bits = 3
+
+    while True:
+        if position >= length:
+            return ""
+
+        start = end - position
+        code = int(stream[start - num_bits:start], 2)
+        position += num_bits
+
+        if code < 2:
+            width = 8 if code == 0 else 16
+            start = end - position
+            dictionary.append(chr(int(stream[start - width:start], 2)))
+            position += width
+
+            code = len(dictionary) - 1
+            enlarge_in -= 1
+        elif code == 2:
+            return "".join(result)
+
+        if enlarge_in == 0:
+            enlarge_in = 1 << num_bits
+            num_bits += 1
+
+        if code < len(dictionary):
+            entry = dictionary[code]
+        elif code == len(dictionary):
+            entry = w + w[0]
+        else:
+            return None
+
+        result.append(entry)
+
+        dictionary.append(w + entry[0])
+        enlarge_in -= 1
+
+        w = entry
+
+        if enlarge_in == 0:
+            enlarge_in = 1 << num_bits
+            num_bits += 1
@@ -0,0 +1,185 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from multiprocessing.context import BaseContext
+from typing import Iterable, Union
+
+from newslib import all_sources, get_source, logger
+from newslib.records import Headline
+from newslib.source import Source
+
+
+def extract_front_page(source_name: str, content: bytes, root: str = None) -> Union[list[Headline], Exception]:
+    """
+    Worker side: extract the Headline records of a raw front page, without any I/O. Headlines only found on an
+    article's page are left empty for extract_article to fill in.
+
+    :param root: The source's resolved root, so sources resolving it over the network (News13) don't
+    """
+    try:
+        source = get_source(source_name)
+        if root is not None:
+            source.use_root(root)
+
+        return source.get_headlines(source.load_root_content(content), fetch_articles=False)
+    except Exception as e:
+        return e
+
+
+def extract_article(headline: Headline, content: bytes, url: str = None) -> Union[Headline, Exception]:
+    """
+    Worker side: fill in a headline's times, category and tags from its raw article document
+
+    :param url: The article's final URL, if it was redirected
+    """
+    try:
+        source = get_source(headline.source)
+        url = url or headline.url
+        document = source.load_document(content, url)
+
+        published, updated = source.get_times(url, document)
+        tags = source.get_tags(url, document)
+
+        return replace(
+            headline,
+            headline=headline.headline or source.get_article_headline(url, document) or "",
+            published=published,
+            updated=updated,
+            category=source.get_category(url, document),
+            tags=None if tags is None else tuple(tags),
+        )
+    except Exception as e:
+        return e
+
+
+def _extract_front_page(item: tuple[str, bytes, str]) -> Union[list[Headline], Exception]:
+    return extract_front_page(*item)
+
+
+def _extract_article(item: tuple[Headline, bytes, str]) -> Union[Headline, Exception]:
+    return extract_article(*item)
+
+
+class ParsePool:
+    """
+    Runs extraction in worker processes, so parsing isn't bound to a single core by the GIL.
+
+    Workers receive raw bytes plus a source name (looked up in the worker's own registry) and send back Headline
+    records or the Exception extraction raised, never parsed trees.
+    """
+
+    def __init__(self, max_workers: int = None, chunksize: int = 1, mp_context: BaseContext = None):
+        """
+        :param max_workers: Worker processes, the number of CPUs by default
+        :param chunksize: Items sent to a worker per round trip
+        """
+        self.chunksize = chunksize
+        self.executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context)
+
+    def front_pages(self, pages: Iterable[tuple[str, bytes, str]]) -> list[Union[list[Headline], Exception]]:
+        """
+        :param pages: Source name, raw front page and (optionally) the source's resolved root
+        """
+        return list(self.executor.map(_extract_front_page, pages, chunksize=self.chunksize))
+
+    def articles(self, articles: Iterable[tuple[Headline, bytes, str]]) -> list[Union[Headline, Exception]]:
+        """
+        :param articles: Triples of headline, raw article document and the article's final URL
+        """
+        return list(self.executor.map(_extract_article, articles, chunksize=self.chunksize))
+
+    async def front_pages_async(
+            self,
+            pages: Iterable[tuple[str, bytes, str]],
+    ) -> list[Union[list[Headline], Exception]]:
+        return await asyncio.to_thread(self.front_pages, list(pages))
+
+    async def articles_async(
+            self,
+            articles: Iterable[tuple[Headline, bytes, str]],
+    ) -> list[Union[Headline, Exception]]:
+        return await asyncio.to_thread(self.articles, list(articles))
+
+    @staticmethod
+    async def _fetch_front_page(source: Source) -> tuple[bytes, str]:
+        """
+        :return: The front page's content and the root it was fetched from, resolved off the event loop
+        """
+        root = await source.resolve_root_async()
+        content, _ = await source.fetch_content_async(root)
+
+        return content, root
+
+    async def _fetch_article(self, source: Source, headline: Headline) -> Union[tuple[Headline, bytes, str], Exception]:
+        document_url = source.get_document_url(headline.url)
+
+        try:
+            content, url = await source.fetch_content_async(document_url)
+        except Exception as e:
+            return e
+
+        # Documents fetched from elsewhere (Arutz7's item API) are still extracted against the article's URL
+        return headline, content, url if document_url == headline.url else headline.url
+
+    async def crawl_async(self, sources: Iterable[Source] = None) -> dict[str, Union[list[Headline], Exception]]:
+        """
+        Fetch every source's front page and articles concurrently in this process, and extract them in the pool.
+
+        :return: Mapping of source name to its detailed headlines (or the Exception an article raised), or the
+                 Exception its front page raised
+        """
+        if sources is None:
+            sources = all_sources()
+
+        sources = {source.name: source for source in sources}
+        contents = await asyncio.gather(
+            *[self._fetch_front_page(source) for source in sources.values()],
+            return_exceptions=True,
+        )
+
+        results: dict[str, Union[list, Exception]] = {}
+        pages = []
+        for name, content in zip(sources, contents):
+            if isinstance(content, Exception):
+                results[name] = content
+            else:
+                # Resolved before fetching the front page, so workers never resolve it themselves
+                pages.append((name, *content))
+
+        for (name, *_), headlines in zip(pages, await self.front_pages_async(pages)):
+            results[name] = headlines
+
+        fetched = await asyncio.gather(*[
+            self._fetch_article(sources[name], headline)
+            for name, headlines in results.items() if not isinstance(headlines, Exception)
+            for headline in headlines
+        ])
+
+        detailed = iter(await self.articles_async(article for article in fetched if not isinstance(article, Exception)))
+        fetched = iter(fetched)
+
+        for name, headlines in results.items():
+            if isinstance(headlines, Exception):
+                logger.error(f"Couldn't crawl {name}: {headlines!r}")
+                continue
+
+            articles = []
+            for _ in headlines:
+                article = next(fetched)
+                articles.append(article if isinstance(article, Exception) else next(detailed))
+
+            results[name] = articles
+
+        return results
+
+    def crawl(self, sources: Iterable[Source] = None) -> dict[str, Union[list[Headline], Exception]]:
+        return asyncio.run(self.crawl_async(sources))
+
+    def close(self):
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
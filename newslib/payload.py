@@ -0,0 +1,143 @@
+import re
+from html import unescape
+from json import JSONDecodeError, JSONDecoder
+from typing import Iterable, Iterator, Optional, Sequence
+
+COMPONENT_RE = re.compile(rb"<[a-zA-Z][^<>]*?class=\"[^\"]*Componenta\b")
+META_RE = re.compile(rb"<meta\s[^>]*>", flags=re.IGNORECASE)
+JSON_DECODER = JSONDecoder()
+ATTRIBUTE_RE = re.compile(rb"(?P<name>[\w:-]+)\s*=\s*(?:\"(?P<double>[^\"]*)\"|'(?P<single>[^']*)')")
+
+
+def find_between(content: bytes, start: bytes, end: bytes, offset=0) -> Optional[bytes]:
+    """
+    :return: The bytes between the first start marker (at or after offset) and the end marker following it
+    """
+    begin = content.find(start, offset)
+    if begin == -1:
+        return None
+
+    begin += len(start)
+    finish = content.find(end, begin)
+    if finish == -1:
+        return None
+
+    return content[begin:finish]
+
+
+class MarkerScanner:
+    """
+    Tracks, across incrementally received bytes, whether each sequence of markers has been seen in order.
+    """
+
+    def __init__(self, sequences: Iterable[Sequence[bytes]]):
+        self.sequences = [tuple(markers) for markers in sequences]
+        # Per sequence: how many of its markers were found, and where to resume searching for the next one
+        self._found = [0] * len(self.sequences)
+        self._offsets = [0] * len(self.sequences)
+
+    @property
+    def done(self) -> bool:
+        return all(found == len(markers) for found, markers in zip(self._found, self.sequences))
+
+    def feed(self, content: bytes) -> bool:
+        """
+        :param content: Everything received so far
+        :return: Whether every sequence has now been seen
+        """
+        for i, markers in enumerate(self.sequences):
+            while self._found[i] < len(markers):
+                marker = markers[self._found[i]]
+                position = content.find(marker, self._offsets[i])
+
+                if position == -1:
+                    # Markers may straddle chunk boundaries, so resume just before the end of what was searched
+                    self._offsets[i] = max(self._offsets[i], len(content) - len(marker) + 1)
+                    break
+
+                self._found[i] += 1
+                self._offsets[i] = position + len(marker)
+
+        return self.done
+
+
+def script_by_id(content: bytes, script_id: str) -> Optional[bytes]:
+    """
+    :return: The body of the <script> element with the given id
+    """
+    marker = content.find(f'id="{script_id}"'.encode())
+    if marker == -1:
+        return None
+
+    tag_start = content.rfind(b"<script", 0, marker)
+    if tag_start == -1:
+        return None
+
+    return find_between(content, b">", b"</script>", tag_start)
+
+
+def meta_content(content: bytes, attribute: str, value: str) -> Optional[str]:
+    """
+    :return: The content attribute of the first <meta> whose attribute equals value, regardless of attribute order
+    """
+    needle = value.encode()
+    offset = 0
+
+    while (found := content.find(needle, offset)) != -1:
+        offset = found + len(needle)
+
+        tag_start = content.rfind(b"<", 0, found)
+        match = META_RE.match(content, tag_start)
+        if match is None or match.end() < found:
+            continue
+
+        attributes = {
+            attr["name"].lower(): attr["double"] if attr["double"] is not None else attr["single"]
+            for attr in ATTRIBUTE_RE.finditer(match[0])
+        }
+
+        if attributes.get(attribute.encode()) == needle and b"content" in attributes:
+            return unescape(attributes[b"content"].decode(errors="replace"))
+
+    return None
+
+
+def component_regions(content: bytes, class_name: str) -> Iterator[bytes]:
+    """
+    Slice "...Componenta" blocks out of a page: from each element carrying class_name up to the next component.
+    """
+    marker = class_name.encode()
+    offset = 0
+
+    while (found := content.find(marker, offset)) != -1:
+        region_start = content.rfind(b"<", 0, found)
+
+        next_component = COMPONENT_RE.search(content, found + len(marker))
+        region_end = len(content) if next_component is None else next_component.start()
+
+        yield content[region_start:region_end]
+
+        offset = max(region_end, found + len(marker))
+
+
+def json_value(content: bytes, key: str, offset=0) -> Optional[tuple[object, bytes]]:
+    """
+    Decode only the value of the first ``"key":`` (at or after offset) in an embedded JSON payload.
+
+    :return: The decoded value and its raw bytes, or None if the key is missing or its value is cut off or malformed
+    """
+    marker = f'"{key}":'.encode()
+    begin = content.find(marker, offset)
+    if begin == -1:
+        return None
+
+    begin += len(marker)
+    text = content[begin:].decode(errors="replace")
+    start = len(text) - len(text.lstrip())
+
+    try:
+        value, end = JSON_DECODER.raw_decode(text, start)
+    except JSONDecodeError:
+        return None
+
+    return value, text[start:end].encode()
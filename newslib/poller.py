@@ -0,0 +1,146 @@
+import time
+from collections import OrderedDict
+from hashlib import blake2b
+from threading import Event
+from typing import Callable, Iterable, Iterator, Optional
+
+from newslib import all_sources, logger
+from newslib.rss import FeedItem
+from newslib.source import Source
+
+
+class SeenSet:
+    """
+    Bounded, time-windowed set of 64-bit key hashes.
+
+    Keys are forgotten once they are older than ``window`` seconds, or once more than ``max_size`` keys are held.
+    """
+
+    def __init__(self, window: float = 3 * 24 * 60 * 60, max_size: int = 100_000):
+        self.window = window
+        self.max_size = max_size
+        self._seen: OrderedDict[int, float] = OrderedDict()
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(blake2b(key.encode(), digest_size=8).digest(), "big")
+
+    def _expire(self, now: float):
+        while self._seen and (len(self._seen) > self.max_size or next(iter(self._seen.values())) < now - self.window):
+            self._seen.popitem(last=False)
+
+    def add(self, key: str, now: float = None) -> bool:
+        """
+        :return: Whether key was new
+        """
+        if now is None:
+            now = time.time()
+
+        key_hash = self._hash(key)
+        new = key_hash not in self._seen
+
+        self._seen[key_hash] = now
+        self._seen.move_to_end(key_hash)
+        self._expire(now)
+
+        return new
+
+    def __contains__(self, key: str) -> bool:
+        return self._hash(key) in self._seen
+
+    def __len__(self):
+        return len(self._seen)
+
+
+class FlashPoller:
+    """
+    Polls the sources' rss_news_flashes feeds, emitting only items that weren't seen before.
+
+    Items of sources with an rss_modified_tag are emitted again whenever their modified time changes.
+    """
+
+    def __init__(
+            self,
+            sources: Iterable[Source] = None,
+            interval: float = 60,
+            seen: SeenSet = None,
+            emit_existing=True,
+    ):
+        """
+        :param emit_existing: Whether the first cycle emits the items already in the feeds, or only records them
+        """
+        if sources is None:
+            sources = all_sources()
+
+        self.sources = [source for source in sources if source.rss_news_flashes is not None]
+        self.interval = interval
+        self.seen = SeenSet() if seen is None else seen
+        self.emit_existing = emit_existing
+        self.cycles = 0
+        self._stopped = Event()
+
+    @staticmethod
+    def item_key(source: Source, item: FeedItem) -> str:
+        key = f"{source.name}\0{item.guid}"
+
+        if source.rss_modified_tag is not None and item.modified is not None:
+            key += f"\0{item.modified.isoformat()}"
+
+        return key
+
+    def poll_source(self, source: Source) -> Iterator[FeedItem]:
+        for item in source.get_rss_items(source.rss_news_flashes):
+            if self.seen.add(self.item_key(source, item)):
+                yield item
+
+    def poll_once(self) -> list[FeedItem]:
+        new_items = []
+
+        for source in self.sources:
+            try:
+                new_items.extend(self.poll_source(source))
+            except Exception as e:
+                logger.error(f"Couldn't poll {source.name} news flashes: {e!r}")
+
+        self.cycles += 1
+
+        if self.cycles == 1 and not self.emit_existing:
+            return []
+
+        return new_items
+
+    def run(self, callback: Callable[[FeedItem], None] = None, max_cycles: int = None) -> Iterator[FeedItem]:
+        """
+        Poll forever (or for max_cycles), yielding new items and passing them to callback if one is given.
+        """
+        cycles = 0
+
+        while not self._stopped.is_set() and (max_cycles is None or cycles < max_cycles):
+            started = time.monotonic()
+
+            for item in self.poll_once():
+                if callback is not None:
+                    callback(item)
+
+                yield item
+
+            cycles += 1
+            if max_cycles is not None and cycles >= max_cycles:
+                break
+
+            self._stopped.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def stop(self):
+        self._stopped.set()
+
+    def __repr__(self):
+        return f"<FlashPoller {[source.name for source in self.sources]} seen={len(self.seen)}>"
+
+
+def poll_flashes(
+        sources: Iterable[Source] = None,
+        interval: float = 60,
+        callback: Callable[[FeedItem], None] = None,
+        max_cycles: Optional[int] = None,
+) -> Iterator[FeedItem]:
+    return FlashPoller(sources, interval).run(callback, max_cycles)
@@ -0,0 +1,198 @@
+import random
+import time
+from threading import Lock
+from typing import Optional
+from urllib.parse import urlparse
+
+from newslib import logger
+from newslib.instrumentation import count
+
+# Responses that mean the host wants us to back off
+SLOW_DOWN_STATUSES = (403, 429)
+
+# Requests per second per site, unless configured otherwise
+DEFAULT_RATE = 4.0
+
+# Registrable domains of the built-in sources (News13 resolves its root to 13tv.co.il), so each site is limited as a
+# whole rather than per subdomain (news. and rss.walla.co.il, www.ynet.co.il and ynet.co.il)
+SOURCE_DOMAINS = (
+    "inn.co.il",
+    "haaretz.co.il",
+    "israelhayom.co.il",
+    "maariv.co.il",
+    "n12.co.il",
+    "13news.co.il",
+    "13tv.co.il",
+    "0404.co.il",
+    "walla.co.il",
+    "ynet.co.il",
+)
+
+
+class TokenBucket:
+    """
+    Allows ``rate`` requests per second on average, in bursts of up to ``burst``.
+
+    Tokens are reserved rather than waited for: a reservation may drive the balance negative, and the returned delay is
+    the caller's place in line, so callers of one bucket are served in the order they reserved.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, now: float = None) -> float:
+        """
+        :return: Seconds to wait before sending the request the token was reserved for
+        """
+        if now is None:
+            now = time.monotonic()
+
+        self._refill(now)
+        self.tokens -= 1
+
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def pause(self, seconds: float, now: float = None):
+        """
+        Hand out no tokens for the next ``seconds`` (on top of those already reserved)
+        """
+        if now is None:
+            now = time.monotonic()
+
+        self._refill(now)
+        self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+
+
+class RateLimiter:
+    """
+    Per-host token buckets with adaptive slowdown.
+
+    Hosts are matched by domain suffix, so ``hosts={"walla.co.il": 2}`` also covers news.walla.co.il and
+    rss.walla.co.il with a single bucket. Hosts without an entry get ``rate``.
+
+    A host that answers 429/403, or serves a block page, has its rate cut by ``backoff`` (down to ``min_rate``) and its
+    bucket paused; each successful response then restores ``recovery`` of the configured rate.
+    """
+
+    def __init__(
+            self,
+            rate: float = DEFAULT_RATE,
+            burst: float = 8.0,
+            hosts: dict[str, float] = None,
+            jitter: float = 0.0,
+            backoff: float = 0.5,
+            recovery: float = 0.05,
+            min_rate: float = 0.1,
+            pause: float = 5.0,
+    ):
+        """
+        :param rate: Requests per second per host
+        :param hosts: Domain -> requests per second, overriding rate
+        :param jitter: Up to this many seconds are added at random to every delay, so requests don't arrive in lockstep
+        :param pause: Seconds a host is paused for on slowdown, unless it sent a Retry-After
+        """
+        self.rate = rate
+        self.burst = burst
+        self.hosts = hosts or {}
+        self.jitter = jitter
+        self.backoff = backoff
+        self.recovery = recovery
+        self.min_rate = min_rate
+        self.pause = pause
+
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = Lock()
+
+    def key(self, url: str) -> str:
+        """
+        :return: The bucket url's requests are counted against: its configured domain, or its hostname
+        """
+        host = urlparse(url).hostname or ""
+
+        for domain in self.hosts:
+            if host == domain or host.endswith(f".{domain}"):
+                return domain
+
+        return host
+
+    def configured_rate(self, key: str) -> float:
+        return self.hosts.get(key, self.rate)
+
+    def bucket(self, key: str) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.configured_rate(key), self.burst)
+
+        return bucket
+
+    def reserve(self, url: str) -> float:
+        """
+        :return: Seconds to wait before requesting url
+        """
+        with self._lock:
+            delay = self.bucket(self.key(url)).reserve()
+
+        if self.jitter:
+            delay += random.uniform(0, self.jitter)
+
+        return delay
+
+    def wait(self, url: str):
+        delay = self.reserve(url)
+
+        if delay > 0:
+            count(None, "rate_limit_waits")
+            time.sleep(delay)
+
+    def slow_down(self, url: str, retry_after: float = None):
+        key = self.key(url)
+
+        with self._lock:
+            bucket = self.bucket(key)
+            bucket.rate = max(self.min_rate, bucket.rate * self.backoff)
+            bucket.pause(self.pause if retry_after is None else retry_after)
+
+        count(None, "rate_limit_slowdowns")
+        logger.warning(f"Slowing down requests to {key} to {bucket.rate:.2f}/s")
+
+    def recover(self, url: str):
+        key = self.key(url)
+
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                configured = self.configured_rate(key)
+                bucket.rate = min(configured, bucket.rate + configured * self.recovery)
+
+    @classmethod
+    def for_sources(cls, **options) -> "RateLimiter":
+        """
+        :return: A limiter with one bucket per built-in source's site, all at ``rate`` unless given in ``hosts``
+        """
+        defaults = dict.fromkeys(SOURCE_DOMAINS, options.get("rate", DEFAULT_RATE))
+        hosts = {**defaults, **(options.pop("hosts", None) or {})}
+
+        return cls(hosts=hosts, **options)
+
+    def current_rate(self, url: str) -> Optional[float]:
+        with self._lock:
+            bucket = self._buckets.get(self.key(url))
+
+        return None if bucket is None else bucket.rate
+
+
+def retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    :return: A Retry-After header's delay in seconds, if it's given in seconds
+    """
+    if value is not None and value.strip().isdigit():
+        return float(value)
+
+    return None
@@ -0,0 +1,23 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+
+@dataclass(frozen=True, slots=True)
+class Headline:
+    """
+    A front page headline, holding plain strings only so it never keeps a parsed page alive.
+    """
+    source: str
+    url: str
+    headline: str
+    # Place on the front page: 0 for the top article, then substories in page order
+    position: int
+    published: Optional[datetime] = None
+    updated: Optional[datetime] = None
+    category: Optional[str] = None
+    tags: Optional[tuple[str, ...]] = None
+
+    @property
+    def top_article(self) -> bool:
+        return self.position == 0
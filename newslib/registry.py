@@ -0,0 +1,103 @@
+from importlib import import_module
+from threading import RLock
+from typing import TYPE_CHECKING, Callable, Union
+
+from newslib import logger
+
+if TYPE_CHECKING:
+    from newslib.source import Source
+
+# Entry point group third-party packages register their sources under, e.g. in setup.py:
+#   entry_points={"newslib.sources": ["mysite = mypackage.mysite:MySiteSource"]}
+ENTRY_POINT_GROUP = "newslib.sources"
+
+SourceFactory = Callable[[], "Source"]
+
+BUILTIN_SOURCES = {
+    "arutz7": "newslib.israel.arutz7:Arutz7Source",
+    "haaretz": "newslib.israel.haaretz:HaaretzSource",
+    "israelhayom": "newslib.israel.israelhayom:IsraelHayomSource",
+    "maariv": "newslib.israel.maariv:MaarivSource",
+    "n12": "newslib.israel.n12:N12Source",
+    "news13": "newslib.israel.news13:News13Source",
+    "0404": "newslib.israel.news0404:News0404Source",
+    "walla": "newslib.israel.walla:WallaSource",
+    "ynet": "newslib.israel.ynet:YnetSource",
+}
+
+_lock = RLock()
+# name -> "module:attribute" path or factory, imported/called only when the source is first requested
+_factories: dict[str, Union[str, SourceFactory]] = dict(BUILTIN_SOURCES)
+_sources: dict[str, "Source"] = {}
+_entry_points_loaded = False
+
+
+def register_source(name: str, factory: Union[str, SourceFactory]):
+    """
+    :param factory: A Source subclass or zero-argument callable returning a Source, or its "module:attribute" path
+    """
+    with _lock:
+        _factories[name] = factory
+        _sources.pop(name, None)
+
+
+def _load_entry_points():
+    global _entry_points_loaded
+
+    with _lock:
+        if _entry_points_loaded:
+            return
+
+        _entry_points_loaded = True
+
+        # Imported here, as importlib.metadata is by far the slowest part of importing newslib
+        from importlib.metadata import entry_points
+
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+            if entry_point.name in _factories:
+                logger.warning(f"Ignoring entry point {entry_point.value}: source {entry_point.name} already exists")
+                continue
+
+            _factories[entry_point.name] = entry_point.value
+
+
+def _resolve(factory: Union[str, SourceFactory]) -> SourceFactory:
+    if not isinstance(factory, str):
+        return factory
+
+    module_name, _, attribute = factory.partition(":")
+    factory = import_module(module_name)
+    for part in attribute.split("."):
+        factory = getattr(factory, part)
+
+    return factory
+
+
+def source_names() -> list[str]:
+    _load_entry_points()
+
+    return list(_factories)
+
+
+def get_source(name: str) -> "Source":
+    """
+    :return: The shared instance of the named source, importing its module on first request
+    """
+    with _lock:
+        source = _sources.get(name)
+        if source is not None:
+            return source
+
+        if name not in _factories:
+            _load_entry_points()
+
+        if name not in _factories:
+            raise Exception(f"Unknown source {name}")
+
+        source = _sources[name] = _resolve(_factories[name])()
+
+        return source
+
+
+def all_sources() -> list["Source"]:
+    return [get_source(name) for name in source_names()]
@@ -0,0 +1,193 @@
+from dataclasses import dataclass
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
+
+from bs4 import BeautifulSoup
+from lxml.etree import QName, XMLPullParser, _Element
+
+from newslib import logger
+from newslib.transport import get_transport
+
+if TYPE_CHECKING:
+    from newslib.source import Source
+
+ATOM = "http://www.w3.org/2005/Atom"
+
+
+@dataclass(frozen=True, slots=True)
+class FeedItem:
+    source: str
+    guid: str
+    link: Optional[str]
+    title: Optional[str]
+    created: Optional[datetime]
+    modified: Optional[datetime]
+    tags: tuple[str, ...] = ()
+
+
+def _name(element: _Element) -> str:
+    name = QName(element).localname
+
+    return name if element.prefix is None else f"{element.prefix}:{name}"
+
+
+def children(element: _Element, name: str) -> Iterator[_Element]:
+    """
+    Child elements matching name, given either as "local" or "prefix:local" (e.g. "dc:created")
+    """
+    for child in element:
+        if isinstance(child.tag, str) and name in (_name(child), QName(child).localname):
+            yield child
+
+
+def child(element: _Element, name: str) -> Optional[_Element]:
+    return next(children(element, name), None)
+
+
+def child_text(element: _Element, name: str) -> Optional[str]:
+    found = child(element, name)
+    if found is None or found.text is None:
+        return None
+
+    return found.text.strip()
+
+
+def parse_datetime(text: Optional[str], datetime_format: str) -> Optional[datetime]:
+    if not text:
+        return None
+
+    try:
+        return datetime.strptime(text, datetime_format)
+    except ValueError:
+        pass
+
+    try:
+        return parsedate_to_datetime(text)
+    except (TypeError, ValueError):
+        pass
+
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        logger.debug(f"Couldn't parse feed datetime {text!r}")
+        return None
+
+
+def _rss_item(source: "Source", item: _Element) -> FeedItem:
+    link = child_text(item, "link")
+
+    return FeedItem(
+        source=source.name,
+        guid=child_text(item, source.rss_guid) or link,
+        link=link,
+        title=child_text(item, "title"),
+        created=parse_datetime(child_text(item, source.rss_created_tag), source.rss_datetime_format),
+        modified=parse_datetime(
+            child_text(item, source.rss_modified_tag) if source.rss_modified_tag else None,
+            source.rss_datetime_format,
+        ),
+        tags=tuple(source.get_rss_item_tags(item)),
+    )
+
+
+def _atom_entry(source: "Source", entry: _Element) -> FeedItem:
+    link = child(entry, "link")
+    link = None if link is None else link.get("href")
+
+    return FeedItem(
+        source=source.name,
+        guid=child_text(entry, "id") or link,
+        link=link,
+        title=child_text(entry, "title"),
+        created=parse_datetime(child_text(entry, "published"), source.rss_datetime_format),
+        modified=parse_datetime(child_text(entry, "updated"), source.rss_datetime_format),
+        tags=tuple(category.get("term") for category in children(entry, "category") if category.get("term")),
+    )
+
+
+def _looks_like_html(chunk: bytes) -> bool:
+    head = chunk.lstrip()[:256].lower()
+
+    return head.startswith(b"<!doctype html") or head.startswith(b"<html")
+
+
+def parse_feed(source: "Source", chunks: Iterable[bytes], url: str = None) -> Iterator[FeedItem]:
+    """
+    Incrementally parse an RSS or Atom feed, yielding each item as soon as it is complete.
+
+    Parsed items are discarded from the tree as they are yielded, so memory stays flat regardless of feed size.
+
+    :param url: Where the feed was fetched from, slowed down if the source recognizes a block page
+    """
+    chunks = iter(chunks)
+    parser = XMLPullParser(events=("end",), recover=True, resolve_entities=False, no_network=True)
+
+    first = next(chunks, b"")
+    if _looks_like_html(first):
+        # Not a feed: most likely an error or block page, which the source may be able to explain
+        page = BeautifulSoup(first + b"".join(chunks), "lxml")
+        try:
+            source.check_rss_error(page)
+        except Exception:
+            if url is not None:
+                get_transport().slow_down(url)
+
+            raise
+
+        raise Exception(f"Expected a feed from {source.name}, got an HTML page")
+
+    for chunk in _prepend(first, chunks):
+        parser.feed(chunk)
+        yield from _read_items(source, parser)
+
+    parser.close()
+    yield from _read_items(source, parser)
+
+
+def _read_items(source: "Source", parser: XMLPullParser) -> Iterator[FeedItem]:
+    for _, element in parser.read_events():
+        if not isinstance(element.tag, str):
+            continue
+
+        qname = QName(element)
+        if qname.localname == "item":
+            record = _rss_item(source, element)
+        elif qname.localname == "entry" and qname.namespace == ATOM:
+            record = _atom_entry(source, element)
+        else:
+            continue
+
+        element.clear(keep_tail=False)
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+
+        if record.guid is None:
+            logger.debug(f"Skipping feed item without guid or link ({source.name})")
+            continue
+
+        yield record
+
+
+def _prepend(first: bytes, chunks: Iterator[bytes]) -> Iterator[bytes]:
+    if first:
+        yield first
+
+    yield from chunks
+
+
+def iter_feed(source: "Source", url: str = None, chunk_size=16 * 1024) -> Iterator[FeedItem]:
+    """
+    Stream a source's feed (rss_news_link unless url is given).
+    """
+    if url is None:
+        url = source.rss_news_link
+
+    if url is None:
+        raise Exception(f"{source.name} has no RSS feed")
+
+    return parse_feed(source, source.stream_content(url, chunk_size), url)
+
+
+def feeds(source: "Source") -> list[str]:
+    return [url for url in (source.rss_news_link, source.rss_news_flashes) if url is not None]
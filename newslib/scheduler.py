@@ -0,0 +1,238 @@
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from hashlib import blake2b
+from threading import Event
+from typing import Callable, Iterable, Iterator, Optional
+
+from newslib import logger
+from newslib.source import Source
+from newslib.transport import Transport, get_transport
+
+
+@dataclass
+class Endpoint:
+    url: str
+    name: str
+    interval: float
+    next_due: float = 0
+    digest: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    last_changed: Optional[float] = None
+    # Exponentially weighted estimate of the seconds between changes
+    change_period: Optional[float] = None
+    polls: int = 0
+    changes: int = 0
+
+    def __repr__(self):
+        return f"<Endpoint {self.name} every {self.interval:.0f}s>"
+
+
+@dataclass
+class Poll:
+    endpoint: Endpoint
+    changed: bool
+    content: Optional[bytes] = None
+    error: Optional[Exception] = field(default=None, repr=False)
+
+
+class Scheduler:
+    """
+    Polls endpoints at intervals adapted to how often each one is observed to change.
+
+    Unchanged responses back the interval off exponentially up to max_interval. Changes speed it up, and once the
+    endpoint's change period has been estimated, reset it to half that period (never below min_interval). All polls
+    share a per-minute request budget.
+    """
+
+    def __init__(
+            self,
+            min_interval: float = 30,
+            max_interval: float = 30 * 60,
+            budget_per_minute: int = 60,
+            backoff: float = 1.5,
+            speedup: float = 2,
+            smoothing: float = 0.3,
+            transport: Transport = None,
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.budget_per_minute = budget_per_minute
+        self.backoff = backoff
+        self.speedup = speedup
+        self.smoothing = smoothing
+        self.transport = transport
+
+        self.endpoints: dict[str, Endpoint] = {}
+        self._requests: deque[float] = deque()
+        self._stopped = Event()
+
+    def add(self, url: str, name: str = None, interval: float = None) -> Endpoint:
+        if url not in self.endpoints:
+            self.endpoints[url] = Endpoint(
+                url=url,
+                name=name or url,
+                interval=self.min_interval if interval is None else self._clamp(interval),
+            )
+
+        return self.endpoints[url]
+
+    def add_source(self, source: Source) -> list[Endpoint]:
+        urls = {
+            "root": source.root,
+            "rss_news_link": source.rss_news_link,
+            "rss_news_flashes": source.rss_news_flashes,
+        }
+
+        return [self.add(url, f"{source.name}.{kind}") for kind, url in urls.items() if url is not None]
+
+    def add_sources(self, sources: Iterable[Source]) -> list[Endpoint]:
+        return [endpoint for source in sources for endpoint in self.add_source(source)]
+
+    def _clamp(self, interval: float) -> float:
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def _budget_left(self, now: float) -> int:
+        while self._requests and self._requests[0] <= now - 60:
+            self._requests.popleft()
+
+        return self.budget_per_minute - len(self._requests)
+
+    def observe(self, endpoint: Endpoint, digest: str, last_modified: str = None, now: float = None) -> bool:
+        """
+        Record a poll result and reschedule the endpoint.
+
+        :return: Whether the endpoint changed since the previous poll
+        """
+        if now is None:
+            now = time.time()
+
+        changed = endpoint.digest is not None and digest != endpoint.digest
+        endpoint.polls += 1
+
+        if changed:
+            endpoint.changes += 1
+
+            changed_at = now
+            if last_modified is not None:
+                try:
+                    changed_at = min(now, parsedate_to_datetime(last_modified).timestamp())
+                except (TypeError, ValueError):
+                    pass
+
+            if endpoint.last_changed is not None and changed_at > endpoint.last_changed:
+                period = changed_at - endpoint.last_changed
+                if endpoint.change_period is None:
+                    endpoint.change_period = period
+                else:
+                    endpoint.change_period += self.smoothing * (period - endpoint.change_period)
+
+            endpoint.last_changed = changed_at
+
+            if endpoint.change_period is None:
+                interval = endpoint.interval / self.speedup
+            else:
+                # Poll about twice per expected change
+                interval = endpoint.change_period / 2
+
+            endpoint.interval = self._clamp(interval)
+        elif endpoint.digest is not None:
+            endpoint.interval = self._clamp(endpoint.interval * self.backoff)
+
+        endpoint.digest = digest
+        endpoint.last_modified = last_modified or endpoint.last_modified
+        endpoint.next_due = now + endpoint.interval
+
+        return changed
+
+    def poll(self, endpoint: Endpoint) -> Poll:
+        now = time.time()
+        self._requests.append(now)
+
+        headers = {}
+        if endpoint.etag is not None:
+            headers["If-None-Match"] = endpoint.etag
+        if endpoint.last_modified is not None:
+            headers["If-Modified-Since"] = endpoint.last_modified
+
+        transport = self.transport or get_transport()
+        try:
+            response = transport.request(endpoint.url, headers=headers)
+
+            if response.status_code == 304:
+                self.observe(endpoint, endpoint.digest, endpoint.last_modified, now)
+                return Poll(endpoint, changed=False)
+
+            if not response.ok:
+                raise Exception(f"Got {response.status_code} when GETing {endpoint.url}")
+        except Exception as e:
+            logger.warning(f"Couldn't poll {endpoint.name}: {e!r}")
+            endpoint.next_due = now + endpoint.interval
+            return Poll(endpoint, changed=False, error=e)
+
+        content = response.content
+        first_poll = endpoint.digest is None
+        endpoint.etag = response.headers.get("ETag")
+
+        changed = self.observe(
+            endpoint,
+            blake2b(content, digest_size=16).hexdigest(),
+            response.headers.get("Last-Modified"),
+            now,
+        )
+
+        return Poll(endpoint, changed=changed or first_poll, content=content)
+
+    def due(self, now: float = None) -> list[Endpoint]:
+        """
+        :return: Endpoints due for a poll, most overdue first, limited by the request budget left
+        """
+        if now is None:
+            now = time.time()
+
+        due = [endpoint for endpoint in self.endpoints.values() if endpoint.next_due <= now]
+        due.sort(key=lambda endpoint: endpoint.next_due)
+
+        return due[:max(0, self._budget_left(now))]
+
+    def run_once(self) -> list[Poll]:
+        return [self.poll(endpoint) for endpoint in self.due()]
+
+    def run(self, callback: Callable[[Poll], None] = None, max_cycles: int = None) -> Iterator[Poll]:
+        """
+        Poll endpoints as they fall due, yielding the polls that found new content.
+        """
+        cycles = 0
+
+        while not self._stopped.is_set() and (max_cycles is None or cycles < max_cycles):
+            for result in self.run_once():
+                if result.changed:
+                    if callback is not None:
+                        callback(result)
+
+                    yield result
+
+            cycles += 1
+            if max_cycles is not None and cycles >= max_cycles:
+                break
+
+            self._stopped.wait(self.sleep_time())
+
+    def sleep_time(self, now: float = None) -> float:
+        if now is None:
+            now = time.time()
+
+        if not self.endpoints:
+            return self.min_interval
+
+        wait = min(endpoint.next_due for endpoint in self.endpoints.values()) - now
+
+        if self._budget_left(now) <= 0:
+            wait = max(wait, self._requests[0] + 60 - now)
+
+        return max(0.0, wait)
+
+    def stop(self):
+        self._stopped.set()
@@ -0,0 +1,154 @@
+from typing import Any, Optional, Union
+
+from bs4.builder import HTMLTreeBuilder
+from bs4.element import NavigableString, Tag
+from cssselect import GenericTranslator, SelectorError
+from lxml.etree import XPath, XPathError
+from lxml.html import HtmlElement
+
+from newslib import logger
+from newslib.document import Document, get_document
+
+Element = Union[Tag, HtmlElement]
+Page = Union[Document, Tag, HtmlElement, str, bytes]
+
+
+class SoupBackend:
+    """
+    BeautifulSoup + soupsieve. Slow, but supports every selector and returns live bs4 Tags.
+    """
+
+    name = "bs4"
+
+    def prepare(self, document: Document) -> Any:
+        return document.html
+
+    def tree(self, html: Page) -> Tag:
+        if isinstance(html, Tag):
+            return html
+
+        return get_document(html).html
+
+    def select(self, html: Page, selector: str) -> list[Element]:
+        return self.tree(html).select(selector)
+
+    def select_one(self, html: Page, selector: str) -> Optional[Element]:
+        return self.tree(html).select_one(selector)
+
+    @staticmethod
+    def text(element: Element) -> str:
+        return element.text
+
+    @staticmethod
+    def attr(element: Element, name: str) -> Optional[str]:
+        return element.attrs.get(name)
+
+    @staticmethod
+    def to_tag(element: Element) -> Tag:
+        return element
+
+    def __repr__(self):
+        return f"<{type(self).__name__}>"
+
+
+class LxmlBackend(SoupBackend):
+    """
+    CSS selectors compiled once to XPath and evaluated on the native lxml tree.
+
+    Selectors cssselect can't translate fall back to the bs4 backend.
+    """
+
+    name = "lxml"
+
+    _translator = GenericTranslator()
+    _compiled: dict[tuple[str, bool], Optional[XPath]] = {}
+    # Splits multi-valued attributes (class, rel...) the way bs4's own parsers do
+    _builder = HTMLTreeBuilder()
+
+    @classmethod
+    def compile(cls, selector: str, relative: bool = False) -> Optional[XPath]:
+        """
+        :param relative: Only match descendants of the element selected from, like soupsieve does for a Tag. Otherwise
+                         the root element can match too, as it does when selecting from a whole bs4 document
+        """
+        try:
+            return cls._compiled[selector, relative]
+        except KeyError:
+            pass
+
+        prefix = "descendant::" if relative else "descendant-or-self::"
+        try:
+            xpath = XPath(cls._translator.css_to_xpath(selector, prefix=prefix))
+        except (SelectorError, XPathError) as e:
+            logger.debug(f"Falling back to bs4 for selector {selector!r}: {e}")
+            xpath = None
+
+        cls._compiled[selector, relative] = xpath
+        return xpath
+
+    def prepare(self, document: Document) -> Any:
+        return document
+
+    def tree(self, html: Page) -> HtmlElement:
+        if isinstance(html, HtmlElement):
+            return html
+
+        return get_document(html).lxml
+
+    def select(self, html: Page, selector: str) -> list[Element]:
+        xpath = self.compile(selector, relative=isinstance(html, HtmlElement))
+
+        # An existing bs4 tree is searched as is, rather than parsing the page a second time for lxml
+        if xpath is None or isinstance(html, Tag):
+            if isinstance(html, HtmlElement):
+                html = self.to_tag(html)
+
+            return SoupBackend.tree(self, html).select(selector)
+
+        return xpath(self.tree(html))
+
+    def select_one(self, html: Page, selector: str) -> Optional[Element]:
+        elements = self.select(html, selector)
+
+        return elements[0] if elements else None
+
+    @staticmethod
+    def text(element: Element) -> str:
+        if isinstance(element, Tag):
+            return element.text
+
+        # text_content() results point back into the tree, so copy them out
+        return str(element.text_content())
+
+    @staticmethod
+    def attr(element: Element, name: str) -> Optional[str]:
+        if isinstance(element, Tag):
+            return element.attrs.get(name)
+
+        value = element.get(name)
+        return None if value is None else str(value)
+
+    @classmethod
+    def to_tag(cls, element: Element) -> Tag:
+        """
+        :return: A standalone bs4 copy of element, which doesn't keep the page's tree alive. Built node by node rather
+                 than by serializing and parsing element again
+        """
+        if element is None or isinstance(element, Tag):
+            return element
+
+        tag = Tag(builder=cls._builder, name=element.tag, attrs={name: str(value) for name, value in element.items()})
+
+        if element.text:
+            tag.append(NavigableString(element.text))
+
+        for child in element:
+            # Comments and processing instructions are dropped, but not the text that follows them
+            if isinstance(child.tag, str):
+                tag.append(cls.to_tag(child))
+
+            if child.tail:
+                tag.append(NavigableString(child.tail))
+
+        return tag
+
@@ -0,0 +1,121 @@
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Iterable, Optional
+from urllib.parse import urljoin
+
+from bs4.element import Tag
+
+from newslib import all_sources, logger
+from newslib.source import Source
+
+
+@dataclass
+class ArticleSnapshot:
+    url: str
+    top_article: bool = False
+    headline: Optional[str] = None
+    valid: bool = True
+    category: Optional[str] = None
+    published: Optional[datetime] = None
+    updated: Optional[datetime] = None
+    tags: Optional[list[str]] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class Snapshot:
+    source: str
+    taken: datetime
+    top_article: Optional[ArticleSnapshot] = None
+    substories: list[ArticleSnapshot] = field(default_factory=list)
+    error: Optional[Exception] = None
+
+    @property
+    def articles(self) -> list[ArticleSnapshot]:
+        if self.top_article is None:
+            return self.substories
+
+        return [self.top_article, *self.substories]
+
+
+async def _enrich(source: Source, a: Tag, article: ArticleSnapshot):
+    if not article.top_article:
+        article.headline = await asyncio.to_thread(source.get_headline, a)
+        article.valid = source.valid_substory(a)
+
+    html, article.url = await source.get_page_async(article.url)
+
+    if article.top_article:
+        # Sources that read the top headline from the article itself get the page just fetched
+        article.headline = await asyncio.to_thread(source.get_headline, a, True, html)
+
+    article.category = await source.get_category_async(article.url, html)
+    article.published, article.updated = await source.get_times_async(article.url, html)
+    article.tags = await asyncio.to_thread(source.get_tags, article.url, html)
+
+
+async def snapshot_article_async(
+        source: Source,
+        a: Tag,
+        top_article=False,
+        timeout: float = None,
+) -> ArticleSnapshot:
+    article = ArticleSnapshot(url=urljoin(source.root, a.attrs["href"]), top_article=top_article)
+
+    try:
+        await asyncio.wait_for(_enrich(source, a, article), timeout)
+    except Exception as e:
+        logger.warning(f"Couldn't snapshot {article.url} ({source.name}): {e!r}")
+        article.error = e
+
+    return article
+
+
+async def snapshot_async(source: Source, article_timeout: float = None) -> Snapshot:
+    """
+    Take a snapshot of a source's front page, fetching the top article and every substory concurrently.
+
+    Errors are isolated: a failing article is recorded on its ArticleSnapshot, and only a failure to read the front
+    page itself is recorded on the Snapshot.
+
+    :param article_timeout: Seconds allowed per article before it is recorded as failed
+    """
+    snapshot = Snapshot(source=source.name, taken=datetime.now())
+
+    try:
+        root_content = await source.get_root_content_async()
+        top_article_a, substories_a = await asyncio.gather(
+            source.get_top_article_a_async(root_content),
+            source.get_substories_a_async(root_content),
+        )
+    except Exception as e:
+        logger.error(f"Couldn't snapshot {source.name} front page: {e!r}")
+        snapshot.error = e
+        return snapshot
+
+    snapshot.top_article, *snapshot.substories = await asyncio.gather(
+        snapshot_article_async(source, top_article_a, top_article=True, timeout=article_timeout),
+        *[snapshot_article_async(source, a, timeout=article_timeout) for a in substories_a],
+    )
+
+    return snapshot
+
+
+async def snapshot_all_async(sources: Iterable[Source] = None, article_timeout: float = None) -> list[Snapshot]:
+    if sources is None:
+        sources = all_sources()
+
+    return list(await asyncio.gather(*[snapshot_async(source, article_timeout) for source in sources]))
+
+
+def snapshot(source: Source, article_timeout: float = None) -> Snapshot:
+    return asyncio.run(snapshot_async(source, article_timeout))
+
+
+def snapshot_all(sources: Iterable[Source] = None, article_timeout: float = None) -> list[Snapshot]:
+    return asyncio.run(snapshot_all_async(sources, article_timeout))
@@ -1,16 +1,97 @@
+import asyncio
+import time
 from abc import abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, replace
 from datetime import datetime
-from typing import Optional, Union
+from functools import wraps
+from threading import Lock
+from typing import Any, Iterable, Iterator, Optional, Sequence, Union
 from unicodedata import normalize
+from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 from bs4.element import Tag
-from requests import get
+from lxml.etree import _Element
 
 from newslib import logger
+from newslib.article import Article
+from newslib.document import Document, DocumentCache, get_document, parse_html
+from newslib.instrumentation import EXTRACT, FETCH, count, instrumented, timed
+from newslib.records import Headline
+from newslib.rss import FeedItem, child_text, iter_feed
+from newslib.selectors import LxmlBackend, SoupBackend
+from newslib.transport import get_transport
+
+
+# Extraction methods reading a field of an article, and the field's name in Source.regions
+FIELD_METHODS = {
+    "get_times": "times",
+    "get_category": "category",
+}
+
+# Extraction methods timed as the source's extract stage, including their overrides in subclasses
+EXTRACT_METHODS = (
+    "get_top_article_a",
+    "get_substories_a",
+    "get_headlines",
+    "get_headline",
+    "get_article_headline",
+    "is_premium",
+    "get_times",
+    "get_tags",
+    "get_category",
+)
+
+
+def partially_fetched(field: str):
+    """
+    Have a field method called without a page fetch only the part of the page self.regions says the field needs
+    """
+
+    def decorator(method):
+        if getattr(method, "__newslib_field__", None) == field:
+            return method
+
+        @wraps(method)
+        def wrapper(self, url, html=None, *args, **kwargs):
+            # A page already fetched whole for url is reused through get_page instead
+            if html is None and field in self.regions and self.fetched_article(url) is None:
+                html, url = self.fetch_partial_document(url, field)
+
+            return method(self, url, html, *args, **kwargs)
+
+        wrapper.__newslib_field__ = field
+
+        return wrapper
+
+    return decorator
+
+
+@dataclass(frozen=True)
+class Region:
+    """
+    Where in an article's page a field is found, so it can be extracted without fetching or parsing the whole page.
+    """
+
+    # Byte markers, in the order they appear; the download stops once the last one has been received
+    markers: tuple[bytes, ...]
+    # Elements the tree is restricted to. Only bs4 trees (SoupBackend, get_html) honour it; lxml parses the fetched
+    # part of the page whole, which the markers already keep short
+    parse_only: Optional[SoupStrainer] = None
 
 
 class Source:
+    article_cache_size = 16
+    # Seconds an Article handle is shared for, after which source.article(url) fetches the page again
+    article_ttl = 60
+    # Sources whose extraction works on raw page bytes keep their pages unparsed until a tree is actually needed
+    raw_documents = False
+    # Sources whose top headline is only found on the top article's own page
+    top_headline_from_article = False
+    # Backend used to evaluate CSS selectors; SoupBackend() restores plain bs4 evaluation
+    parser: SoupBackend = LxmlBackend()
+
     def __init__(
             self,
             name: str,
@@ -39,6 +120,25 @@ class Source:
         self.include_query_string = include_query_string
         self.tags_selector = tags_selector
 
+        # Field name (as in get_<field>) -> Region, for the fields fetch_partial_document can extract
+        self.regions: dict[str, Region] = {}
+
+        self.document_cache = DocumentCache(source=name)
+        self._articles: OrderedDict[str, tuple[float, Article]] = OrderedDict()
+        self._articles_lock = Lock()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        for name in EXTRACT_METHODS:
+            if name in cls.__dict__:
+                setattr(cls, name, instrumented(EXTRACT)(cls.__dict__[name]))
+
+        # Outside the extract timing, so partial fetches are only timed as fetches
+        for name, field in FIELD_METHODS.items():
+            if name in cls.__dict__:
+                setattr(cls, name, partially_fetched(field)(cls.__dict__[name]))
+
     @property
     @abstractmethod
     def top_article_selector(self) -> str:
@@ -62,105 +162,476 @@ class Source:
     def check_rss_error(self, feed: Tag):
         pass
 
-    def get_rss_item_tags(self, item: Tag) -> list[str]:
-        tags = item.find(self.rss_tags_name)
+    def is_block_page(self, content: bytes) -> bool:
+        """
+        :return: Whether the site served its block page instead of what was requested
+        """
+        return False
+
+    def check_block_page(self, content: bytes, url: str):
+        """
+        Back off from url's site and raise if content is a block page
+        """
+        if self.is_block_page(content):
+            get_transport().slow_down(url)
+            raise Exception(f"{self.name} served a block page for {url}")
+
+    def get_rss_item_tags(self, item: _Element) -> list[str]:
+        tags = child_text(item, self.rss_tags_name)
 
-        if tags is not None:
-            return [tag.strip() for tag in tags.text.split(",")]
+        if tags:
+            return [tag.strip() for tag in tags.split(",")]
 
         return []
 
+    def get_rss_items(self, url: str = None) -> Iterator[FeedItem]:
+        """
+        Stream the items of one of this source's feeds (rss_news_link by default)
+        """
+        return iter_feed(self, url)
+
     @staticmethod
     def get_content(url: str) -> tuple[bytes, str]:
-        response = get(url, verify=False, headers={
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
-                          "Chrome/89.0.4389.90 Safari/537.36 "
-            # "User-Agent": "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)"
-        })
+        return get_transport().fetch(url)
+
+    @staticmethod
+    def stream_content(url: str, chunk_size=16 * 1024) -> Iterator[bytes]:
+        return get_transport().stream(url, chunk_size)
+
+    @staticmethod
+    async def get_content_async(url: str) -> tuple[bytes, str]:
+        return await get_transport().fetch_async(url)
+
+    @staticmethod
+    def parse_html(content: Union[str, bytes]) -> Tag:
+        return parse_html(content)
+
+    def fetch_content(self, url: str) -> tuple[bytes, str]:
+        """
+        get_content, timed as this source's fetch stage
+        """
+        with timed(self.name, FETCH):
+            content, url = self.get_content(url)
+
+        self.check_block_page(content, url)
+        count(self.name, "bytes_fetched", len(content))
+
+        return content, url
+
+    async def fetch_content_async(self, url: str) -> tuple[bytes, str]:
+        with timed(self.name, FETCH):
+            content, url = await self.get_content_async(url)
+
+        self.check_block_page(content, url)
+        count(self.name, "bytes_fetched", len(content))
 
-        if not response.ok:
-            raise Exception(f"Got {response.status_code} when GETing {url}")
+        return content, url
 
-        return response.content, response.url
+    def fetch_content_until(self, url: str, sequences: Iterable[Sequence[bytes]]) -> tuple[bytes, str]:
+        """
+        Fetch url only up to the last of each sequence of markers, timed as this source's fetch stage
+        """
+        with timed(self.name, FETCH):
+            content, url = get_transport().fetch_until(url, sequences)
+
+        self.check_block_page(content, url)
+        count(self.name, "bytes_fetched", len(content))
+
+        return content, url
+
+    async def fetch_content_until_async(self, url: str, sequences: Iterable[Sequence[bytes]]) -> tuple[bytes, str]:
+        with timed(self.name, FETCH):
+            content, url = await get_transport().fetch_until_async(url, sequences)
+
+        self.check_block_page(content, url)
+        count(self.name, "bytes_fetched", len(content))
+
+        return content, url
+
+    def get_document_url(self, url: str) -> str:
+        """
+        :return: The URL an article's document is fetched from
+        """
+        return url
+
+    def load_document(self, content: bytes, url: str = None, parse_only: SoupStrainer = None) -> Any:
+        """
+        Turn fetched article bytes into the document the extraction methods expect
+        """
+        document = Document(content, url, source=self.name, parse_only=parse_only)
+
+        if self.raw_documents:
+            return document
+
+        return self.parser.prepare(document)
+
+    def fetch_document(self, url: str) -> tuple[Any, str]:
+        content, url = self.fetch_content(url)
+
+        return self.load_document(content, url), url
+
+    async def fetch_document_async(self, url: str) -> tuple[Any, str]:
+        content, url = await self.fetch_content_async(url)
+
+        if self.raw_documents:
+            return self.load_document(content, url), url
+
+        return await asyncio.to_thread(self.load_document, content, url), url
+
+    def fetch_partial_document(self, url: str, *fields: str) -> tuple[Any, str]:
+        """
+        Fetch only as much of an article's page as the given fields need, per self.regions. Falls back to the whole
+        document when any of them has no region.
+
+        :param fields: Field names, e.g. "times" and "category"
+        """
+        regions = [self.regions.get(field) for field in fields]
+        if not regions or None in regions:
+            return self.fetch_document(url)
+
+        content, url = self.fetch_content_until(
+            self.get_document_url(url),
+            [region.markers for region in regions],
+        )
+
+        return self.load_document(content, url, self._parse_only(regions)), url
+
+    async def fetch_partial_document_async(self, url: str, *fields: str) -> tuple[Any, str]:
+        regions = [self.regions.get(field) for field in fields]
+        if not regions or None in regions:
+            return await self.fetch_document_async(url)
+
+        content, url = await self.fetch_content_until_async(
+            self.get_document_url(url),
+            [region.markers for region in regions],
+        )
+
+        return await asyncio.to_thread(self.load_document, content, url, self._parse_only(regions)), url
 
     @staticmethod
-    def get_html(url, html: Union[Tag, str, bytes] = None) -> tuple[Tag, str]:
+    def _parse_only(regions: list[Region]) -> Optional[SoupStrainer]:
+        # Only a single region can restrict the tree, otherwise another field's elements might be left out
+        return regions[0].parse_only if len(regions) == 1 else None
+
+    def article(self, url: str) -> Article:
+        """
+        :return: The fetch-once Article for url, shared with callers asking for the same url within article_ttl
+        """
+        now = time.monotonic()
+
+        with self._articles_lock:
+            cached = self._articles.get(url)
+
+            if cached is not None and cached[0] > now:
+                self._articles.move_to_end(url)
+                return cached[1]
+
+            article = Article(self, url)
+            self._articles[url] = now + self.article_ttl, article
+            self._articles.move_to_end(url)
+
+            while len(self._articles) > self.article_cache_size:
+                self._articles.popitem(last=False)
+
+        return article
+
+    def fetched_article(self, url: str) -> Optional[Article]:
+        """
+        :return: The shared Article for url if its page was already fetched and is still within article_ttl
+        """
+        with self._articles_lock:
+            cached = self._articles.get(url)
+
+        if cached is not None and cached[0] > time.monotonic() and cached[1].fetched:
+            return cached[1]
+
+        return None
+
+    def invalidate_article(self, url: str = None):
+        """
+        Forget the shared Article for url (every Article if None), so the next source.article(url) fetches again
+        """
+        with self._articles_lock:
+            if url is None:
+                self._articles.clear()
+            else:
+                self._articles.pop(url, None)
+
+    def get_page(self, url, html: Union[Document, Tag, str, bytes] = None) -> tuple[Any, str]:
+        """
+        :return: The article's document as fetched: a parsed tree, or a Document for raw_documents sources. When html
+                 isn't given it's the shared source.article(url) document, fetched again once article_ttl passes or
+                 after invalidate_article(url)
+        """
         if html is None:
-            content, url = Source.get_content(url)
-            html = BeautifulSoup(content, "lxml")
+            article = self.article(url)
+            return article.document, article.url
+
+        return html, url
+
+    async def get_page_async(self, url, html: Union[Document, Tag, str, bytes] = None) -> tuple[Any, str]:
+        if html is None:
+            article = await self.article(url).fetch_async()
+            return article.document, article.url
+
+        return html, url
 
-            if len(html.body) == 0:
-                raise Exception("Empty body received")
+    def get_html(self, url, html: Union[Document, Tag, str, bytes] = None) -> tuple[Tag, str]:
+        """
+        An instance method (it used to be a staticmethod), since the page comes from this source's shared Article
+        """
+        html, url = self.get_page(url, html)
+
+        if isinstance(html, Document):
+            html = html.html
 
         return html, url
 
-    def get_root_content(self) -> bytes:
+    async def get_html_async(self, url, html: Union[Document, Tag, str, bytes] = None) -> tuple[Tag, str]:
+        html, url = await self.get_page_async(url, html)
+
+        if isinstance(html, Document):
+            html = await asyncio.to_thread(lambda: html.html)
+
+        return html, url
+
+    def get_raw(self, url, html: Union[Document, Tag, str, bytes] = None) -> tuple[Document, str]:
+        html, url = self.get_page(url, html)
+
+        return get_document(html, url), url
+
+    def load_root_content(self, content: bytes) -> Any:
+        """
+        Convert fetched front page bytes into the root_content get_top_article_a/get_substories_a expect: a single
+        Document, so both (and everything they memoize) share one hash and one parse of the page
+        """
+        return Document(content, source=self.name)
+
+    def get_front_page_region(self, content: bytes) -> bytes:
+        """
+        :return: The part of the raw front page that the top article and substories are extracted from
+        """
+        return content
+
+    async def resolve_root_async(self) -> str:
+        """
+        :return: The front page URL, for sources whose root may have to be resolved over the network
+        """
+        return self.root
+
+    def get_root_content(self) -> Any:
         try:
-            root_content, _ = self.get_content(self.root)
+            root_content, _ = self.fetch_content(self.root)
         except Exception:
             logger.error("Couldn't GET root content")
             raise
 
-        return root_content
+        return self.load_root_content(root_content)
 
+    async def get_root_content_async(self) -> Any:
+        try:
+            root_content, _ = await self.fetch_content_async(self.root)
+        except Exception:
+            logger.error("Couldn't GET root content")
+            raise
+
+        return self.load_root_content(root_content)
+
+    @instrumented(EXTRACT)
     def get_top_article_a(self, root_content: Union[str, bytes, Tag] = None) -> Tag:
         if root_content is None:
             root_content = self.get_root_content()
 
-        if not isinstance(root_content, Tag):
-            root_content = BeautifulSoup(root_content, "lxml")
-
-        top_article_a = root_content.select_one(self.top_article_selector)
+        top_article_a = self.parser.select_one(root_content, self.top_article_selector)
         if top_article_a is None:
             raise Exception("Bad top article selector")
 
-        return top_article_a
+        return self.parser.to_tag(top_article_a)
 
+    @instrumented(EXTRACT)
     def get_substories_a(self, root_content: Union[str, bytes, Tag] = None) -> list[Tag]:
         if root_content is None:
             root_content = self.get_root_content()
 
-        if not isinstance(root_content, Tag):
-            root_content = BeautifulSoup(root_content, "lxml")
-
-        substories = root_content.select(self.substories_selector)
+        substories = self.parser.select(root_content, self.substories_selector)
         if not substories:
             raise Exception("Bad substories selector")
 
-        return substories
+        return [self.parser.to_tag(a) for a in substories]
+
+    async def get_top_article_a_async(self, root_content: Union[str, bytes, Tag] = None) -> Tag:
+        if root_content is None:
+            root_content = await self.get_root_content_async()
+
+        return await asyncio.to_thread(self.get_top_article_a, root_content)
+
+    async def get_substories_a_async(self, root_content: Union[str, bytes, Tag] = None) -> list[Tag]:
+        if root_content is None:
+            root_content = await self.get_root_content_async()
+
+        return await asyncio.to_thread(self.get_substories_a, root_content)
 
-    def get_headline(self, a: Tag, top_article=False) -> str:
+    def create_headline(self, url: str, headline: str, position: int) -> Headline:
+        return Headline(source=self.name, url=urljoin(self.root, url), headline=headline, position=position)
+
+    @instrumented(EXTRACT)
+    def get_headlines(self, root_content: Union[str, bytes, Tag] = None, fetch_articles=True) -> list[Headline]:
+        """
+        :param fetch_articles: False leaves a top headline that is only found on its article's page empty instead of
+                               fetching it, for get_headline_details to fill in
+        :return: The top article (position 0) and substories as Headline records, which don't reference the page tree
+        """
+        if root_content is None:
+            root_content = self.get_root_content()
+        elif isinstance(root_content, (str, bytes)):
+            root_content = self.load_root_content(get_document(root_content).content)
+
+        a_list = [self.get_top_article_a(root_content), *self.get_substories_a(root_content)]
+
+        headlines = []
+        for position, a in enumerate(a_list):
+            if position == 0 and self.top_headline_from_article and not fetch_articles:
+                headline = ""
+            else:
+                headline = str(self.get_headline(a, top_article=position == 0))
+
+            headlines.append(self.create_headline(str(a.attrs["href"]), headline, position))
+
+        return headlines
+
+    async def get_headlines_async(
+            self,
+            root_content: Union[str, bytes, Tag] = None,
+            fetch_articles=True,
+    ) -> list[Headline]:
+        if root_content is None:
+            root_content = await self.get_root_content_async()
+
+        return await asyncio.to_thread(self.get_headlines, root_content, fetch_articles)
+
+    def use_root(self, root: str):
+        """
+        Extract against a root already resolved elsewhere (e.g. by the process that fetched the front page)
+        """
+        self.root = root
+
+    def get_headline_details(self, headline: Headline) -> Headline:
+        """
+        :return: A copy of headline with its article's times, category and tags filled in, and its headline if it was
+                 left empty
+        """
+        article = self.article(headline.url)
+        tags = article.tags
+
+        return replace(
+            headline,
+            headline=headline.headline or article.headline or "",
+            published=article.published,
+            updated=article.updated,
+            category=article.category,
+            tags=None if tags is None else tuple(tags),
+        )
+
+    async def get_headline_details_async(self, headline: Headline) -> Headline:
+        await self.article(headline.url).fetch_async()
+
+        return await asyncio.to_thread(self.get_headline_details, headline)
+
+    @instrumented(EXTRACT)
+    def get_headline(self, a: Tag, top_article=False, html: Union[Document, Tag] = None) -> str:
+        """
+        :param html: The already-fetched article document, for sources that read a headline from the article itself
+        """
         return a.text.strip()
 
+    @instrumented(EXTRACT)
+    def get_article_headline(self, url: str, html: Tag = None) -> Optional[str]:
+        page, url = self.get_page(url, html)
+
+        og_title = self.parser.select_one(page, "meta[property='og:title'][content]")
+        if og_title is not None:
+            return self.parser.attr(og_title, "content").strip()
+
+        h1 = self.parser.select_one(page, "h1")
+        if h1 is not None:
+            return self.parser.text(h1).strip()
+
+        return None
+
     def valid_substory(self, a: Tag) -> bool:
         return True
 
+    @instrumented(EXTRACT)
     def is_premium(self, url: str, html: Tag = None) -> bool:
         return False
 
+    @partially_fetched("times")
+    @instrumented(EXTRACT)
     def get_times(self, url: str, html: Tag = None) -> tuple[Optional[datetime], Optional[datetime]]:
         """
         :return: Tuple of published time and last updated time (if any)
         """
         return None, None
 
+    async def get_times_async(self, url: str, html: Tag = None) -> tuple[Optional[datetime], Optional[datetime]]:
+        if html is None and "times" in self.regions:
+            html, url = await self.fetch_partial_document_async(url, "times")
+        else:
+            html, url = await self.get_page_async(url, html)
+
+        return await asyncio.to_thread(self.get_times, url, html)
+
+    @instrumented(EXTRACT)
     def get_tags(self, url: str, html: Tag = None) -> Optional[list[str]]:
         if self.tags_selector is None:
             return None
 
-        html, url = self.get_html(url, html)
+        page, url = self.get_page(url, html)
 
-        tags_a = html.select(self.tags_selector)
-        return [a.text for a in tags_a]
+        tags_a = self.parser.select(page, self.tags_selector)
+        return [self.parser.text(a) for a in tags_a]
 
+    @partially_fetched("category")
+    @instrumented(EXTRACT)
     def get_category(self, url: str, html: Tag = None) -> str:
-        html, url = self.get_html(url, html)
+        page, url = self.get_page(url, html)
 
-        category = html.select_one(self.category_selector)
+        category = self.parser.select_one(page, self.category_selector)
         if category is None:
             raise Exception(f"Couldn't get category for {url}")
 
-        return normalize("NFKD", category.text)
+        return normalize("NFKD", self.parser.text(category))
+
+    async def get_category_async(self, url: str, html: Tag = None) -> str:
+        if html is None and "category" in self.regions:
+            html, url = await self.fetch_partial_document_async(url, "category")
+        else:
+            html, url = await self.get_page_async(url, html)
+
+        return await asyncio.to_thread(self.get_category, url, html)
+
+    def get_article_details(
+            self,
+            url: str,
+            html: Tag = None,
+    ) -> tuple[Optional[str], str, tuple[Optional[datetime], Optional[datetime]]]:
+        """
+        Read the headline, category and times of an article from a single fetch of its page
+
+        :return: Tuple of headline, category and (published, updated) times
+        """
+        html, url = self.get_page(url, html)
+
+        return self.get_article_headline(url, html), self.get_category(url, html), self.get_times(url, html)
+
+    async def get_article_details_async(
+            self,
+            url: str,
+            html: Tag = None,
+    ) -> tuple[Optional[str], str, tuple[Optional[datetime], Optional[datetime]]]:
+        html, url = await self.get_page_async(url, html)
+
+        return await asyncio.to_thread(self.get_article_details, url, html)
 
     def __repr__(self):
         return f"<Source {self.name}>"
@@ -0,0 +1,315 @@
+import json
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+from typing import Iterable, Optional, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from newslib.records import Headline
+from newslib.rss import FeedItem
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    source TEXT NOT NULL,
+    key TEXT NOT NULL,
+    url TEXT,
+    guid TEXT,
+    headline TEXT,
+    category TEXT,
+    tags TEXT,
+    published REAL,
+    updated REAL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (source, key)
+);
+
+CREATE INDEX IF NOT EXISTS articles_latest ON articles (source, published DESC);
+CREATE INDEX IF NOT EXISTS articles_published ON articles (published);
+CREATE INDEX IF NOT EXISTS articles_guid ON articles (source, guid);
+
+CREATE TABLE IF NOT EXISTS positions (
+    source TEXT NOT NULL,
+    key TEXT NOT NULL,
+    seen REAL NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (source, key, seen)
+) WITHOUT ROWID;
+"""
+
+# Fields left NULL by a record keep their stored value, so front page records don't erase an article's details. The
+# URL an article was first seen at is kept, since later links to it may carry tracking parameters.
+# Unchanged rows are skipped unless last_seen advances by at least the store's resolution
+UPSERT = """
+INSERT INTO articles (source, key, url, guid, headline, category, tags, published, updated, first_seen, last_seen)
+VALUES (:source, :key, :url, :guid, :headline, :category, :tags, :published, :updated, :seen, :seen)
+ON CONFLICT (source, key) DO UPDATE SET
+    url = coalesce(url, excluded.url),
+    guid = coalesce(excluded.guid, guid),
+    headline = coalesce(excluded.headline, headline),
+    category = coalesce(excluded.category, category),
+    tags = coalesce(excluded.tags, tags),
+    published = coalesce(excluded.published, published),
+    updated = coalesce(excluded.updated, updated),
+    first_seen = min(first_seen, excluded.first_seen),
+    last_seen = max(last_seen, excluded.last_seen)
+WHERE
+    coalesce(url, excluded.url) IS NOT url
+    OR coalesce(excluded.guid, guid) IS NOT guid
+    OR coalesce(excluded.headline, headline) IS NOT headline
+    OR coalesce(excluded.category, category) IS NOT category
+    OR coalesce(excluded.tags, tags) IS NOT tags
+    OR coalesce(excluded.published, published) IS NOT published
+    OR coalesce(excluded.updated, updated) IS NOT updated
+    OR excluded.last_seen >= last_seen + :resolution
+    OR excluded.first_seen < first_seen
+"""
+
+COLUMNS = "source, key, url, guid, headline, category, tags, published, updated, first_seen, last_seen"
+
+# Query parameters that only track where a link was clicked, not which article it is
+TRACKING_PARAMETERS = {"fbclid", "gclid", "ref", "utm_campaign", "utm_content", "utm_medium", "utm_source", "utm_term"}
+
+
+@dataclass
+class StoredArticle:
+    source: str
+    # Canonical URL, or RSS guid for feed items without a link
+    key: str
+    url: Optional[str]
+    guid: Optional[str]
+    headline: Optional[str]
+    category: Optional[str]
+    tags: Optional[tuple[str, ...]]
+    published: Optional[datetime]
+    updated: Optional[datetime]
+    first_seen: datetime
+    last_seen: datetime
+
+
+def canonical_url(url: str) -> str:
+    """
+    :return: url in the form articles are keyed by: https, no www., default port, fragment, tracking parameters or
+             trailing slash, and the remaining query parameters sorted
+    """
+    parts = urlsplit(url.strip())
+
+    host = (parts.hostname or "").removeprefix("www.")
+    if parts.port is not None and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    query = sorted((name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+                   if name.lower() not in TRACKING_PARAMETERS)
+    path = parts.path.rstrip("/") or "/"
+
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+def _timestamp(value: Optional[datetime]) -> Optional[float]:
+    return None if value is None else value.timestamp()
+
+
+def _datetime(value: Optional[float]) -> Optional[datetime]:
+    return None if value is None else datetime.fromtimestamp(value)
+
+
+def _tags(tags: Optional[Iterable[str]]) -> Optional[str]:
+    return None if tags is None else json.dumps(list(tags), ensure_ascii=False)
+
+
+class ArticleStore:
+    """
+    Local SQLite store of every article seen, by source and canonical URL (or guid, for feed items without a link),
+    plus the front page positions each was seen at over time. Front page and feed records of an article share its row.
+
+    Records are written in batches, one transaction per batch, and rows whose stored values wouldn't change are skipped.
+    Times are stored as Unix timestamps and read back as local naive datetimes.
+    """
+
+    # Seconds last_seen has to advance by before an otherwise unchanged row is rewritten
+    last_seen_resolution = 60
+
+    def __init__(self, path: Union[str, Path] = ":memory:"):
+        self.path = path
+        self._lock = Lock()
+
+        self.connection = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+
+        if path != ":memory:":
+            self.connection.execute("PRAGMA journal_mode = WAL")
+            # WAL keeps committed transactions durable across crashes with NORMAL, only a power loss can drop the last
+            self.connection.execute("PRAGMA synchronous = NORMAL")
+
+        self.connection.executescript(SCHEMA)
+
+    def _write(self, rows: list[dict], positions: list[tuple]) -> int:
+        """
+        :return: Number of article rows inserted or changed
+        """
+        if not rows:
+            return 0
+
+        with self._lock:
+            cursor = self.connection.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+
+            try:
+                cursor.executemany(UPSERT, rows)
+                written = cursor.rowcount
+
+                cursor.executemany(
+                    "INSERT OR IGNORE INTO positions (source, key, seen, position) VALUES (?, ?, ?, ?)",
+                    positions,
+                )
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+
+            cursor.execute("COMMIT")
+
+        return written
+
+    def add_headlines(self, headlines: Iterable[Headline], seen: float = None) -> int:
+        """
+        Record headlines, and their front page positions, as seen at the given time (now by default)
+
+        :return: Number of article rows inserted or changed
+        """
+        if seen is None:
+            seen = time.time()
+
+        rows = {}
+        positions = []
+        for headline in headlines:
+            key = canonical_url(headline.url)
+            rows[headline.source, key] = {
+                "source": headline.source,
+                "key": key,
+                "url": headline.url,
+                "guid": None,
+                "headline": headline.headline,
+                "category": headline.category,
+                "tags": _tags(headline.tags),
+                "published": _timestamp(headline.published),
+                "updated": _timestamp(headline.updated),
+                "seen": seen,
+                "resolution": self.last_seen_resolution,
+            }
+            positions.append((headline.source, key, seen, headline.position))
+
+        return self._write(list(rows.values()), positions)
+
+    def add_feed_items(self, items: Iterable[FeedItem], seen: float = None) -> int:
+        """
+        Record RSS items by their link's canonical URL, keeping their guid
+
+        :return: Number of article rows inserted or changed
+        """
+        if seen is None:
+            seen = time.time()
+
+        rows = {}
+        for item in items:
+            key = item.guid if item.link is None else canonical_url(item.link)
+            rows[item.source, key] = {
+                "source": item.source,
+                "key": key,
+                "url": item.link,
+                "guid": item.guid,
+                "headline": item.title,
+                "category": None,
+                "tags": _tags(item.tags) if item.tags else None,
+                "published": _timestamp(item.created),
+                "updated": _timestamp(item.modified),
+                "seen": seen,
+                "resolution": self.last_seen_resolution,
+            }
+
+        return self._write(list(rows.values()), [])
+
+    def _articles(self, where: str, parameters: tuple) -> list[StoredArticle]:
+        with self._lock:
+            rows = self.connection.execute(f"SELECT {COLUMNS} FROM articles {where}", parameters).fetchall()
+
+        return [
+            StoredArticle(
+                source=source,
+                key=key,
+                url=url,
+                guid=guid,
+                headline=headline,
+                category=category,
+                tags=None if tags is None else tuple(json.loads(tags)),
+                published=_datetime(published),
+                updated=_datetime(updated),
+                first_seen=_datetime(first_seen),
+                last_seen=_datetime(last_seen),
+            )
+            for source, key, url, guid, headline, category, tags, published, updated, first_seen, last_seen in rows
+        ]
+
+    def get(self, source: str, url: str = None, guid: str = None) -> Optional[StoredArticle]:
+        """
+        :return: The article stored for url (in any of its forms), or else for an RSS guid
+        """
+        if url is not None:
+            articles = self._articles("WHERE source = ? AND key = ?", (source, canonical_url(url)))
+            if articles or guid is None:
+                return articles[0] if articles else None
+
+        articles = self._articles("WHERE source = ? AND (guid = ? OR key = ?)", (source, guid, guid))
+
+        return articles[0] if articles else None
+
+    def latest(self, source: str, limit=20) -> list[StoredArticle]:
+        """
+        :return: The source's most recently published articles, newest first
+        """
+        return self._articles(
+            "WHERE source = ? AND published IS NOT NULL ORDER BY published DESC LIMIT ?",
+            (source, limit),
+        )
+
+    def published_between(self, start: datetime, end: datetime, source: str = None) -> list[StoredArticle]:
+        """
+        :return: Articles published in [start, end), oldest first
+        """
+        if source is None:
+            return self._articles(
+                "WHERE published >= ? AND published < ? ORDER BY published",
+                (start.timestamp(), end.timestamp()),
+            )
+
+        return self._articles(
+            "WHERE source = ? AND published >= ? AND published < ? ORDER BY published",
+            (source, start.timestamp(), end.timestamp()),
+        )
+
+    def positions(self, source: str, url: str) -> list[tuple[datetime, int]]:
+        """
+        :return: (seen, position) pairs of an article's front page appearances, oldest first
+        """
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT seen, position FROM positions WHERE source = ? AND key = ? ORDER BY seen",
+                (source, canonical_url(url)),
+            ).fetchall()
+
+        return [(_datetime(seen), position) for seen, position in rows]
+
+    def __len__(self):
+        with self._lock:
+            return self.connection.execute("SELECT count(*) FROM articles").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
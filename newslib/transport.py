@@ -0,0 +1,285 @@
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterable, Iterator, Optional, Sequence
+from urllib.parse import urlparse
+from weakref import WeakKeyDictionary
+
+import urllib3
+from requests import Response, Session
+from requests.adapters import BaseAdapter, HTTPAdapter
+
+from newslib.cache import ResponseCache
+from newslib.instrumentation import count
+from newslib.payload import MarkerScanner
+from newslib.ratelimit import SLOW_DOWN_STATUSES, RateLimiter, retry_after
+
+# Sources are fetched with verify=False by default
+urllib3.disable_warnings()
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+                  "Chrome/89.0.4389.90 Safari/537.36 "
+    # "User-Agent": "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)"
+}
+
+# URL whose rate limit token fetch_async already waited for, so the request it runs in a thread doesn't wait again
+_reserved: ContextVar[Optional[str]] = ContextVar("reserved", default=None)
+
+
+class AsyncLimits:
+    """
+    In-flight request bounds for a single event loop, both globally and per host.
+    """
+
+    def __init__(self, max_in_flight: int, max_per_host: int):
+        self.max_per_host = max_per_host
+        self.in_flight = asyncio.Semaphore(max_in_flight)
+        self.hosts: dict[str, asyncio.Semaphore] = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str, delay: Callable[[], float] = None):
+        """
+        :param delay: Called once the host slot is held, returns seconds to wait before taking a global slot
+        """
+        host = urlparse(url).hostname
+        host_slots = self.hosts.get(host)
+        if host_slots is None:
+            host_slots = self.hosts[host] = asyncio.Semaphore(self.max_per_host)
+
+        # Wait for the host (and its rate limit) first so a busy host doesn't hold on to global slots, which are then
+        # handed out first come, first served across hosts
+        async with host_slots:
+            if delay is not None:
+                seconds = delay()
+                if seconds > 0:
+                    count(None, "rate_limit_waits")
+                    await asyncio.sleep(seconds)
+
+            async with self.in_flight:
+                yield
+
+
+class Transport:
+    """
+    Shared HTTP transport: a single keep-alive session with a connection pool per host.
+    """
+
+    def __init__(
+            self,
+            connect_timeout: float = 5.0,
+            read_timeout: float = 30.0,
+            pool_connections: int = 16,
+            pool_maxsize: int = 16,
+            max_retries: int = 0,
+            headers: dict[str, str] = None,
+            verify=False,
+            adapter: BaseAdapter = None,
+            max_in_flight: int = 16,
+            max_per_host: int = 4,
+            cache: ResponseCache = None,
+            rate_limiter: RateLimiter = None,
+    ):
+        """
+        :param rate_limiter: Per-host request rates, unlimited if None
+        """
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.verify = verify
+        self.max_in_flight = max_in_flight
+        self.max_per_host = max_per_host
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self._limits: WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncLimits] = WeakKeyDictionary()
+
+        self.session = Session()
+        self.session.headers.update(DEFAULT_HEADERS if headers is None else headers)
+
+        if adapter is None:
+            adapter = HTTPAdapter(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                max_retries=max_retries,
+            )
+
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+
+    @property
+    def timeout(self) -> tuple[float, float]:
+        return self.connect_timeout, self.read_timeout
+
+    def mount(self, prefix: str, adapter: BaseAdapter):
+        self.session.mount(prefix, adapter)
+
+    def request(self, url: str, headers: dict[str, str] = None, stream=False) -> Response:
+        if self.rate_limiter is not None and _reserved.get() != url:
+            self.rate_limiter.wait(url)
+
+        response = self.session.get(url, headers=headers, timeout=self.timeout, verify=self.verify, stream=stream)
+
+        if self.rate_limiter is not None:
+            if response.status_code in SLOW_DOWN_STATUSES:
+                self.rate_limiter.slow_down(url, retry_after(response.headers.get("Retry-After")))
+            elif response.ok:
+                self.rate_limiter.recover(url)
+
+        return response
+
+    def slow_down(self, url: str):
+        """
+        Back off from url's host, e.g. when it served a block page
+        """
+        if self.rate_limiter is not None:
+            self.rate_limiter.slow_down(url)
+
+    def _reserve(self, url: str, cached: bool) -> float:
+        entry = None if self.cache is None or not cached else self.cache.get(url)
+
+        # Fresh cache hits never reach the network
+        if entry is not None and entry.fresh:
+            return 0.0
+
+        return self.rate_limiter.reserve(url)
+
+    def fetch(self, url: str) -> tuple[bytes, str]:
+        if self.cache is None:
+            response = self.request(url)
+
+            if not response.ok:
+                raise Exception(f"Got {response.status_code} when GETing {url}")
+
+            return response.content, response.url
+
+        entry = self.cache.get(url)
+        if entry is not None and entry.fresh:
+            cached = self.cache.hit(entry)
+            if cached is not None:
+                return cached
+
+            entry = None
+
+        response = self.request(url, headers=None if entry is None else entry.conditional_headers())
+
+        if response.status_code == 304 and entry is not None:
+            cached = self.cache.revalidated(entry, response)
+            if cached is not None:
+                return cached
+
+            # Evicted while we were revalidating it
+            response = self.request(url)
+
+        if not response.ok:
+            raise Exception(f"Got {response.status_code} when GETing {url}")
+
+        self.cache.store(url, response)
+
+        return response.content, response.url
+
+    def stream(self, url: str, chunk_size=16 * 1024) -> Iterator[bytes]:
+        """
+        Yield the response body in chunks as it arrives. Streamed responses bypass the cache.
+        """
+        with self.request(url, stream=True) as response:
+            if not response.ok:
+                raise Exception(f"Got {response.status_code} when GETing {url}")
+
+            yield from response.iter_content(chunk_size)
+
+    def fetch_until(self, url: str, sequences: Iterable[Sequence[bytes]], chunk_size=16 * 1024) -> tuple[bytes, str]:
+        """
+        Stream the response body, stopping the download once every sequence of markers has been seen in order (or the
+        body ends). Partial reads bypass the cache.
+        """
+        scanner = MarkerScanner(sequences)
+        content = bytearray()
+
+        with self.request(url, stream=True) as response:
+            if not response.ok:
+                raise Exception(f"Got {response.status_code} when GETing {url}")
+
+            for chunk in response.iter_content(chunk_size):
+                content += chunk
+
+                if scanner.feed(content):
+                    break
+
+            return bytes(content), response.url
+
+    def limits(self) -> AsyncLimits:
+        loop = asyncio.get_running_loop()
+
+        limits = self._limits.get(loop)
+        if limits is None:
+            limits = self._limits[loop] = AsyncLimits(self.max_in_flight, self.max_per_host)
+
+        return limits
+
+    async def _limited(self, url: str, function: Callable, *args, cached=True):
+        """
+        Run a blocking request for url in a thread, once the in-flight limits and the rate limit allow it
+
+        :param cached: Whether function may be served from the cache, in which case no rate limit token is needed
+        """
+        if self.rate_limiter is None:
+            async with self.limits().slot(url):
+                return await asyncio.to_thread(function, *args)
+
+        async with self.limits().slot(url, lambda: self._reserve(url, cached)):
+            token = _reserved.set(url)
+            try:
+                return await asyncio.to_thread(function, *args)
+            finally:
+                _reserved.reset(token)
+
+    async def fetch_async(self, url: str) -> tuple[bytes, str]:
+        return await self._limited(url, self.fetch, url)
+
+    async def fetch_until_async(
+            self,
+            url: str,
+            sequences: Iterable[Sequence[bytes]],
+            chunk_size=16 * 1024,
+    ) -> tuple[bytes, str]:
+        return await self._limited(url, self.fetch_until, url, list(sequences), chunk_size, cached=False)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        return f"<Transport timeout={self.timeout}>"
+
+
+_transport: Optional[Transport] = None
+
+
+def get_transport() -> Transport:
+    """
+    :return: The transport every Source fetches through. Unless one was installed with set_transport, it's created on
+             first use and rate limited per site with RateLimiter.for_sources() (DEFAULT_RATE requests per second); pass
+             rate_limiter=None to a Transport of your own to fetch unlimited
+    """
+    global _transport
+
+    if _transport is None:
+        _transport = Transport(rate_limiter=RateLimiter.for_sources())
+
+    return _transport
+
+
+def set_transport(transport: Optional[Transport]) -> Optional[Transport]:
+    """
+    Replace the transport used by every Source.
+
+    :return: The previously installed transport (if any)
+    """
+    global _transport
+
+    previous, _transport = _transport, transport
+    return previous
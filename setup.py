@@ -16,6 +16,7 @@ setup(
         "pytest",
         "requests",
         "lxml",
+        "cssselect",
         "lzstring",
     ]
 )
@@ -0,0 +1,48 @@
+import os
+
+import pytest
+from requests.adapters import BaseAdapter
+
+from newslib.corpus import Corpus, RecordingAdapter, ReplayAdapter
+from newslib.israel.news13 import News13Source
+from newslib.transport import Transport, set_transport
+
+
+def pytest_configure(config):
+    """
+    NEWSLIB_CORPUS=<dir> runs the live-site tests against the latest recorded corpus version under dir instead of the
+    network. With NEWSLIB_RECORD=1 as well, the network is used and every response is recorded into a new version.
+    """
+    root = os.environ.get("NEWSLIB_CORPUS")
+    if not root:
+        return
+
+    if os.environ.get("NEWSLIB_RECORD"):
+        adapter = RecordingAdapter(Corpus.create(root))
+    else:
+        adapter = ReplayAdapter(Corpus.open(root, os.environ.get("NEWSLIB_CORPUS_VERSION")))
+
+    set_transport(Transport(adapter=adapter))
+    # Roots persisted on this machine would skip fetching (and recording) the entry page
+    News13Source.root_cache_path = None
+
+
+@pytest.fixture
+def install_transport():
+    """
+    install_transport(adapter, **options) makes a Transport over adapter the shared one until the test ends
+    """
+    previous = []
+
+    def install(adapter: BaseAdapter, **options) -> Transport:
+        transport = Transport(adapter=adapter, **options)
+        replaced = set_transport(transport)
+        if not previous:
+            previous.append(replaced)
+
+        return transport
+
+    yield install
+
+    if previous:
+        set_transport(previous[0])
@@ -0,0 +1,101 @@
+import json
+from datetime import datetime
+from urllib.parse import quote
+
+from lzstring import LZString
+from requests import Response
+from requests.adapters import BaseAdapter
+
+from newslib.source import Source
+
+
+class StubAdapter(BaseAdapter):
+    def __init__(self, status_code=200, content=b"<html><body>ok</body></html>", pages: dict[str, bytes] = None):
+        super().__init__()
+        self.status_code = status_code
+        self.content = content
+        self.pages = pages
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append((request, kwargs))
+
+        response = Response()
+        response.status_code = self.status_code
+        response._content = self.content
+        response._content_consumed = True
+        response.url = request.url
+        response.request = request
+
+        if self.pages is not None:
+            if request.url in self.pages:
+                response._content = self.pages[request.url]
+            else:
+                response.status_code = 404
+
+        return response
+
+    def close(self):
+        pass
+
+
+def walla_page(titles: list[str]) -> bytes:
+    data = {
+        "***Editor_3": {"data": {"editor": {"data": {"events": [
+            {"title": title, "canonical": {"url": f"https://news.walla.co.il/item/{i}"}}
+            for i, title in enumerate(titles)
+        ]}}}},
+    }
+    state = LZString().compressToBase64(quote(json.dumps(data)))
+
+    return f'<html><body><script>window.loadDataState = "{state}"</script></body></html>'.encode()
+
+
+def news13_entry_page(base_url: str) -> bytes:
+    data = {"props": {"pageProps": {"baseUrl": base_url}}}
+    return f'<html><script id="__NEXT_DATA__" type="application/json">{json.dumps(data)}</script></html>'.encode()
+
+
+FRONT_PAGE = b"""
+<html><body>
+<div class="top"><a href="/a/1">Top story</a></div>
+<ul class="subs">
+<li><a href="/a/2">Second</a></li>
+<li><a href="/a/3">Broken</a></li>
+</ul>
+</body></html>
+"""
+
+
+def article_page(category: str) -> bytes:
+    return f"""
+    <html><body>
+    <span class="category">{category}</span>
+    <time>2024-01-01 10:00</time>
+    </body></html>
+    """.encode()
+
+
+class DummySource(Source):
+    def __init__(self):
+        super().__init__(name="dummy", root="https://dummy.example.com/")
+
+    @property
+    def top_article_selector(self) -> str:
+        return ".top a"
+
+    @property
+    def substories_selector(self) -> str:
+        return ".subs a"
+
+    @property
+    def category_selector(self) -> str:
+        return ".category"
+
+    @property
+    def published_selector(self) -> str:
+        return "time"
+
+    def get_times(self, url, html=None):
+        html, url = self.get_html(url, html)
+        return datetime.strptime(html.select_one(self.published_selector).text, "%Y-%m-%d %H:%M"), None
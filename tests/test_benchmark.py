@@ -0,0 +1,65 @@
+import json
+
+from newslib import registry
+from newslib.benchmark import compare, main, run_benchmarks
+from newslib.corpus import recording
+from tests.stubs import StubAdapter
+from tests.stubs import FRONT_PAGE, DummySource, article_page
+
+PAGES = {
+    "https://dummy.example.com/": FRONT_PAGE,
+    "https://dummy.example.com/a/1": article_page("Politics"),
+    "https://dummy.example.com/a/2": article_page("Sports"),
+}
+
+
+def test_benchmark_from_corpus(tmp_path, capsys, monkeypatch):
+    monkeypatch.setattr(registry, "_factories", {"dummy": DummySource})
+    monkeypatch.setattr(registry, "_sources", {})
+
+    # Benchmarking refetches the same pages, which the stub can serve as fast as they are asked for
+    adapter = StubAdapter(pages=PAGES)
+    with recording(tmp_path / "corpus", adapter=adapter, rate_limiter=None):
+        # Timed runs reuse one fetch of each page, so how many there are doesn't change what's fetched
+        run_benchmarks([DummySource()], repeat=1, duration=0)
+        fetches = len(adapter.requests)
+        run_benchmarks([DummySource()], repeat=5, duration=0)
+        assert len(adapter.requests) == 2 * fetches
+
+        results = run_benchmarks([DummySource()], repeat=2, duration=0.01)
+
+    dummy = results["results"]["dummy"]
+    assert dummy["pages"] == 4
+    assert dummy["get_top_article_a"]["latency_ms"] > 0
+    assert dummy["get_category"]["allocated_kb"] > 0
+    assert dummy["throughput"]["records_per_s"] > 0
+    assert dummy["peak_memory_kb"] > 0
+
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(results))
+    assert compare(results, results) == []
+
+    faster = json.loads(json.dumps(results))
+    faster["results"]["dummy"]["get_top_article_a"]["latency_ms"] /= 10
+    baseline.write_text(json.dumps(faster))
+
+    assert main([str(tmp_path / "corpus"), "--baseline", str(baseline), "--threshold", "0.5", "--source", "dummy", "--duration", "0.01"]) == 1
+    assert "Regression: dummy.get_top_article_a.latency_ms" in capsys.readouterr().err
+
+
+def test_throughput_drop_is_a_regression():
+    baseline = {"results": {"ynet": {"throughput": {"records_per_s": 100.0}, "peak_memory_kb": 10.0}}}
+    results = {"results": {"ynet": {"throughput": {"records_per_s": 70.0}, "peak_memory_kb": 11.0}}}
+
+    assert compare(results, baseline, threshold=0.2) == ["ynet.throughput.records_per_s: 100.000 -> 70.000 (+30%)"]
+
+
+def test_reference_decompression_is_not_compared():
+    payload = {"reference": {"latency_ms": 10.0}, "fast": {"latency_ms": 1.0}, "speedup": 10.0}
+    baseline = {"results": {"walla": {"payload": payload}}}
+    results = {"results": {"walla": {"payload": {"reference": {"latency_ms": 1.0}, "fast": {"latency_ms": 1.0}, "speedup": 1.0}}}}
+
+    assert compare(results, baseline) == []
+
+    results["results"]["walla"]["payload"]["fast"]["latency_ms"] = 2.0
+    assert compare(results, baseline) == ["walla.payload.fast.latency_ms: 1.000 -> 2.000 (+100%)"]
@@ -0,0 +1,140 @@
+from requests import Response
+
+from newslib.cache import ResponseCache
+from newslib.instrumentation import PrometheusListener, set_listener
+from newslib.transport import Transport
+from tests.stubs import StubAdapter
+
+
+class ETagAdapter(StubAdapter):
+    def __init__(self, cache_control="max-age=0"):
+        super().__init__()
+        self.cache_control = cache_control
+        self.version = 1
+
+    def send(self, request, **kwargs):
+        self.requests.append((request, kwargs))
+
+        etag = f'"v{self.version}"'
+
+        response = Response()
+        response.url = request.url
+        response.request = request
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = self.cache_control
+
+        if request.headers.get("If-None-Match") == etag:
+            response.status_code = 304
+            response._content = b""
+        else:
+            response.status_code = 200
+            response._content = f"{request.url} v{self.version}".encode()
+
+        response._content_consumed = True
+
+        return response
+
+
+def test_revalidates_with_etag(tmp_path):
+    adapter = ETagAdapter()
+    cache = ResponseCache(tmp_path)
+    transport = Transport(adapter=adapter, cache=cache)
+    url = "https://example.com/"
+
+    assert transport.fetch(url) == (b"https://example.com/ v1", url)
+    assert transport.fetch(url) == (b"https://example.com/ v1", url)
+    assert adapter.requests[1][0].headers["If-None-Match"] == '"v1"'
+
+    adapter.version = 2
+    assert transport.fetch(url) == (b"https://example.com/ v2", url)
+
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.revalidations) == (0, 2, 1)
+
+
+def test_serves_fresh_entries_and_persists(tmp_path):
+    adapter = ETagAdapter(cache_control="max-age=60")
+    transport = Transport(adapter=adapter, cache=ResponseCache(tmp_path))
+    url = "https://example.com/"
+
+    transport.fetch(url)
+
+    cache = ResponseCache(tmp_path)
+    transport = Transport(adapter=adapter, cache=cache)
+    assert transport.fetch(url) == (b"https://example.com/ v1", url)
+
+    assert len(adapter.requests) == 1
+    assert cache.stats.hits == 1
+
+
+def test_min_ttl_floor(tmp_path):
+    adapter = ETagAdapter(cache_control="no-cache")
+    transport = Transport(adapter=adapter, cache=ResponseCache(tmp_path, min_ttl=60))
+
+    transport.fetch("https://example.com/")
+    transport.fetch("https://example.com/")
+
+    assert len(adapter.requests) == 1
+
+
+def test_evicts_least_recently_used(tmp_path):
+    adapter = ETagAdapter()
+    cache = ResponseCache(tmp_path, max_bytes=60)
+    transport = Transport(adapter=adapter, cache=cache)
+
+    transport.fetch("https://example.com/a")
+    transport.fetch("https://example.com/b")
+    cache.get("https://example.com/a")
+    transport.fetch("https://example.com/c")
+
+    assert cache.get("https://example.com/b") is None
+    assert cache.get("https://example.com/a") is not None
+    assert cache.size <= 60
+    assert cache.stats.evictions == 1
+
+
+def test_counters_match_stats(tmp_path):
+    adapter = ETagAdapter()
+    cache = ResponseCache(tmp_path)
+    transport = Transport(adapter=adapter, cache=cache)
+    listener = PrometheusListener()
+    previous = set_listener(listener)
+    try:
+        transport.fetch("https://example.com/")
+        transport.fetch("https://example.com/")
+    finally:
+        set_listener(previous)
+
+    assert listener.counters["", "response_cache_misses"] == cache.stats.misses == 1
+    assert listener.counters["", "response_cache_revalidations"] == cache.stats.revalidations == 1
+
+
+def test_evicted_body_is_a_miss(tmp_path):
+    adapter = ETagAdapter(cache_control="max-age=60")
+    cache = ResponseCache(tmp_path)
+    transport = Transport(adapter=adapter, cache=cache)
+    url = "https://example.com/"
+
+    transport.fetch(url)
+    entry = cache.get(url)
+    (tmp_path / "objects" / entry.digest).unlink()
+
+    assert cache.hit(entry) is None
+    assert cache.get(url) is None
+    assert transport.fetch(url) == (b"https://example.com/ v1", url)
+    assert len(adapter.requests) == 2
+
+
+def test_no_store_drops_stale_entry(tmp_path):
+    adapter = ETagAdapter()
+    cache = ResponseCache(tmp_path)
+    transport = Transport(adapter=adapter, cache=cache)
+    url = "https://example.com/"
+
+    transport.fetch(url)
+    adapter.cache_control = "no-store"
+    adapter.version = 2
+    transport.fetch(url)
+
+    assert cache.get(url) is None
+    assert cache.size == 0
+    assert not any((tmp_path / "objects").iterdir())
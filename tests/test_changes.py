@@ -0,0 +1,26 @@
+from newslib.changes import FrontPageWatcher
+from newslib.israel.walla import WallaSource
+from tests.stubs import walla_page
+
+
+def test_skips_extraction_when_fingerprint_unchanged():
+    watcher = FrontPageWatcher(WallaSource())
+
+    first = watcher.check(walla_page(["Top", "Second", "Third"]))
+    assert first.new_top_story.headline == "Top"
+    assert [entry.headline for entry in first.added] == ["Second", "Third"]
+
+    assert watcher.check(walla_page(["Top", "Second", "Third"])) is None
+    assert watcher.extractions == 1
+
+
+def test_reports_structured_diff():
+    watcher = FrontPageWatcher(WallaSource())
+    watcher.check(walla_page(["Top", "Second", "Third"]))
+
+    diff = watcher.check(walla_page(["Top", "Second (updated)"]))
+
+    assert diff.new_top_story is None
+    assert diff.added == []
+    assert [entry.headline for entry in diff.removed] == ["Third"]
+    assert [(before.headline, after.headline) for before, after in diff.edited] == [("Second", "Second (updated)")]
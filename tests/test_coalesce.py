@@ -0,0 +1,107 @@
+import asyncio
+import json
+import time
+from threading import Thread
+
+import pytest
+
+from newslib.coalesce import Coalescer
+from newslib.israel.arutz7 import Arutz7Source
+from tests.stubs import StubAdapter
+
+
+def item(article_id: int) -> bytes:
+    return json.dumps({
+        "title": f"Item {article_id}",
+        "catname": "News",
+        "itemDate": "2024-01-01T10:00:00",
+        "firstUpdate": "2024-01-01T09:00:00",
+    }).encode()
+
+
+@pytest.fixture(autouse=True)
+def adapter(install_transport):
+    adapter = StubAdapter(pages={
+        Arutz7Source.get_article_data_url(f"/News/News.aspx/{i}"): item(i) for i in range(5)
+    })
+    install_transport(adapter)
+    Arutz7Source.item_data.invalidate()
+    return adapter
+
+
+def test_arutz7_fields_share_one_item_request(adapter: StubAdapter):
+    source = Arutz7Source()
+    url = "/News/News.aspx/1"
+
+    assert source.get_category(url) == "News"
+    assert source.get_times(url)[0].hour == 10
+    assert source.get_article_headline(url) == "Item 1"
+
+    assert len(adapter.requests) == 1
+
+
+def test_arutz7_bulk_fetch(adapter: StubAdapter):
+    urls = [f"/News/News.aspx/{i}" for i in range(6)]
+
+    results = Arutz7Source.get_articles_data(urls + urls[:2])
+    assert [results[url]["title"] for url in urls[:5]] == [f"Item {i}" for i in range(5)]
+    assert "404" in str(results[urls[5]])
+
+    results = asyncio.run(Arutz7Source.get_articles_data_async(urls))
+    assert results[urls[0]]["title"] == "Item 0"
+
+    # The failed lookup isn't cached, so only it is requested again
+    assert len(adapter.requests) == 7
+
+
+def test_concurrent_lookups_share_in_flight_call():
+    coalescer = Coalescer()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.05)
+        return "result"
+
+    results = []
+    threads = [Thread(target=lambda: results.append(coalescer.get("key", fetch))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["result"] * 4
+    assert len(calls) == 1
+
+
+def test_results_expire():
+    coalescer = Coalescer(ttl=0)
+
+    coalescer.get("key", lambda: 1)
+    assert coalescer.get("key", lambda: 2) == 2
+
+
+def test_cancelled_owner_does_not_cancel_waiters():
+    coalescer = Coalescer()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def lookups():
+        owner = asyncio.create_task(coalescer.get_async("key", fetch))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(coalescer.get_async("key", fetch))
+        await asyncio.sleep(0)
+
+        owner.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await owner
+
+        return await waiter
+
+    assert asyncio.run(lookups()) == "result"
+    assert len(calls) == 1
+    assert coalescer.get("key", lambda: "other") == "result"
@@ -0,0 +1,82 @@
+import pytest
+from requests import ConnectionError
+
+from newslib.corpus import Corpus, RecordingAdapter, record_source, recording, replaying
+from newslib.israel.news13 import News13Source
+from newslib.source import Source
+from newslib.transport import Transport, get_transport
+from tests.stubs import StubAdapter, news13_entry_page
+
+
+def test_record_then_replay(tmp_path):
+    upstream = StubAdapter(pages={
+        "https://example.com/": b"<html>front</html>",
+        "https://example.com/rss": b"<rss></rss>",
+    })
+
+    with recording(tmp_path, version="v1", adapter=upstream):
+        assert Source.get_content("https://example.com/") == (b"<html>front</html>", "https://example.com/")
+        assert list(Source.stream_content("https://example.com/rss")) == [b"<rss></rss>"]
+
+    assert Corpus.versions(tmp_path) == ["v1"]
+
+    with replaying(tmp_path) as corpus:
+        assert len(corpus) == 2
+        assert Source.get_content("https://example.com/") == (b"<html>front</html>", "https://example.com/")
+
+        with pytest.raises(ConnectionError):
+            Source.get_content("https://example.com/other")
+
+    assert len(upstream.requests) == 2
+
+
+def test_failed_responses_replay_as_failures(tmp_path):
+    corpus = Corpus.create(tmp_path)
+    transport = Transport(adapter=RecordingAdapter(corpus, StubAdapter(pages={})))
+
+    with pytest.raises(Exception, match="404"):
+        transport.fetch("https://example.com/missing")
+
+    corpus.save()
+    assert Corpus.open(tmp_path).get("https://example.com/missing")[0].status_code == 404
+
+
+def test_manifest_saved_once_recording_ends(tmp_path):
+    upstream = StubAdapter(pages={"https://example.com/": b"<html>front</html>"})
+
+    with pytest.raises(ValueError):
+        with recording(tmp_path, version="v1", adapter=upstream) as corpus:
+            assert get_transport().rate_limiter is not None
+
+            Source.get_content("https://example.com/")
+            assert not (corpus.directory / "manifest.json").exists()
+
+            raise ValueError
+
+    assert "https://example.com/" in Corpus.open(tmp_path, "v1")
+
+
+def test_news13_entry_page_recorded_despite_persisted_root(tmp_path, monkeypatch):
+    persisted = tmp_path / "news13_root.json"
+    monkeypatch.setattr(News13Source, "root_cache_path", persisted)
+    persisted.write_text(
+        '{"entry_url": "https://13news.co.il/", "root": "https://13tv.co.il/", "resolved": 9999999999}'
+    )
+
+    upstream = StubAdapter(pages={
+        "https://13news.co.il/": news13_entry_page("https://13tv.co.il/"),
+        "https://13tv.co.il/": b"<html>front</html>",
+    })
+
+    with recording(tmp_path / "corpus", adapter=upstream):
+        record_source(News13Source(), articles=False, feeds=False)
+
+    # As on a clean machine
+    persisted.unlink()
+
+    with replaying(tmp_path / "corpus"):
+        source = News13Source()
+        assert source.root == "https://13tv.co.il/"
+        assert source.get_root_content().content == b"<html>front</html>"
+
+    assert News13Source.root_cache_path == persisted
@@ -0,0 +1,55 @@
+from newslib.document import Document, DocumentCache, attach, get_document
+from newslib.israel.walla import WallaSource
+from newslib.source import Source
+from tests.stubs import walla_page
+
+
+def test_attached_document_identity():
+    html = Source.parse_html(b"<html><body><p>hi</p></body></html>")
+    document = Document(b"<html><body><p>hi</p></body></html>", "https://example.com/")
+    attach(html, document)
+
+    assert get_document(html) is document
+    assert get_document(b"<html><body><p>hi</p></body></html>").digest == document.digest
+
+
+def test_document_cache_is_bounded_and_invalidated():
+    cache = DocumentCache(max_documents=2)
+    calls = []
+
+    def compute(document):
+        return lambda: calls.append(document.url) or document.url
+
+    documents = [Document(f"page {i}", f"https://example.com/{i}") for i in range(3)]
+    for document in documents:
+        cache.get(document, "url", compute(document))
+
+    assert len(cache) == 2
+    assert cache.get(documents[2], "url", compute(documents[2])) == "https://example.com/2"
+    assert len(calls) == 3
+
+    cache.invalidate(url="https://example.com/2")
+    cache.get(documents[2], "url", compute(documents[2]))
+    assert len(calls) == 4
+
+
+def test_walla_articles_memoized_per_document():
+    source = WallaSource()
+    page = walla_page(["Top", "Second", "Third"])
+
+    assert source.get_top_article_a(page).text == "Top"
+    assert [a.text for a in source.get_substories_a(page)] == ["Second", "Third"]
+    assert [a.text for a in source.get_substories_a(page)] == ["Second", "Third"]
+    assert len(source.document_cache) == 1
+
+    assert source.get_top_article_a(walla_page(["Other"])).text == "Other"
+
+
+def test_walla_state_decompressed_once_per_blob():
+    WallaSource.decompressed_states.invalidate()
+    calls = WallaSource.decompressed_states.calls
+
+    WallaSource().get_top_article_a(walla_page(["Top"]))
+    WallaSource().get_top_article_a(walla_page(["Top"]))
+
+    assert WallaSource.decompressed_states.calls == calls + 1
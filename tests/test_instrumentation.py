@@ -0,0 +1,75 @@
+import pytest
+
+from newslib.instrumentation import Listener, PrometheusListener, set_listener
+from tests.stubs import FRONT_PAGE, DummySource, StubAdapter, article_page, walla_page
+
+
+class RecordingListener(Listener):
+    def __init__(self):
+        self.timings = []
+        self.counts = []
+
+    def timing(self, source, stage, seconds):
+        self.timings.append((source, stage))
+
+    def count(self, source, name, value=1):
+        self.counts.append((source, name, value))
+
+
+@pytest.fixture
+def listener():
+    listener = RecordingListener()
+    previous = set_listener(listener)
+    yield listener
+    set_listener(previous)
+
+
+def test_stages_reported_per_source(listener: RecordingListener):
+    from newslib.israel.walla import WallaSource
+
+    source = WallaSource()
+    page = walla_page(["Top", "Second"])
+
+    source.get_top_article_a(page)
+    source.get_substories_a(page)
+
+    # Nested extract calls are only timed once, and the decode inherits the source of its extract stage
+    assert listener.timings == [("walla", "decode"), ("walla", "extract"), ("walla", "extract")]
+    assert ("walla", "document_cache_hits", 1) in listener.counts
+
+
+def test_fetch_bytes_and_errors(listener: RecordingListener, install_transport):
+    page = article_page("Politics")
+    install_transport(StubAdapter(pages={"https://dummy.example.com/a/1": page}))
+    source = DummySource()
+    url = "https://dummy.example.com/a/1"
+
+    source.get_category(url)
+    with pytest.raises(Exception):
+        source.get_category("https://dummy.example.com/a/3")
+
+    assert ("dummy", "fetch") in listener.timings
+    assert ("dummy", "parse") in listener.timings
+    assert ("dummy", "bytes_fetched", len(page)) in listener.counts
+    assert ("dummy", "fetch_errors", 1) in listener.counts
+    assert ("dummy", "extract_errors", 1) in listener.counts
+
+
+def test_prometheus_rendering():
+    listener = PrometheusListener()
+    listener.timing("ynet", "fetch", 0.5)
+    listener.timing("ynet", "fetch", 0.25)
+    listener.count("ynet", "bytes_fetched", 1024)
+
+    rendered = listener.render()
+
+    assert 'newslib_stage_seconds_total{source="ynet",stage="fetch"} 0.75' in rendered
+    assert 'newslib_stage_calls_total{source="ynet",stage="fetch"} 2' in rendered
+    assert 'newslib_bytes_fetched_total{source="ynet"} 1024' in rendered
+
+
+def test_front_page_parsed_once_per_get_headlines(listener: RecordingListener):
+    headlines = DummySource().get_headlines(FRONT_PAGE)
+
+    assert len(headlines) > 1
+    assert listener.timings.count(("dummy", "parse")) == 1
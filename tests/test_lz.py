@@ -0,0 +1,22 @@
+import random
+import string
+
+from lzstring import LZString
+
+from newslib.lz import decompress_from_base64
+
+
+def test_matches_reference_implementation():
+    rng = random.Random(0)
+
+    for length in [0, 1, 2, 3, 10, 100, 1000, 5000]:
+        for alphabet in (string.ascii_letters, "אבגדהוזחטי ", "ab", string.printable):
+            text = "".join(rng.choice(alphabet) for _ in range(length))
+            compressed = LZString.compressToBase64(text)
+
+            assert decompress_from_base64(compressed) == LZString.decompressFromBase64(compressed) == text
+
+
+def test_edge_cases():
+    assert decompress_from_base64(None) == ""
+    assert decompress_from_base64("") is None
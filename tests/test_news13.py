@@ -0,0 +1,95 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from newslib.israel.news13 import News13Source
+from newslib.parallel import ParsePool
+from tests.stubs import StubAdapter, news13_entry_page
+
+
+@pytest.fixture(autouse=True)
+def adapter(tmp_path, monkeypatch, install_transport):
+    monkeypatch.setattr(News13Source, "root_cache_path", tmp_path / "news13_root.json")
+
+    adapter = StubAdapter(pages={"https://13news.co.il/": news13_entry_page("https://13tv.co.il/")})
+    install_transport(adapter)
+    return adapter
+
+
+def test_root_resolved_lazily_and_persisted(adapter: StubAdapter):
+    source = News13Source()
+    assert adapter.requests == []
+
+    assert source.root == "https://13tv.co.il/"
+    assert source.root == "https://13tv.co.il/"
+    assert len(adapter.requests) == 1
+
+    assert News13Source().root == "https://13tv.co.il/"
+    assert len(adapter.requests) == 1
+
+
+def test_crawl_resolves_root_off_the_event_loop(adapter: StubAdapter):
+    adapter.pages["https://13tv.co.il/"] = b"<html><body>Front page</body></html>"
+    source = News13Source()
+
+    threads = []
+    resolve_root = source.resolve_root
+    source.resolve_root = lambda: threads.append(threading.current_thread()) or resolve_root()
+
+    content, root = asyncio.run(ParsePool._fetch_front_page(source))
+
+    assert (content, root) == (b"<html><body>Front page</body></html>", "https://13tv.co.il/")
+    assert threads[0] is not threading.main_thread()
+
+
+def test_stale_root_refreshed_in_background(adapter: StubAdapter, tmp_path):
+    source = News13Source()
+    # Set on the instance, so refreshes still running after monkeypatch is undone never touch the real cache
+    source.root_cache_path = tmp_path / "news13_root.json"
+    source.root_ttl = 0
+    assert source.root == "https://13tv.co.il/"
+
+    adapter.pages["https://13news.co.il/"] = news13_entry_page("https://13tv.co.il/new/")
+    assert source.root == "https://13tv.co.il/"
+
+    source._root_refresh.join()
+    assert source.root == "https://13tv.co.il/new/"
+
+    # The root was still stale, so that read started another refresh
+    source._root_refresh.join()
+
+
+def test_root_resolved_elsewhere_is_used_as_is(adapter: StubAdapter):
+    source = News13Source()
+    source.use_root("https://13tv.co.il/")
+
+    assert source.root == "https://13tv.co.il/"
+    assert adapter.requests == []
+    assert not News13Source.root_cache_path.exists()
+
+
+def test_failed_resolution_falls_back_to_entry_url(adapter: StubAdapter):
+    adapter.pages = {}
+    source = News13Source()
+
+    assert source.root == "https://13news.co.il/"
+    assert source._root_expires <= time.time() + source.root_retry
+
+
+@pytest.mark.parametrize("persisted", ["[]", "{}", '{"entry_url": "https://13news.co.il/"}', '"root"'])
+def test_malformed_persisted_root_is_ignored(adapter: StubAdapter, persisted: str):
+    News13Source.root_cache_path.write_text(persisted)
+
+    assert News13Source().root == "https://13tv.co.il/"
+    assert len(adapter.requests) == 1
+
+
+def test_default_root_cache_path_resolved_on_use(monkeypatch, tmp_path):
+    # Back to the class's own default rather than the fixture's path
+    monkeypatch.undo()
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+    assert News13Source.root_cache_path == tmp_path / "newslib" / "news13_root.json"
+    assert News13Source().root_cache_path == tmp_path / "newslib" / "news13_root.json"
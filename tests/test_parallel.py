@@ -0,0 +1,84 @@
+import json
+from datetime import datetime
+from urllib.parse import quote
+
+import pytest
+from lzstring import LZString
+
+from newslib.parallel import ParsePool
+from newslib.records import Headline
+from tests.stubs import StubAdapter, walla_page
+
+
+def walla_article(article_id: int, category: str) -> bytes:
+    data = {f"Item_{article_id}": {"data": {"item": {"data": {
+        "unix_publication_date": 1704103200,
+        "unix_update_date": 1704106800,
+        "canonical": {"vertical": {"name": category}},
+    }}}}}
+    state = LZString().compressToBase64(quote(json.dumps(data)))
+
+    return f'<html><body><script>window.loadDataState = "{state}"</script></body></html>'.encode()
+
+
+@pytest.fixture(scope="module")
+def pool():
+    with ParsePool(max_workers=2, chunksize=2) as pool:
+        yield pool
+
+
+def test_front_pages_and_articles_extracted_in_workers(pool: ParsePool):
+    top, second = pool.front_pages([("walla", walla_page(["Top", "Second"])), ("walla", b"<html></html>")])
+
+    assert top[0] == Headline("walla", "https://news.walla.co.il/item/0", "Top", 0)
+    assert isinstance(second, Exception)
+
+    detailed, failed = pool.articles([
+        (top[1], walla_article(1, "Sports"), top[1].url),
+        (top[0], b"<html></html>", top[0].url),
+    ])
+
+    assert detailed.category == "Sports"
+    assert detailed.published == datetime.fromtimestamp(1704103200)
+    assert detailed.headline == "Second"
+    assert isinstance(failed, Exception)
+
+
+def test_crawl(pool: ParsePool, install_transport):
+    from newslib.israel.walla import WallaSource
+
+    adapter = StubAdapter(pages={
+        "https://news.walla.co.il/": walla_page(["Top", "Second"]),
+        "https://news.walla.co.il/item/0": walla_article(0, "News"),
+    })
+    install_transport(adapter)
+    results = pool.crawl([WallaSource()])
+
+    top, second = results["walla"]
+    assert top.category == "News"
+    assert "404" in str(second)
+
+
+def test_maariv_top_headline_filled_in_by_article_stage(pool: ParsePool):
+    front_page = b"""
+    <html><body>
+    <div class="top-story-img-big"><a href="/news/1"><img></a></div>
+    <div class="three-articles-in-row"><a href="/news/2"><div class="three-articles-in-row-title">Second</div></a></div>
+    </body></html>
+    """
+    article = b"""
+    <html><head><script type="application/ld+json">
+    {"@type": "NewsArticle", "datePublished": "2024-01-01T10:00:00", "dateModified": "2024-01-01T11:00:00"}
+    </script></head><body>
+    <div class="article-breadcrumbs"><ul><li><a>News</a></li><li><a>Politics</a></li></ul></div>
+    <section class="article-title"> Top story </section>
+    </body></html>
+    """
+
+    # Nothing is fetched in workers: the top headline is left for the article stage
+    [headlines] = pool.front_pages([("maariv", front_page, "https://www.maariv.co.il/")])
+    assert [headline.headline for headline in headlines] == ["", "Second"]
+
+    [top] = pool.articles([(headlines[0], article, headlines[0].url)])
+    assert top.headline == "Top story"
+    assert top.category == "Politics"
@@ -0,0 +1,128 @@
+import asyncio
+import json
+
+from newslib.document import Document
+from newslib.israel.ynet import YnetSource
+from newslib.payload import MarkerScanner, component_regions, find_between, json_value, meta_content, script_by_id
+from tests.stubs import StubAdapter
+
+YNET_FRONT_PAGE = b"""
+<html><head><style>.TopStoryComponenta { color: red }</style></head><body>
+<div class="layoutItem TopStoryComponenta"><div class="slotView"><a href="/news/1"><div class="title">Top</div></a></div></div>
+<div class="layoutItem YnetMultiStripRowsComponenta">
+<div class="textDiv"><a href="/news/2">Second</a></div>
+<div class="textDiv"><a href="/news/3">Third</a></div>
+</div>
+<div class="layoutItem FooterComponenta"><div class="textDiv"><a href="/about">About</a></div></div>
+</body></html>
+"""
+
+YNET_ARTICLE = b"""
+<html><head>
+<meta content="news/politics" property="sub-channel-name">
+<script>
+dataLayer = [{'datePublished': '2024-01-01 10:00:00', 'dateModified': '2024-01-01 11:30:00'}];
+</script>
+</head><body><p>article</p></body></html>
+"""
+
+
+def test_find_between_and_script_by_id():
+    content = b'<script src="x"></script><script id="__NEXT_DATA__" type="application/json">{"a": 1}</script>'
+
+    assert json.loads(script_by_id(content, "__NEXT_DATA__")) == {"a": 1}
+    assert script_by_id(content, "missing") is None
+    assert find_between(b"a[b]c", b"[", b"]") == b"b"
+
+
+def test_meta_content_any_attribute_order():
+    assert meta_content(YNET_ARTICLE, "property", "sub-channel-name") == "news/politics"
+    assert meta_content(b'<meta property="og:title" content="A &amp; B">', "property", "og:title") == "A & B"
+    assert meta_content(YNET_ARTICLE, "property", "og:title") is None
+
+
+def test_component_regions_stop_at_next_component():
+    regions = list(component_regions(YNET_FRONT_PAGE, "YnetMultiStripRowsComponenta"))
+
+    assert len(regions) == 1
+    assert b"Third" in regions[0]
+    assert b"About" not in regions[0]
+
+
+def test_json_value_slices_one_value():
+    payload = b'{"meta": {"Items": 0}, "Page": [{"Items": [{"id": 1}, {"id": 2}], "Ads": [3]}]}'
+
+    assert json_value(payload, "Items") == (0, b"0")
+    assert json_value(payload, "Items", payload.find(b'"Page":')) == ([{"id": 1}, {"id": 2}], b'[{"id": 1}, {"id": 2}]')
+    assert json_value(payload, "Missing") is None
+    assert json_value(payload[:40], "Items", payload.find(b'"Page":')) is None
+
+
+def test_arutz7_region_is_sliced_not_decoded():
+    from newslib.israel.arutz7 import Arutz7Source
+
+    payload = b'{"data": {"Page": [{"Items": [{"shotedLink": "/News/1"}], "Ads": [1]}]}}'
+    source = Arutz7Source()
+
+    assert source.get_front_page_region(payload) == b'[{"shotedLink": "/News/1"}]'
+    assert source.get_front_page_region(payload[:30]) == payload[:30]
+
+
+def test_ynet_raw_extraction(install_transport):
+    source = YnetSource()
+
+    assert source.get_headline(source.get_top_article_a(YNET_FRONT_PAGE), top_article=True) == "Top"
+    assert [a.text for a in source.get_substories_a(YNET_FRONT_PAGE)] == ["Second", "Third"]
+
+    url = "https://www.ynet.co.il/news/article/1"
+    install_transport(StubAdapter(pages={url: YNET_ARTICLE}))
+    assert source.get_category(url) == "politics"
+    published, updated = source.get_times(url)
+    document = source.article(url).document
+
+    assert (published.hour, updated.minute) == (10, 30)
+
+    assert isinstance(document, Document)
+    assert "html" not in document.__dict__
+
+
+def test_marker_scanner_across_chunks():
+    scanner = MarkerScanner([(b"dataLayer = [", b"];"), (b"</head>",)])
+    content = b""
+
+    for chunk in (b"<html><head>dataLa", b"yer = [{}]", b";</he", b"ad><body>"):
+        assert not scanner.done
+        content += chunk
+        scanner.feed(content)
+
+    assert scanner.done
+    # The end marker only counts after its start marker
+    assert not MarkerScanner([(b"[", b"];")]).feed(b"]; [")
+
+
+def test_ynet_partial_fetch_stops_after_region(install_transport):
+    source = YnetSource()
+    url = "https://www.ynet.co.il/news/article/1"
+    page = YNET_ARTICLE.replace(b"<p>article</p>", b"<p>article</p>" * 10000)
+    adapter = StubAdapter(pages={url: page})
+
+    install_transport(adapter)
+    document, _ = source.fetch_partial_document(url, "times", "category")
+
+    assert len(document) < len(page)
+    assert adapter.requests[0][1]["stream"]
+    assert source.get_category(url, document) == "politics"
+    assert source.get_times(url, document)[0].hour == 10
+
+
+def test_field_calls_fetch_only_their_region(install_transport):
+    source = YnetSource()
+    url = "https://www.ynet.co.il/news/article/1"
+    page = YNET_ARTICLE.replace(b"<p>article</p>", b"<p>article</p>" * 10000)
+    adapter = StubAdapter(pages={url: page})
+
+    install_transport(adapter)
+    assert source.get_category(url) == "politics"
+    assert asyncio.run(source.get_times_async(url))[0].hour == 10
+
+    assert [kwargs["stream"] for _, kwargs in adapter.requests] == [True, True]
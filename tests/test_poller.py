@@ -0,0 +1,52 @@
+from newslib.israel.maariv import MaarivSource
+from newslib.poller import FlashPoller, SeenSet
+from tests.stubs import StubAdapter
+
+
+def feed(*items: tuple[str, str]) -> bytes:
+    return ("<rss><channel>" + "".join(
+        f"<item><itemID>{item_id}</itemID><link>https://www.maariv.co.il/{item_id}</link>"
+        f"<pubDate>Mon, 01 Jan 2024 10:00:00 GMT</pubDate><UpdateDate>{updated}</UpdateDate></item>"
+        for item_id, updated in items
+    ) + "</channel></rss>").encode()
+
+
+def test_seen_set_is_bounded():
+    seen = SeenSet(window=10, max_size=3)
+
+    assert seen.add("a", now=0)
+    assert not seen.add("a", now=1)
+
+    for key in "bcd":
+        seen.add(key, now=2)
+    assert len(seen) == 3 and "a" not in seen
+
+    seen.add("e", now=20)
+    assert len(seen) == 1 and "e" in seen
+
+
+def test_poller_emits_new_and_updated_items(install_transport):
+    source = MaarivSource()
+    adapter = StubAdapter(pages={source.rss_news_flashes: feed(("1", "Mon, 01 Jan 2024 10:00:00 GMT"))})
+    install_transport(adapter)
+
+    poller = FlashPoller([source], interval=0)
+    assert [item.guid for item in poller.poll_once()] == ["1"]
+    assert poller.poll_once() == []
+
+    adapter.pages[source.rss_news_flashes] = feed(
+        ("2", "Mon, 01 Jan 2024 11:00:00 GMT"),
+        ("1", "Mon, 01 Jan 2024 10:30:00 GMT"),
+    )
+    assert [item.guid for item in poller.run(max_cycles=1)] == ["2", "1"]
+
+
+def test_poller_can_skip_existing_items(install_transport):
+    source = MaarivSource()
+    install_transport(StubAdapter(pages={
+        source.rss_news_flashes: feed(("1", "Mon, 01 Jan 2024 10:00:00 GMT")),
+    }))
+
+    poller = FlashPoller([source], interval=0, emit_existing=False)
+    assert list(poller.run(max_cycles=2)) == []
+    assert len(poller.seen) == 1
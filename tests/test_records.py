@@ -0,0 +1,40 @@
+from dataclasses import FrozenInstanceError
+from datetime import datetime
+
+import pytest
+
+from newslib.israel.walla import WallaSource
+from newslib.records import Headline
+from tests.stubs import FRONT_PAGE, DummySource, StubAdapter, article_page, walla_page
+
+
+def test_walla_headlines_built_from_payload():
+    headlines = WallaSource().get_headlines(walla_page(["Top", "Second"]))
+
+    assert headlines == [
+        Headline("walla", "https://news.walla.co.il/item/0", "Top", 0),
+        Headline("walla", "https://news.walla.co.il/item/1", "Second", 1),
+    ]
+    assert headlines[0].top_article
+
+    with pytest.raises(FrozenInstanceError):
+        headlines[0].headline = "Edited"
+
+    assert not hasattr(headlines[0], "__dict__")
+
+
+def test_headlines_hold_no_tags_and_can_be_detailed(install_transport):
+    source = DummySource()
+    top, *substories = source.get_headlines(FRONT_PAGE)
+
+    assert (top.url, top.headline, top.position) == ("https://dummy.example.com/a/1", "Top story", 0)
+    assert [headline.headline for headline in substories] == ["Second", "Broken"]
+    assert all(type(value) in (str, int) for value in (top.source, top.url, top.headline, top.position))
+
+    install_transport(StubAdapter(pages={top.url: article_page("Politics")}))
+    detailed = source.get_headline_details(top)
+
+    assert detailed.category == "Politics"
+    assert detailed.published == datetime(2024, 1, 1, 10, 0)
+    assert detailed.tags is None
+    assert top.category is None
@@ -0,0 +1,37 @@
+import subprocess
+import sys
+
+import pytest
+
+from newslib import all_sources, get_source, register_source
+from newslib import registry
+from newslib.registry import BUILTIN_SOURCES
+from newslib.source import Source
+
+
+def test_importing_newslib_is_lazy():
+    code = "import sys, newslib; print(any(m in sys.modules for m in ('bs4', 'lxml', 'lzstring', 'requests')))"
+    assert subprocess.check_output([sys.executable, "-c", code], text=True).strip() == "False"
+
+
+def test_get_source_shares_instances():
+    source = get_source("ynet")
+
+    assert source.name == "ynet"
+    assert get_source("ynet") is source
+    assert [source.name for source in all_sources()][:len(BUILTIN_SOURCES)] == list(BUILTIN_SOURCES)
+
+
+def test_register_source(monkeypatch):
+    monkeypatch.setattr(registry, "_factories", dict(registry._factories))
+    monkeypatch.setattr(registry, "_sources", {})
+
+    class CustomSource(Source):
+        def __init__(self):
+            super().__init__(name="custom", root="https://custom.example.com/")
+
+    register_source("custom", CustomSource)
+    assert get_source("custom").root == "https://custom.example.com/"
+
+    with pytest.raises(Exception, match="Unknown source"):
+        get_source("nonexistent")
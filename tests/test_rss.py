@@ -0,0 +1,77 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from newslib.israel.haaretz import HaaretzSource
+from newslib.israel.news0404 import News0404Source
+from newslib.israel.ynet import YnetSource
+from newslib.rss import parse_feed
+from newslib.source import Source
+from tests.stubs import StubAdapter
+
+RSS = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/"><channel>
+<title>Feed</title>
+<item>
+<title>First</title><link>https://www.0404.co.il/?p=1</link><guid>1</guid>
+<dc:created>2024-01-01 10:00:00</dc:created><dc:modified>2024-01-01 10:30:00</dc:modified>
+</item>
+<item>
+<title>Second</title><link>https://www.0404.co.il/?p=2</link><guid>2</guid>
+<dc:created>2024-01-01 11:00:00</dc:created>
+</item>
+</channel></rss>
+"""
+
+
+def chunked(content: bytes, size=7):
+    return [content[i:i + size] for i in range(0, len(content), size)]
+
+
+def test_parse_feed_in_small_chunks():
+    items = list(parse_feed(News0404Source(), chunked(RSS)))
+
+    assert [item.title for item in items] == ["First", "Second"]
+    assert items[0].guid == "1"
+    assert items[0].created == datetime(2024, 1, 1, 10, 0)
+    assert items[0].modified == datetime(2024, 1, 1, 10, 30)
+    assert items[1].modified is None
+
+
+def test_rss_item_tags():
+    feed = b"""<rss><channel>
+    <item><link>https://www.haaretz.co.il/1</link><category>A</category><category>B</category>
+    <pubDate>Mon, 01 Jan 2024 10:00:00 +0000</pubDate></item>
+    </channel></rss>"""
+
+    item, = parse_feed(HaaretzSource(), [feed])
+
+    assert item.guid == "https://www.haaretz.co.il/1"
+    assert item.tags == ("A", "B")
+    assert item.created == datetime(2024, 1, 1, 10, 0, tzinfo=timezone.utc)
+
+
+def test_atom_feed():
+    feed = b"""<feed xmlns="http://www.w3.org/2005/Atom">
+    <entry><id>urn:1</id><title>Atom</title><link href="https://example.com/1"/>
+    <updated>2024-01-01T10:00:00+00:00</updated><category term="news"/></entry>
+    </feed>"""
+
+    item, = parse_feed(Source("atom", "https://example.com/"), [feed])
+
+    assert (item.guid, item.link, item.tags) == ("urn:1", "https://example.com/1", ("news",))
+    assert item.modified == datetime(2024, 1, 1, 10, 0, tzinfo=timezone.utc)
+
+
+def test_block_page_is_reported():
+    page = b"<!DOCTYPE html><html><body><span id='lblCase'>1234</span></body></html>"
+
+    with pytest.raises(Exception, match="Blocked. Case number 1234"):
+        list(parse_feed(YnetSource(), [page]))
+
+
+def test_get_rss_items_streams_through_transport(install_transport):
+    source = News0404Source()
+    install_transport(StubAdapter(pages={source.rss_news_link: RSS}))
+
+    assert [item.guid for item in source.get_rss_items()] == ["1", "2"]
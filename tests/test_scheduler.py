@@ -0,0 +1,56 @@
+import time
+
+from newslib.scheduler import Scheduler
+from newslib.transport import Transport
+from tests.stubs import StubAdapter
+
+
+def test_backs_off_when_unchanged_and_speeds_up_on_change():
+    scheduler = Scheduler(min_interval=10, max_interval=100, backoff=2, speedup=2)
+    endpoint = scheduler.add("https://example.com/")
+
+    scheduler.observe(endpoint, "a", now=0)
+    assert endpoint.interval == 10
+
+    for now in (10, 30, 70, 150):
+        scheduler.observe(endpoint, "a", now=now)
+    assert endpoint.interval == 100
+
+    assert scheduler.observe(endpoint, "b", now=250)
+    assert endpoint.interval == 50
+    assert endpoint.next_due == 300
+
+
+def test_learns_change_period():
+    scheduler = Scheduler(min_interval=10, max_interval=1000, speedup=1.1)
+    endpoint = scheduler.add("https://example.com/", interval=1000)
+
+    for now, digest in enumerate("abcd"):
+        scheduler.observe(endpoint, digest, now=now * 100)
+
+    assert endpoint.change_period == 100
+    assert endpoint.interval == 50
+
+
+def test_budget_limits_due_endpoints():
+    adapter = StubAdapter()
+    scheduler = Scheduler(budget_per_minute=2, transport=Transport(adapter=adapter))
+
+    for i in range(3):
+        scheduler.add(f"https://example.com/{i}")
+
+    polls = scheduler.run_once()
+    assert [poll.changed for poll in polls] == [True, True]
+    assert len(scheduler.due()) == 0
+    assert scheduler.sleep_time() > 0
+
+
+def test_run_returns_after_last_cycle():
+    scheduler = Scheduler(min_interval=3, transport=Transport(adapter=StubAdapter()))
+    scheduler.add("https://example.com/")
+
+    started = time.monotonic()
+    polls = list(scheduler.run(max_cycles=1))
+
+    assert len(polls) == 1
+    assert time.monotonic() - started < 1
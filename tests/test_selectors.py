@@ -0,0 +1,86 @@
+import pytest
+
+from newslib.document import Document
+from newslib.selectors import LxmlBackend, SoupBackend
+
+PAGE = Document(b"""
+<html><head><script type="application/ld+json">{"@type": "NewsArticle"}</script></head><body>
+<div id="part1"><ul class="grid-ordering main1">
+<li><strong><a href="/1">First</a></strong></li>
+<li><strong><a href="/2">Second</a></strong></li>
+<li><strong><a href="/3">Third</a></strong></li>
+</ul></div>
+<article><div><a href="/h"><h2><span>With heading</span></h2></a><a href="/n">No heading</a></div></article>
+<ul class="breadcrumbs"><li><a>Home</a></li><li><a>News</a></li></ul>
+<span class="display-date"><span>01/01/24</span><span>10:00</span></span>
+</body></html>
+""", "https://example.com/")
+
+SELECTORS = [
+    "#part1 > .grid-ordering.main1 > li:first-child strong > a",
+    "#part1 > .grid-ordering.main1 > li:not(:first-child) strong > a",
+    "article > div > a:has(h2)",
+    "a:has(> h2)",
+    ".breadcrumbs > li:last-child > a",
+    "head > script[type='application/ld+json']",
+    "span.display-date",
+]
+
+
+@pytest.mark.parametrize("selector", SELECTORS)
+def test_backends_agree(selector: str):
+    soup, lxml = SoupBackend(), LxmlBackend()
+
+    assert lxml.compile(selector) is not None
+    assert [lxml.text(e) for e in lxml.select(PAGE, selector)] == [soup.text(e) for e in soup.select(PAGE, selector)]
+
+
+def test_relative_selection_excludes_self():
+    lxml = LxmlBackend()
+
+    date = lxml.select_one(PAGE, "span.display-date")
+    assert [lxml.text(span) for span in lxml.select(date, "span")] == ["01/01/24", "10:00"]
+
+
+def test_to_tag_detaches_from_tree():
+    lxml = LxmlBackend()
+
+    a = lxml.to_tag(lxml.select_one(PAGE, "article > div > a:has(h2)"))
+    assert a.name == "a"
+    assert a.attrs["href"] == "/h"
+    assert a.select_one("h2 > span").text == "With heading"
+
+    ul = lxml.to_tag(lxml.select_one(PAGE, ".breadcrumbs"))
+    assert ul.attrs["class"] == ["breadcrumbs"]
+    assert ul.text == "HomeNews"
+    assert ul.parent is None
+
+
+def test_root_element_matches_from_document():
+    soup, lxml = SoupBackend(), LxmlBackend()
+
+    assert len(lxml.select(PAGE, "html > body > article")) == len(soup.select(PAGE, "html > body > article")) == 1
+    assert lxml.select_one(PAGE, "html").tag == "html"
+
+
+def test_undeclared_utf8_page_is_decoded():
+    page = Document("<html><body><h1>שלום עולם</h1></body></html>".encode(), "https://example.com/")
+    lxml = LxmlBackend()
+
+    assert lxml.text(lxml.select_one(page, "h1")) == "שלום עולם"
+    assert lxml.to_tag(lxml.select_one(page, "h1")).text == "שלום עולם"
+
+
+def test_untranslatable_selector_falls_back_to_bs4():
+    lxml = LxmlBackend()
+
+    assert lxml.compile("li:-soup-contains('Home')") is None
+    assert [lxml.text(e) for e in lxml.select(PAGE, ".breadcrumbs li:-soup-contains('Home')")] == ["Home"]
+
+
+def test_soup_is_searched_without_reparsing():
+    page = Document(PAGE.content, PAGE.url)
+    soup = page.html
+
+    assert [a.text for a in LxmlBackend().select(soup, ".breadcrumbs a")] == ["Home", "News"]
+    assert "lxml" not in page.__dict__
@@ -0,0 +1,113 @@
+from datetime import datetime
+
+import pytest
+
+from newslib.snapshot import snapshot
+from tests.stubs import FRONT_PAGE, DummySource, StubAdapter, article_page
+
+
+@pytest.fixture(autouse=True)
+def adapter(install_transport):
+    adapter = StubAdapter(pages={
+        "https://dummy.example.com/": FRONT_PAGE,
+        "https://dummy.example.com/a/1": article_page("Politics"),
+        "https://dummy.example.com/a/2": article_page("Sports"),
+    })
+    install_transport(adapter)
+    return adapter
+
+
+def test_snapshot_isolates_article_errors():
+    result = snapshot(DummySource())
+
+    assert result.error is None
+    assert result.top_article.headline == "Top story"
+    assert result.top_article.category == "Politics"
+    assert result.top_article.published == datetime(2024, 1, 1, 10, 0)
+
+    second, broken = result.substories
+    assert second.ok and second.category == "Sports"
+    assert not broken.ok and "404" in str(broken.error)
+    assert broken.headline == "Broken"
+
+
+def test_snapshot_records_front_page_error(adapter: StubAdapter):
+    adapter.pages = {}
+
+    result = snapshot(DummySource())
+
+    assert result.error is not None
+    assert result.articles == []
+
+
+def test_article_fetches_once(adapter: StubAdapter):
+    source = DummySource()
+    url = "https://dummy.example.com/a/1"
+
+    article = source.article(url)
+    assert source.article(url) is article
+    assert article.category == "Politics"
+    assert article.published == datetime(2024, 1, 1, 10, 0)
+    assert article.tags is None
+
+    assert [request.url for request, _ in adapter.requests] == [url]
+
+
+def test_field_calls_share_article_until_invalidated(adapter: StubAdapter):
+    source = DummySource()
+    url = "https://dummy.example.com/a/1"
+
+    assert source.get_category(url) == "Politics"
+    assert source.get_times(url) == source.article(url).times
+    assert len(adapter.requests) == 1
+
+    adapter.pages[url] = article_page("Sports")
+    assert source.get_category(url) == "Politics"
+
+    source.invalidate_article(url)
+    assert source.get_category(url) == "Sports"
+    assert len(adapter.requests) == 2
+
+
+def test_maariv_top_headline_shares_article_fetch(adapter: StubAdapter):
+    from newslib.israel.maariv import MaarivSource
+
+    article = """
+    <html><head><script type="application/ld+json">
+    {"@type": "NewsArticle", "datePublished": "2024-01-01T10:00:00", "dateModified": "2024-01-01T11:00:00"}
+    </script></head><body>
+    <div class="article-breadcrumbs"><ul><li><a>News</a></li><li><a>Politics</a></li></ul></div>
+    <section class="article-title"> Top story </section>
+    </body></html>
+    """.encode()
+    adapter.pages = {
+        "https://www.maariv.co.il/": b"""
+        <html><body>
+        <div class="top-story-img-big"><a href="/news/1"><img></a></div>
+        <div class="three-articles-in-row"><a href="/news/2"><div class="three-articles-in-row-title">Second</div></a></div>
+        </body></html>
+        """,
+        "https://www.maariv.co.il/news/1": article,
+    }
+
+    result = snapshot(MaarivSource())
+
+    assert result.top_article.headline == "Top story"
+    assert result.top_article.category == "Politics"
+    assert result.top_article.updated == datetime(2024, 1, 1, 11, 0)
+    assert MaarivSource().get_article_details("https://www.maariv.co.il/news/1", article) == (
+        "Top story", "Politics", (datetime(2024, 1, 1, 10, 0), datetime(2024, 1, 1, 11, 0)),
+    )
+
+    # The article fetched for the top headline is the one its details are read from
+    source = MaarivSource()
+    adapter.requests.clear()
+    top, second = source.get_headlines(fetch_articles=True)
+    assert top.headline == "Top story"
+    assert source.get_headline_details(top).category == "Politics"
+    assert [request.url for request, _ in adapter.requests] == [
+        "https://www.maariv.co.il/", "https://www.maariv.co.il/news/1",
+    ]
+
+    requested = [request.url for request, _ in adapter.requests]
+    assert requested.count("https://www.maariv.co.il/news/1") == 1
@@ -4,30 +4,12 @@ from urllib.parse import urljoin
 from _pytest.python import Metafunc
 from bs4.element import Tag
 
-from newslib.israel.arutz7 import Arutz7Source
-from newslib.israel.haaretz import HaaretzSource
-from newslib.israel.israelhayom import IsraelHayomSource
-from newslib.israel.maariv import MaarivSource
-from newslib.israel.n12 import N12Source
-from newslib.israel.news0404 import News0404Source
-from newslib.israel.news13 import News13Source
-from newslib.israel.walla import WallaSource
-from newslib.israel.ynet import YnetSource
+from newslib import all_sources
 from newslib.source import Source
 
 
 def pytest_generate_tests(metafunc: Metafunc):
-    sources = [
-        Arutz7Source(),
-        HaaretzSource(),
-        IsraelHayomSource(),
-        MaarivSource(),
-        N12Source(),
-        News13Source(),
-        News0404Source(),
-        WallaSource(),
-        YnetSource(),
-    ]
+    sources = all_sources()
     metafunc.parametrize(
         ("source", "root_content"),
         zip(sources, [source.get_root_content() for source in sources]),
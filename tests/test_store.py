@@ -0,0 +1,63 @@
+from datetime import datetime
+
+from newslib.records import Headline
+from newslib.rss import FeedItem
+from newslib.store import ArticleStore
+
+
+def test_upserts_skip_unchanged_rows(tmp_path):
+    with ArticleStore(tmp_path / "articles.db") as store:
+        headlines = [
+            Headline("ynet", f"https://www.ynet.co.il/news/{i}", f"Headline {i}", i, published=datetime(2024, 1, 1, i))
+            for i in range(3)
+        ]
+
+        assert store.add_headlines(headlines, seen=1000) == 3
+        assert store.add_headlines(headlines, seen=1010) == 0
+        assert store.connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+        # Front page records without details keep the stored ones
+        changed = Headline("ynet", headlines[0].url, "Updated", 2)
+        assert store.add_headlines([changed], seen=1020) == 1
+
+        article = store.get("ynet", headlines[0].url)
+        assert article.headline == "Updated"
+        assert article.published == datetime(2024, 1, 1, 0)
+        assert article.first_seen == datetime.fromtimestamp(1000)
+        assert article.last_seen == datetime.fromtimestamp(1020)
+        assert [position for _, position in store.positions("ynet", headlines[0].url)] == [0, 0, 2]
+
+
+def test_queries():
+    store = ArticleStore()
+    store.add_headlines([
+        Headline("walla", f"https://news.walla.co.il/item/{i}", str(i), i, published=datetime(2024, 1, i + 1))
+        for i in range(5)
+    ])
+    store.add_feed_items([
+        FeedItem("maariv", "guid-1", None, "Feed", datetime(2024, 1, 3, 12), None, ("politics",)),
+    ])
+
+    assert [article.headline for article in store.latest("walla", 2)] == ["4", "3"]
+    assert [article.headline for article in store.published_between(datetime(2024, 1, 2), datetime(2024, 1, 4))] == [
+        "1", "2", "Feed",
+    ]
+    assert store.get("maariv", guid="guid-1").tags == ("politics",)
+    assert len(store) == 6
+
+
+def test_front_page_and_feed_share_a_row():
+    store = ArticleStore()
+    store.add_headlines([Headline("ynet", "https://www.ynet.co.il/news/article/abc", "Front page", 0)], seen=1000)
+    store.add_feed_items([
+        FeedItem("ynet", "abc", "http://ynet.co.il/news/article/abc/?utm_source=rss", "Feed",
+                 datetime(2024, 1, 1, 10), None, ()),
+    ], seen=1010)
+
+    assert len(store) == 1
+    article = store.get("ynet", "https://ynet.co.il/news/article/abc#comments")
+    assert (article.key, article.guid, article.headline) == ("https://ynet.co.il/news/article/abc", "abc", "Feed")
+    assert article.url == "https://www.ynet.co.il/news/article/abc"
+    assert article.published == datetime(2024, 1, 1, 10)
+    assert store.get("ynet", guid="abc") == article
+    assert store.positions("ynet", "http://www.ynet.co.il/news/article/abc") == [(datetime.fromtimestamp(1000), 0)]
@@ -0,0 +1,191 @@
+import asyncio
+import threading
+import time
+from urllib.parse import urlparse
+
+import pytest
+
+from newslib.israel.ynet import YnetSource
+from newslib.ratelimit import RateLimiter, TokenBucket
+from newslib.source import Source
+from newslib.transport import Transport, get_transport, set_transport
+from tests.stubs import StubAdapter
+
+
+@pytest.fixture
+def adapter(install_transport):
+    adapter = StubAdapter()
+    install_transport(adapter, connect_timeout=1, read_timeout=2)
+    return adapter
+
+
+def test_get_content_uses_shared_transport(adapter: StubAdapter):
+    content, url = Source.get_content("https://example.com/a")
+    Source.get_content("https://example.com/b")
+
+    assert content == adapter.content
+    assert url == "https://example.com/a"
+    assert len(adapter.requests) == 2
+    assert adapter.requests[0][1]["timeout"] == (1, 2)
+    assert "User-Agent" in adapter.requests[0][0].headers
+
+
+def test_get_content_raises_on_error(adapter: StubAdapter):
+    adapter.status_code = 404
+
+    with pytest.raises(Exception, match="Got 404"):
+        Source.get_content("https://example.com/missing")
+
+
+def test_default_transport_is_shared():
+    previous = set_transport(None)
+    try:
+        assert get_transport() is get_transport()
+    finally:
+        set_transport(previous)
+
+
+class SlowAdapter(StubAdapter):
+    def __init__(self):
+        super().__init__()
+        self.lock = threading.Lock()
+        self.active = {}
+        self.peak = {}
+
+    def send(self, request, **kwargs):
+        host = urlparse(request.url).hostname
+
+        with self.lock:
+            self.active[host] = self.active.get(host, 0) + 1
+            self.peak[host] = max(self.peak.get(host, 0), self.active[host])
+
+        time.sleep(0.02)
+
+        with self.lock:
+            self.active[host] -= 1
+
+        return super().send(request, **kwargs)
+
+
+def test_fetch_async_bounds_in_flight_per_host():
+    adapter = SlowAdapter()
+    transport = Transport(adapter=adapter, max_in_flight=8, max_per_host=2)
+
+    async def fetch_all():
+        return await asyncio.gather(*[
+            transport.fetch_async(f"https://{host}.example.com/{i}")
+            for host in ("a", "b")
+            for i in range(6)
+        ])
+
+    results = asyncio.run(fetch_all())
+
+    assert len(results) == 12
+    assert adapter.peak == {"a.example.com": 2, "b.example.com": 2}
+
+
+def test_token_bucket_queues_reservations():
+    bucket = TokenBucket(rate=2, burst=2)
+
+    assert [bucket.reserve(now=bucket.updated) for _ in range(4)] == [0, 0, 0.5, 1]
+
+    bucket.pause(1, now=bucket.updated)
+    assert bucket.reserve(now=bucket.updated) == 2.5
+
+
+def test_rate_limiter_slows_down_on_429():
+    limiter = RateLimiter(rate=10, hosts={"ynet.co.il": 4}, pause=0)
+    adapter = StubAdapter(status_code=429)
+    transport = Transport(adapter=adapter, rate_limiter=limiter)
+
+    assert limiter.key("https://www.ynet.co.il/a") == limiter.key("http://ynet.co.il/b") == "ynet.co.il"
+
+    with pytest.raises(Exception, match="Got 429"):
+        transport.fetch("https://www.ynet.co.il/a")
+
+    assert limiter.current_rate("https://www.ynet.co.il/") == 2
+    assert limiter.current_rate("https://example.com/") is None
+
+    adapter.status_code = 200
+    transport.fetch("https://www.ynet.co.il/a")
+
+    assert limiter.current_rate("https://www.ynet.co.il/") == 2.2
+
+
+def test_block_page_slows_down_feed_host(install_transport):
+    url = "http://www.ynet.co.il/Integration/StoryRss2.xml"
+    block_page = b'<html><body><span id="lblCase">1234</span></body></html>'
+    limiter = RateLimiter(rate=10, pause=0)
+    install_transport(StubAdapter(pages={url: block_page}), rate_limiter=limiter)
+
+    with pytest.raises(Exception, match="Blocked. Case number 1234"):
+        list(YnetSource().get_rss_items(url))
+
+    assert limiter.current_rate(url) == 5
+
+
+class CountingLimiter(RateLimiter):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.reservations = 0
+
+    def reserve(self, url):
+        self.reservations += 1
+        return super().reserve(url)
+
+
+def test_throttled_host_does_not_starve_others():
+    adapter = StubAdapter()
+    limiter = CountingLimiter(hosts={"a.example.com": 20}, burst=1)
+    transport = Transport(adapter=adapter, max_in_flight=1, rate_limiter=limiter)
+
+    async def fetch_all():
+        return await asyncio.gather(
+            *[transport.fetch_async(f"https://a.example.com/{i}") for i in range(4)],
+            transport.fetch_async("https://b.example.com/"),
+        )
+
+    start = time.monotonic()
+    asyncio.run(fetch_all())
+
+    assert time.monotonic() - start >= 0.15
+    hosts = [urlparse(request.url).hostname for request, _ in adapter.requests]
+    assert hosts.index("b.example.com") <= 1
+    # Requests that waited for their token in fetch_async aren't charged for a second one
+    assert limiter.reservations == 5
+
+
+def test_default_limiter_buckets_per_site():
+    previous = set_transport(None)
+    try:
+        limiter = get_transport().rate_limiter
+    finally:
+        set_transport(previous)
+
+    assert limiter.key("https://news.walla.co.il/item/1") == limiter.key("https://rss.walla.co.il/feed/22")
+    assert limiter.key("https://www.ynet.co.il/") == limiter.key("http://ynet.co.il/") == "ynet.co.il"
+    assert limiter.key("https://www.inn.co.il/api/NewAPI/HP") == "inn.co.il"
+
+
+def test_for_sources_merges_hosts():
+    limiter = RateLimiter.for_sources(rate=2, hosts={"ynet.co.il": 1, "example.com": 3})
+
+    assert limiter.configured_rate("ynet.co.il") == 1
+    assert limiter.configured_rate("walla.co.il") == 2
+    assert limiter.configured_rate("example.com") == 3
+
+
+def test_block_page_slows_down_article_host(install_transport):
+    url = "https://www.ynet.co.il/news/article/abc"
+    block_page = b'<html><body><span id="lblCase">1234</span></body></html>'
+    limiter = RateLimiter(rate=10, pause=0)
+    install_transport(StubAdapter(pages={url: block_page}), rate_limiter=limiter)
+
+    with pytest.raises(Exception, match="block page"):
+        YnetSource().fetch_document(url)
+
+    with pytest.raises(Exception, match="block page"):
+        asyncio.run(YnetSource().fetch_content_async(url))
+
+    # Halved twice, less what the 200s themselves restored
+    assert limiter.current_rate(url) < 5